@@ -0,0 +1,23 @@
+"""Páginas do menu lateral.
+
+Cada opção do menu é um módulo com uma função ``render()``. Os módulos são
+importados sob demanda para que o primeiro carregamento do app não pague o
+custo de bibliotecas (PyMuPDF, PyPDF2, Plotly...) usadas só por outras opções.
+"""
+
+import importlib
+
+# Opção do menu -> módulo da página (a ordem define a ordem do menu)
+PAGINAS = {
+    "CRM de Clientes": "paginas.crm",
+    "Positivação de CNPJ": "paginas.cnpj",
+    "Renomear Notas Fiscais": "paginas.notas_fiscais",
+    "Conversor de Arquivos": "paginas.conversor",
+    "Organização Planilha Bancária": "paginas.planilha_bancaria",
+    "Contabilidade - Extrato ML": "paginas.extrato_ml",
+}
+
+
+def carregar_pagina(menu):
+    """Importa (uma única vez por processo) o módulo da opção selecionada."""
+    return importlib.import_module(PAGINAS[menu])
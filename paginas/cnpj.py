@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from paginas.comum import (
+    FONTE_HISTORICO,
+    escolher_fonte,
+    mostrar_estatisticas_cache,
+    mostrar_resumo_historico,
+    salvar_no_historico,
+)
+from processamento.cache import hash_do_arquivo, parse_cache
+from processamento.cnpj import CNPJTracker, summarize_documents
+from processamento.diagnostico import span
+from processamento.historico import historico
+from processamento.ingestao import COLUNAS_CNPJ, OBRIGATORIAS_CNPJ, read_columns
+
+
+def resumir_arquivos(arquivos):
+    """Resumo de cada arquivo (``{hash: resumo}``), lido uma única vez por
+    conteúdo; arquivos sem a coluna de CNPJ são avisados e ficam de fora."""
+    resumos = {}
+    for arquivo in arquivos:
+        hash_arquivo = hash_do_arquivo(arquivo)
+        try:
+            resumos[hash_arquivo] = parse_cache.get_or_compute(
+                hash_arquivo,
+                lambda: summarize_documents(
+                    read_columns(arquivo, COLUNAS_CNPJ, OBRIGATORIAS_CNPJ)
+                ),
+                "cnpj-resumo",
+            )
+        except ValueError as erro:
+            st.error(f"⚠️ {arquivo.name}: {erro}")
+    return resumos
+
+
+def render():
+    st.title("📈 Positivação de CNPJ")
+    fonte = escolher_fonte("cnpj")
+
+    if fonte != FONTE_HISTORICO:
+        uploaded_files = st.file_uploader(
+            "📂 Envie as planilhas Excel contendo CNPJs (uma ou várias, ex.: um mês cada)",
+            type=["xlsx", "xls"],
+            key="cnpj",
+            accept_multiple_files=True,
+        )
+        if uploaded_files:
+            st.session_state.uploaded_file_cnpj = uploaded_files
+
+    # União dos CNPJs/CPFs de todos os arquivos, mantida entre reruns: um
+    # arquivo novo só soma os seus documentos ao que já foi contado
+    if "cnpj_tracker" not in st.session_state:
+        st.session_state.cnpj_tracker = CNPJTracker()
+    tracker = st.session_state.cnpj_tracker
+
+    resumos = {}
+    if fonte == FONTE_HISTORICO:
+        # Primeira nota de cada documento agregada pelo próprio SQLite
+        mostrar_resumo_historico()
+        if not historico.stats()["notas"]:
+            st.info("ℹ️ O histórico está vazio: envie planilhas e salve as notas nele.")
+            return
+        origem = f"historico|{historico.version()}"
+        resumos[origem] = parse_cache.get_or_compute(
+            origem, historico.document_summary, "cnpj-resumo", persistir=False
+        )
+        tracker.sync(resumos)
+    elif st.session_state.uploaded_file_cnpj:
+        resumos = resumir_arquivos(st.session_state.uploaded_file_cnpj)
+        with span("união dos arquivos") as trecho:
+            tracker.sync(resumos)
+            if trecho:
+                trecho.contar(linhas=len(tracker))
+        salvar_no_historico(st.session_state.uploaded_file_cnpj, "cnpj")
+        mostrar_estatisticas_cache()
+
+    if resumos:
+        data_final = st.date_input(
+            "Selecione a data limite para atingir a meta:",
+            datetime.today() + timedelta(days=30),
+        )
+
+        total_unicos = len(tracker)
+        meta = 600
+        dias_uteis_restantes = max((data_final - datetime.today().date()).days, 1)
+
+        restante = meta - total_unicos
+        media_diaria = restante / dias_uteis_restantes
+
+        if total_unicos >= meta:
+            st.success(f"🎉 Parabéns! Meta atingida ({total_unicos}/{meta})")
+        else:
+            st.warning(
+                f"📊 Faltam {restante} CNPJs para atingir a meta ({total_unicos}/{meta}).\n\n"
+                f"Você precisa cadastrar {media_diaria:.1f} CNPJs por dia até {data_final.strftime('%d/%m/%Y')}"
+            )
+
+        with span("gráfico"):
+            # Importado aqui para não pesar na inicialização das outras páginas
+            import plotly.express as px
+
+            fig = px.bar(
+                x=["Meta", "Realizado"],
+                y=[meta, total_unicos],
+                color=["Meta", "Realizado"],
+                color_discrete_sequence=["gray", "#fc630b"],
+                title="Progresso da Meta",
+            )
+            st.plotly_chart(fig)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Clientes distintos", total_unicos)
+        col2.metric("Arquivos", len(resumos))
+        col3.metric("Documentos inválidos", len(tracker.invalidos))
+
+        novos = tracker.new_per_day()
+        if not novos.empty:
+            st.markdown("### 📅 Clientes novos por dia")
+            st.caption("Dia da primeira nota de cada CNPJ/CPF entre todos os arquivos.")
+            st.bar_chart(novos, color="#fc630b")
+
+        if tracker.invalidos:
+            with st.expander(f"⚠️ {len(tracker.invalidos)} documentos inválidos (não contados)"):
+                st.dataframe(
+                    pd.DataFrame(
+                        tracker.invalidos.items(), columns=["Documento", "Arquivos"]
+                    ),
+                    hide_index=True,
+                )
+    elif not st.session_state.uploaded_file_cnpj:
+        st.warning("⚠️ Por favor, envie ao menos um arquivo Excel para visualizar os dados.")
@@ -0,0 +1,238 @@
+"""Elementos de interface compartilhados entre as páginas."""
+
+import importlib.util
+
+import streamlit as st
+
+from processamento.cache import parse_cache
+from processamento.diagnostico import attach_run, span
+from processamento.exportacao import FORMATOS_EXPORTACAO, to_xlsx
+from processamento.historico import historico
+from processamento.tabela import (
+    TAMANHOS_PAGINA,
+    format_page,
+    page_count,
+    page_slice,
+    query_table,
+)
+from processamento.tarefas import CANCELADA, CONCLUIDA, ESPERANDO, tarefas
+
+FONTE_PLANILHA = "📂 Planilha enviada"
+FONTE_HISTORICO = "🗄️ Histórico salvo"
+
+# Segundos entre as atualizações do progresso das tarefas em segundo plano
+INTERVALO_TAREFAS = 1.0
+
+
+def mostrar_estatisticas_cache():
+    """Mostra na barra lateral os acertos e falhas do cache de planilhas."""
+    stats = parse_cache.stats()
+    st.sidebar.caption(
+        f"🗃️ Cache de planilhas: {stats['hits_memoria']} acertos em memória, "
+        f"{stats['hits_disco']} em disco, {stats['misses']} leituras "
+        f"({stats['itens_em_memoria']} planilhas em memória)"
+    )
+
+
+def escolher_fonte(chave):
+    """Fonte dos dados da página: a planilha enviada ou o histórico local."""
+    return st.radio(
+        "Fonte dos dados",
+        (FONTE_PLANILHA, FONTE_HISTORICO),
+        horizontal=True,
+        key=f"fonte-{chave}",
+    )
+
+
+def mostrar_resumo_historico():
+    stats = historico.stats()
+    if stats["notas"]:
+        st.sidebar.caption(
+            f"🗄️ Histórico: {stats['notas']} notas de "
+            f"{stats['primeira_emissao']:%d/%m/%Y} a {stats['ultima_emissao']:%d/%m/%Y}"
+        )
+    else:
+        st.sidebar.caption("🗄️ Histórico vazio")
+
+
+def salvar_no_historico(arquivos, chave):
+    """Botão que grava no histórico as notas dos arquivos enviados; só as
+    notas que ainda não estavam lá são acrescentadas."""
+    if st.button("💾 Salvar notas no histórico", key=f"historico-{chave}"):
+        for arquivo in arquivos:
+            try:
+                importacao = historico.import_file(arquivo)
+            except ValueError as erro:
+                st.error(f"⚠️ {arquivo.name}: {erro}")
+                continue
+            if importacao.ja_importado:
+                st.info(f"ℹ️ {arquivo.name}: arquivo já importado antes")
+            else:
+                st.success(
+                    f"✅ {arquivo.name}: {importacao.novas} notas novas "
+                    f"de {importacao.linhas}"
+                )
+    mostrar_resumo_historico()
+
+
+def botoes_de_exportacao(df, nome_base, **opcoes_xlsx):
+    """Botões de download do mesmo resultado em Excel, CSV e Parquet.
+
+    Cada arquivo só é gerado quando o seu botão é clicado; ``opcoes_xlsx``
+    (nome da aba, formatos, larguras...) vão para ``to_xlsx``. Sem o pyarrow,
+    o botão de Parquet não aparece.
+    """
+    formatos = {
+        nome: formato
+        for nome, formato in FORMATOS_EXPORTACAO.items()
+        if nome != "Parquet" or importlib.util.find_spec("pyarrow")
+    }
+    for coluna, (nome, (extensao, mime, exportar)) in zip(
+        st.columns(len(formatos)), formatos.items()
+    ):
+        if nome == "Excel":
+            dados = lambda: to_xlsx(df, **opcoes_xlsx)  # noqa: E731
+        else:
+            dados = lambda exportar=exportar: exportar(df)  # noqa: E731
+        coluna.download_button(
+            label=f"📥 Baixar {nome}",
+            data=dados,
+            file_name=f"{nome_base}.{extensao}",
+            mime=mime,
+            key=f"exportar-{nome_base}-{extensao}",
+        )
+
+
+def _milhar(numero):
+    return f"{numero:,}".replace(",", ".")
+
+
+def tabela_paginada(
+    df, chave, formatos=None, filtros=(), nome_exportacao=None, formatos_xlsx=None
+):
+    """Tabela com busca, filtros, ordenação e paginação feitos no servidor.
+
+    Só a página visível é formatada (``formatos``, como em
+    ``processamento.tabela.format_page``) e enviada ao navegador. ``filtros``
+    são colunas com poucos valores (ex.: situação) que viram seleções; com
+    ``nome_exportacao``, a visão filtrada inteira pode ser baixada. Devolve a
+    visão filtrada e ordenada.
+    """
+    col_busca, col_ordem, col_sentido = st.columns([3, 2, 1])
+    busca = col_busca.text_input(
+        "🔎 Buscar", key=f"{chave}-busca", placeholder="Parte de qualquer texto"
+    )
+    ordenar_por = col_ordem.selectbox("Ordenar por", list(df.columns), key=f"{chave}-ordem")
+    decrescente = col_sentido.toggle("Decrescente", key=f"{chave}-decrescente")
+
+    escolhidos = {}
+    for coluna, col in zip(filtros, st.columns(len(filtros) or 1)):
+        escolhidos[coluna] = col.multiselect(
+            coluna,
+            sorted(df[coluna].dropna().unique()),
+            placeholder="Todos",
+            key=f"{chave}-filtro-{coluna}",
+        )
+
+    visao = query_table(df, busca, escolhidos, ordenar_por, not decrescente)
+
+    col_tamanho, col_pagina, col_info = st.columns([1, 1, 2])
+    tamanho = col_tamanho.selectbox(
+        "Linhas por página", TAMANHOS_PAGINA, index=1, key=f"{chave}-tamanho"
+    )
+    total_paginas = page_count(len(visao), tamanho)
+    # Uma busca pode deixar menos páginas do que a escolhida antes
+    chave_pagina = f"{chave}-pagina"
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = total_paginas
+    pagina = col_pagina.number_input(
+        f"Página (de {total_paginas})", 1, total_paginas, key=chave_pagina
+    )
+
+    with span("tabela", linhas=len(visao)):
+        linhas = page_slice(visao, pagina, tamanho)
+        pagina_formatada = format_page(linhas, formatos or {})
+    inicio = (pagina - 1) * tamanho
+    col_info.caption(
+        f"Mostrando {_milhar(inicio + min(len(linhas), 1))}–"
+        f"{_milhar(inicio + len(linhas))} de {_milhar(len(visao))} linhas"
+        + (f" (filtradas de {_milhar(len(df))})" if len(visao) != len(df) else "")
+    )
+    st.dataframe(pagina_formatada, hide_index=True)
+
+    if nome_exportacao:
+        botoes_de_exportacao(visao, nome_exportacao, formatos=formatos_xlsx)
+    return visao
+
+
+def mostrar_diagnostico(execucao):
+    """Tabela na barra lateral com o tempo, a CPU, a memória e o volume de
+    cada etapa da última execução da página e das tarefas em segundo plano
+    mostradas nela."""
+    with st.sidebar.expander("🩺 Diagnóstico", expanded=True):
+        st.dataframe(_etapas(execucao), hide_index=True)
+        for anexada in execucao.anexadas:
+            st.caption(f"⚙️ {anexada.pagina.capitalize()} ({anexada.inicio})")
+            st.dataframe(_etapas(anexada), hide_index=True)
+        st.caption("Cada execução também é gravada em logs/diagnostico.jsonl.")
+
+
+def _etapas(execucao):
+    return [
+        {
+            "Etapa": " " * trecho.nivel + trecho.nome,
+            "Tempo (s)": trecho.segundos,
+            "CPU (s)": trecho.cpu_segundos,
+            "Pico (MB)": trecho.pico_mb,
+            "Linhas": trecho.linhas,
+            "Páginas": trecho.paginas,
+        }
+        for trecho in execucao.trechos
+    ]
+
+
+def acompanhar_tarefa(tarefa, texto):
+    """Mostra uma tarefa em segundo plano e devolve o resultado dela quando
+    estiver concluída (senão, None).
+
+    Enquanto ela roda, só a barra de progresso é atualizada a cada
+    ``INTERVALO_TAREFAS``; ao terminar, a página inteira é refeita. Se a tarefa
+    falhou ou foi cancelada, um botão a descarta para que possa ser refeita.
+    """
+    if tarefa.ativa:
+        _progresso_da_tarefa(tarefa.id, texto)
+        return None
+    attach_run(tarefa.diagnostico)
+    if tarefa.estado == CONCLUIDA:
+        return tarefa.resultado
+
+    if tarefa.estado == CANCELADA:
+        st.info("✖️ Processamento cancelado.")
+    else:
+        st.error(f"❌ Erro no processamento: {tarefa.erro}")
+    if st.button("🔁 Processar de novo", key=f"refazer-{tarefa.id}"):
+        tarefas.forget(tarefa.chave)
+        st.rerun()
+    return None
+
+
+@st.fragment(run_every=INTERVALO_TAREFAS)
+def _progresso_da_tarefa(id_tarefa, texto):
+    tarefa = tarefas.get(id_tarefa)
+    if tarefa is None or not tarefa.ativa:
+        st.rerun()  # terminou: a página inteira mostra o resultado
+
+    if tarefa.estado == ESPERANDO:
+        posicao = tarefa.posicao
+        fila = f"{posicao}º na fila do servidor" if posicao else "aguardando a vez"
+        st.progress(0.0, text=f"{texto} ({fila})")
+    else:
+        contagem = f" {tarefa.concluidos}/{tarefa.total}" if tarefa.total else ""
+        st.progress(tarefa.fracao, text=f"{texto}{contagem} · {tarefa.segundos:.0f} s")
+    st.caption(
+        "⏳ O processamento continua em segundo plano: pode mexer na página "
+        "ou trocar de menu e voltar depois."
+    )
+    # Só as tarefas que informam o progresso param no meio
+    if tarefa.total and st.button("✖️ Cancelar", key=f"cancelar-{id_tarefa}"):
+        tarefa.cancelar()
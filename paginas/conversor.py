@@ -0,0 +1,197 @@
+import streamlit as st
+
+from paginas.comum import acompanhar_tarefa
+from processamento.agendador import FATOR_IMAGEM, FATOR_PDF, memory_budget
+from processamento.cache import hash_do_arquivo
+from processamento.conversor import (
+    DPI_PADRAO,
+    FORMATOS_IMAGEM,
+    FORMATOS_PAGINA,
+    OPCOES_DPI,
+    OPCOES_TAMANHO,
+    QUALIDADE_PADRAO,
+    cached_pages_zip,
+    chave_das_imagens,
+    convert_images,
+    count_pages,
+    imagens_cache,
+    parse_page_selection,
+    render_pages_to_zip,
+    store_pages_zip,
+    thumbnails,
+    variante_da_conversao,
+)
+from processamento.tarefas import tarefas
+
+
+# 🟢 MENU "CONVERSOR DE IMAGENS"
+def render():
+    st.title("🖼️ Conversor de Arquivos")
+
+    # Opção de envio de arquivos (vários de uma vez)
+    uploaded_files = st.file_uploader(
+        "📂 Selecione um ou mais arquivos para conversão",
+        type=["png", "jpg", "jpeg", "pdf"],
+        accept_multiple_files=True,
+    )
+
+    # Verificar se o usuário enviou arquivos
+    if uploaded_files:
+        # Separar pelo tipo de arquivo
+        pdfs = [f for f in uploaded_files if f.name.lower().endswith(".pdf")]
+        imagens = [f for f in uploaded_files if f not in pdfs]
+
+        # 🟢 CONVERSÃO PARA IMAGENS (SE FOR UM PDF)
+        if pdfs:
+            st.subheader("Conversão de PDF para Imagens")
+
+            uploaded_pdf = pdfs[0]
+            if len(pdfs) > 1:
+                uploaded_pdf = st.selectbox(
+                    "PDF a converter:", pdfs, format_func=lambda f: f.name
+                )
+            converter_pdf(uploaded_pdf)
+
+        # 🟢 CONVERSÃO DE IMAGENS PARA VÁRIOS FORMATOS E PDF
+        if imagens:
+            st.subheader("Conversão de Imagens")
+
+            converter_imagens(imagens)
+
+
+def converter_imagens(imagens):
+    col1, col2 = st.columns(2)
+    # Seleção de formatos de conversão, incluindo "JPEG" e "JPG"
+    formato_destino = col1.selectbox(
+        "Escolha o formato para conversão:", list(FORMATOS_IMAGEM)
+    )
+    tamanho = col2.selectbox(
+        "Tamanho máximo (maior lado):",
+        list(OPCOES_TAMANHO),
+        help="Fotos JPEG grandes são lidas já reduzidas, o que é bem mais rápido.",
+    )
+    if formato_destino == "PDF" and len(imagens) > 1:
+        st.caption("📄 As imagens vão para um único PDF, uma por página.")
+
+    chave = chave_das_imagens(
+        [hash_do_arquivo(f) for f in imagens], formato_destino, OPCOES_TAMANHO[tamanho]
+    )
+    resultado = imagens_cache.get(chave)
+    rotulo = "Converter Imagem" if len(imagens) == 1 else "Converter Imagens"
+    if resultado is None:
+        # Como a renderização do PDF, roda em segundo plano e espera a vez no
+        # agendador: um lote de fotos grandes ocupa bastante CPU e memória
+        tarefa = tarefas.find(f"imagens|{chave}")
+        if tarefa is None and st.button(rotulo):
+            tarefa = tarefas.submit(
+                f"imagens|{chave}",
+                rotulo,
+                converter,
+                [(f.name, f.getvalue()) for f in imagens],
+                formato_destino,
+                OPCOES_TAMANHO[tamanho],
+                chave,
+                total=len(imagens),
+                memoria_mb=memory_budget(sum(f.size for f in imagens), FATOR_IMAGEM),
+            )
+        if tarefa is not None:
+            resultado = acompanhar_tarefa(tarefa, "Convertendo imagens...")
+
+    if resultado is not None:
+        for erro in resultado.erros:
+            st.warning(f"⚠️ Erro ao converter imagem: {erro}")
+
+        if resultado.convertidas:
+            st.success(
+                f"✅ {resultado.convertidas} imagem(ns) convertida(s) para "
+                f"{formato_destino.upper()} com sucesso!"
+            )
+            st.caption(f"⏱️ {resultado.segundos:.1f} s")
+
+            # Botão para download
+            st.download_button(
+                label=f"📥 Baixar {resultado.nome.rsplit('.', 1)[-1].upper()}",
+                data=resultado.conteudo,
+                file_name=resultado.nome,
+                mime=resultado.mime,
+            )
+
+
+def converter_pdf(uploaded_file):
+    pdf_bytes = uploaded_file.getvalue()
+    hash_pdf = hash_do_arquivo(uploaded_file)
+    try:
+        total = count_pages(pdf_bytes)
+    except Exception as e:
+        st.error(f"⚠️ Erro ao abrir o PDF: {e}")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    selecao = col1.text_input(
+        f"Páginas (1 a {total})", placeholder="Todas (ex.: 1-3, 5, 8-)"
+    )
+    dpi = col2.select_slider("Resolução (DPI)", OPCOES_DPI, value=DPI_PADRAO)
+    formato = col3.selectbox("Formato", list(FORMATOS_PAGINA))
+    qualidade = QUALIDADE_PADRAO
+    if formato == "JPEG":
+        qualidade = st.slider("Qualidade do JPEG", 30, 100, QUALIDADE_PADRAO)
+
+    try:
+        paginas = parse_page_selection(selecao, total)
+    except ValueError as erro:
+        st.error(f"⚠️ {erro}")
+        return
+
+    with st.expander(f"👀 Pré-visualização ({len(paginas)} páginas escolhidas)"):
+        miniaturas = thumbnails(pdf_bytes, hash_pdf, paginas)
+        st.image(
+            [imagem for _, imagem in miniaturas],
+            caption=[f"Página {numero + 1}" for numero, _ in miniaturas],
+        )
+
+    # O ZIP fica em cache: os reruns (como o clique no download) não
+    # renderizam o PDF de novo. A renderização roda em segundo plano, então
+    # mexer em outro widget no meio dela não a reinicia
+    saida = cached_pages_zip(hash_pdf, paginas, dpi, formato, qualidade)
+    if saida is None:
+        chave = f"paginas|{hash_pdf}|{variante_da_conversao(paginas, dpi, formato, qualidade)}"
+        tarefa = tarefas.find(chave)
+        if tarefa is None and st.button("Converter PDF para Imagens"):
+            tarefa = tarefas.submit(
+                chave,
+                "Converter PDF para imagens",
+                renderizar,
+                pdf_bytes,
+                hash_pdf,
+                paginas,
+                dpi,
+                formato,
+                qualidade,
+                total=len(paginas),
+                memoria_mb=memory_budget(len(pdf_bytes), FATOR_PDF),
+            )
+        if tarefa is not None:
+            saida = acompanhar_tarefa(tarefa, "Renderizando páginas...")
+
+    if saida is not None:
+        st.success("✅ PDF convertido para imagens com sucesso!")
+        st.download_button(
+            label=f"📥 Baixar {len(saida.nomes)} páginas (ZIP)",
+            data=saida.getvalue,
+            file_name=f"{uploaded_file.name.rsplit('.', 1)[0]}_paginas.zip",
+            mime="application/zip",
+        )
+
+
+def converter(tarefa, arquivos, formato, tamanho_maximo, chave):
+    """Tarefa em segundo plano que converte as imagens e guarda o resultado no cache."""
+    resultado = convert_images(arquivos, formato, tamanho_maximo, tarefa.progresso)
+    imagens_cache.put(chave, resultado)
+    return resultado
+
+
+def renderizar(tarefa, pdf_bytes, hash_pdf, paginas, dpi, formato, qualidade):
+    """Tarefa em segundo plano que renderiza as páginas e guarda o ZIP no cache."""
+    saida = render_pages_to_zip(pdf_bytes, paginas, dpi, formato, qualidade, tarefa.progresso)
+    store_pages_zip(hash_pdf, paginas, dpi, formato, qualidade, saida)
+    return saida
@@ -0,0 +1,140 @@
+import streamlit as st
+
+from paginas.comum import (
+    FONTE_HISTORICO,
+    escolher_fonte,
+    mostrar_estatisticas_cache,
+    mostrar_resumo_historico,
+    salvar_no_historico,
+    tabela_paginada,
+)
+from processamento.cache import hash_do_arquivo, parse_cache
+from processamento.crm import (
+    ATIVO,
+    INATIVO,
+    JANELAS_PADRAO,
+    VendorIndex,
+    classify_activity,
+    coluna_notas,
+    coluna_total,
+    referencia,
+)
+from processamento.diagnostico import span
+from processamento.exportacao import FORMATO_CONTABIL
+from processamento.historico import historico
+from processamento.ingestao import COLUNAS_CRM, read_columns
+
+
+def render():
+    st.title("📊 CRM de Clientes - Ativos e Inativos")
+    fonte = escolher_fonte("crm")
+
+    df = None
+    origem = None
+    if fonte == FONTE_HISTORICO:
+        # Notas já gravadas no banco local, sem reenviar a planilha
+        mostrar_resumo_historico()
+        if historico.stats()["notas"]:
+            origem = f"historico|{historico.version()}"
+            df = parse_cache.get_or_compute(
+                origem, historico.read_invoices, "historico-notas", persistir=False
+            )
+        else:
+            st.info("ℹ️ O histórico está vazio: envie uma planilha e salve as notas nele.")
+            return
+    else:
+        uploaded_file = st.file_uploader(
+            "📂 Envie a planilha Excel", type=["xlsx", "xls"], key="crm"
+        )
+        if uploaded_file:
+            st.session_state.uploaded_file_crm = uploaded_file
+
+        if st.session_state.uploaded_file_crm:
+            # Só as quatro colunas usadas, com as datas já convertidas na leitura
+            try:
+                df = read_columns(st.session_state.uploaded_file_crm, COLUNAS_CRM)
+                origem = hash_do_arquivo(st.session_state.uploaded_file_crm)
+            except ValueError as erro:
+                st.error(f"⚠️ {erro}")
+            salvar_no_historico([st.session_state.uploaded_file_crm], "crm")
+            mostrar_estatisticas_cache()
+
+    if df is not None:
+        hoje = referencia()
+
+        # Índice por vendedor montado uma vez por planilha (e por dia): trocar
+        # de vendedor ou de limiar não volta a percorrer as notas
+        with span("índice por vendedor", linhas=len(df)):
+            indice = parse_cache.get_or_compute(
+                origem,
+                lambda: VendorIndex(df, JANELAS_PADRAO, hoje),
+                f"crm-indice|{hoje.date()}|{JANELAS_PADRAO}",
+                persistir=False,
+            )
+
+        vendedores_selecionados = st.multiselect(
+            "Selecione os Vendedores", indice.vendedores, placeholder="Todos"
+        )
+        limiar = st.select_slider(
+            "Considerar ativo quem comprou nos últimos (dias):",
+            options=list(JANELAS_PADRAO),
+            value=90,
+        )
+
+        resumo = indice.clientes(vendedores_selecionados)
+        clientes = resumo[
+            ["CLIENTES", "ULTIMA_COMPRA", coluna_notas(limiar), coluna_total(limiar)]
+        ].assign(**{"SITUAÇÃO": classify_activity(resumo, limiar, hoje)})
+
+        st.markdown("### 📋 Dados dos Clientes")
+        # Busca, filtro e ordenação no servidor; só a página visível é
+        # formatada e enviada ao navegador
+        tabela_paginada(
+            clientes,
+            "crm-clientes",
+            formatos={
+                "ULTIMA_COMPRA": "%d/%m/%Y",
+                coluna_total(limiar): "R$ {:,.2f}",
+            },
+            filtros=("SITUAÇÃO",),
+            nome_exportacao="clientes_crm",
+            formatos_xlsx={coluna_total(limiar): FORMATO_CONTABIL},
+        )
+
+        ativos = clientes[clientes["SITUAÇÃO"] == ATIVO].shape[0]
+        inativos = clientes[clientes["SITUAÇÃO"] == INATIVO].shape[0]
+
+        with span("gráfico"):
+            # Importado aqui para não pesar na inicialização das outras páginas
+            import plotly.express as px
+
+            fig = px.pie(
+                values=[ativos, inativos],
+                names=["Ativos", "Inativos"],
+                title="Distribuição de Clientes",
+            )
+            st.plotly_chart(fig)
+
+        st.success(f"✅ Clientes Ativos: {ativos}")
+        st.error(f"❌ Clientes Inativos: {inativos}")
+
+        # Comparação entre vendedores, montada com os resumos já calculados
+        if len(vendedores_selecionados) > 1:
+            st.markdown("### 🆚 Comparativo entre Vendedores")
+            comparativo = indice.comparativo(vendedores_selecionados, limiar)
+            st.dataframe(
+                comparativo.style.format({coluna_total(limiar): "R$ {:,.2f}".format}),
+                hide_index=True,
+            )
+
+            fig = px.bar(
+                comparativo,
+                x="VENDEDOR",
+                y=["ATIVOS", "INATIVOS"],
+                barmode="group",
+                color_discrete_sequence=["#fc630b", "gray"],
+                title="Clientes Ativos e Inativos por Vendedor",
+            )
+            st.plotly_chart(fig)
+    else:
+        st.warning("⚠️ Por favor, envie um arquivo Excel para visualizar os dados.")
@@ -0,0 +1,93 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+
+from paginas.comum import acompanhar_tarefa, botoes_de_exportacao
+from processamento.agendador import (
+    FATOR_PDF,
+    discard_pool,
+    memory_budget,
+    process_pool,
+)
+from processamento.cache import hash_do_arquivo
+from processamento.conversor import count_pages
+from processamento.exportacao import FORMATO_CONTABIL
+from processamento.extrato_ml import (
+    MINIMO_PAGINAS_PARALELO,
+    MOTOR_POSICAO,
+    MOTORES,
+    parse_ml_statement,
+)
+from processamento.tarefas import tarefas
+
+
+# 🟢 FUNÇÃO "CONTABILIDADE - EXTRATO ML"
+def render():
+    st.title("📘 Contabilidade - Extrato Mercado Livre")
+
+    uploaded_pdf = st.file_uploader("📂 Envie o arquivo PDF do extrato ML", type=["pdf"])
+
+    motor = st.selectbox(
+        "Motor de extração",
+        MOTORES,
+        help=f"{MOTOR_POSICAO}: separa as colunas pela posição de cada palavra "
+        "na página (se a tabela não for reconhecida, o texto corrido é usado).",
+    )
+    paralelo = st.checkbox(
+        "⚡ Ler extratos grandes em paralelo",
+        value=True,
+        help=f"Extratos a partir de {MINIMO_PAGINAS_PARALELO} páginas são "
+        "divididos em faixas lidas por vários processos.",
+    )
+
+    if uploaded_pdf:
+        # A leitura roda em segundo plano e o resultado fica na tarefa: os
+        # reruns (downloads, outros widgets) não leem o PDF de novo
+        chave = f"extrato-ml|{hash_do_arquivo(uploaded_pdf)}|{motor}|{paralelo}"
+        tarefa = tarefas.find(chave)
+        if tarefa is None:
+            pdf_bytes = uploaded_pdf.getvalue()
+            tarefa = tarefas.submit(
+                chave,
+                "Extrato ML",
+                ler_extrato,
+                pdf_bytes,
+                paralelo,
+                motor,
+                memoria_mb=memory_budget(len(pdf_bytes), FATOR_PDF),
+            )
+        resultado = acompanhar_tarefa(tarefa, "Lendo o extrato...")
+        if resultado is None:
+            return
+
+        df, erros = resultado
+
+        for erro in erros:
+            st.warning(f"⚠️ {erro}")
+
+        if not df.empty:
+            st.success("✅ Transações extraídas com sucesso!")
+            st.dataframe(df)
+
+            # Download em Excel, CSV ou Parquet
+            botoes_de_exportacao(
+                df,
+                "extrato_mercado_livre",
+                formatos={"Valor": FORMATO_CONTABIL, "Saldo": FORMATO_CONTABIL},
+            )
+        else:
+            st.info("Nenhuma transação encontrada no PDF.")
+
+
+def ler_extrato(tarefa, pdf_bytes, paralelo, motor):
+    """Tarefa em segundo plano com a leitura do extrato. Extratos grandes são
+    divididos em faixas pelo próprio ``parse_ml_statement``; os demais vão
+    inteiros para um processo do pool compartilhado, fora do GIL do servidor."""
+    if paralelo and count_pages(pdf_bytes) >= MINIMO_PAGINAS_PARALELO:
+        return parse_ml_statement(pdf_bytes, paralelo, motor=motor)
+    pool = process_pool()
+    try:
+        return pool.submit(parse_ml_statement, pdf_bytes, False, motor=motor).result()
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
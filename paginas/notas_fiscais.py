@@ -0,0 +1,188 @@
+import tempfile
+from collections import Counter
+from io import BytesIO
+
+import pandas as pd
+import streamlit as st
+
+from paginas.comum import acompanhar_tarefa
+from processamento.agendador import memory_budget
+from processamento.cache import hash_do_arquivo
+from processamento.notas_fiscais import (
+    METODO_CABECALHO,
+    METODO_COMPLETO,
+    cached_batch,
+    caminho_do_lote,
+    chave_do_lote,
+    count_pdfs_in_zip,
+    iter_pdfs_from_zip,
+    rename_batch_to_zip,
+    resultados_cache,
+    store_batch,
+)
+from processamento.tarefas import tarefas
+
+# Acima disso os PDFs são escolhidos em uma lista em vez de um botão por arquivo
+LIMITE_BOTOES_INDIVIDUAIS = 20
+
+
+# 🟢 MENU "RENOMEAR NOTAS FISCAIS"
+def render():
+    st.title("📑 Renomeador de Notas Fiscais")
+
+    # Opção de envio: ZIP ou PDFs individuais
+    tipo_upload = st.radio(
+        "Escolha como enviar os arquivos:", ["ZIP com PDFs", "Arquivos PDF individuais"]
+    )
+
+    uploaded_zip = uploaded_pdfs = None
+
+    if tipo_upload == "ZIP com PDFs":
+        uploaded_zip = st.file_uploader("📂 Envie um arquivo ZIP", type=["zip"])
+
+    elif tipo_upload == "Arquivos PDF individuais":
+        uploaded_pdfs = st.file_uploader(
+            "📂 Selecione um ou mais PDFs", type=["pdf"], accept_multiple_files=True
+        )
+
+    rapido = st.checkbox(
+        "⚡ Modo rápido (ler só o cabeçalho da 1ª página)",
+        value=True,
+        help="Se o cabeçalho não trouxer emitente e número, a nota inteira é lida.",
+    )
+
+    # Processamento dos arquivos enviados
+    if uploaded_zip or uploaded_pdfs:
+        # Cada clique em um botão de download refaz a página; o lote já
+        # processado (nomes e ZIP de saída) é reaproveitado pelo conteúdo enviado
+        if uploaded_zip:
+            chave = chave_do_lote([hash_do_arquivo(uploaded_zip)], rapido)
+        else:
+            chave = chave_do_lote(map(hash_do_arquivo, uploaded_pdfs), rapido)
+
+        lote = cached_batch(chave)
+        if lote is None:
+            # O lote roda em segundo plano: um rerun no meio (um clique na
+            # barra lateral) volta a acompanhar o mesmo lote em vez de recomeçar
+            tarefa = tarefas.find(chave)
+            if tarefa is None:
+                if uploaded_zip:
+                    # Uma cópia própria: a página continua lendo o upload
+                    zip_file = BytesIO(uploaded_zip.getvalue())
+                    total = count_pdfs_in_zip(uploaded_zip)
+                    tamanho = uploaded_zip.size
+                else:
+                    zip_file, total = None, len(uploaded_pdfs)
+                    tamanho = sum(file.size for file in uploaded_pdfs)
+                tarefa = tarefas.submit(
+                    chave,
+                    "Renomear notas fiscais",
+                    processar,
+                    zip_file,
+                    uploaded_pdfs,
+                    rapido,
+                    chave,
+                    total=total,
+                    memoria_mb=memory_budget(tamanho, 2),  # o envio e a cópia do ZIP
+                )
+            lote = acompanhar_tarefa(tarefa, "Processando arquivos...")
+            if lote is None:
+                return
+
+        mostrar_lote(lote, rapido)
+
+
+def processar(tarefa, zip_file, uploaded_pdfs, rapido, chave):
+    """Tarefa em segundo plano que renomeia o lote e o guarda no cache."""
+    # Os PDFs do ZIP são descompactados um por vez para esta pasta e apagados
+    # assim que entram no ZIP de saída
+    with tempfile.TemporaryDirectory() as pasta:
+        if zip_file:
+            pdfs = iter_pdfs_from_zip(zip_file, pasta)
+        else:
+            pdfs = ((file.name, file.getvalue()) for file in uploaded_pdfs)
+        lote = rename_batch_to_zip(pdfs, caminho_do_lote(chave), rapido, tarefa.progresso)
+    store_batch(chave, lote)
+    return lote
+
+
+def mostrar_lote(lote, rapido):
+    resultados = lote.resultados
+    saida = lote.arquivo
+
+    for resultado in resultados:
+        if not resultado.novo_nome:
+            st.warning(f"⚠️ Não foi possível renomear: {resultado.nome_original}")
+
+    do_cache = sum(r.do_cache for r in resultados)
+    st.caption(
+        f"⏱️ {len(resultados)} arquivos em {lote.segundos:.1f} s "
+        f"({len(resultados) / max(lote.segundos, 1e-9):.1f} arquivos/s, "
+        f"{do_cache} já conhecidos pelo cache)"
+    )
+
+    # Quantas notas cada caminho de extração resolveu
+    metodos = Counter(r.metodo for r in resultados if r.metodo)
+    if rapido:
+        st.caption(
+            f"⚡ Cabeçalho da 1ª página: {metodos[METODO_CABECALHO]} · "
+            f"documento completo: {metodos[METODO_COMPLETO]} · "
+            f"não renomeados: {len(resultados) - sum(metodos.values())}"
+        )
+    stats = resultados_cache.stats()
+    st.sidebar.caption(
+        f"🗃️ Cache de notas: {stats['hits_memoria']} acertos, "
+        f"{stats['misses']} notas processadas ({stats['itens_em_memoria']} em memória)"
+    )
+
+    with st.expander("⏱️ Tempo por arquivo"):
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Arquivo": [r.nome_original for r in resultados],
+                    "Novo nome": [r.novo_nome or "" for r in resultados],
+                    "Extraído do": [r.metodo or "" for r in resultados],
+                    "Segundos": [round(r.segundos, 3) for r in resultados],
+                }
+            ).sort_values("Segundos", ascending=False),
+            hide_index=True,
+        )
+
+    # Exibir lista de arquivos renomeados. Os downloads recebem funções, então
+    # cada PDF (ou o ZIP) só é lido do arquivo de saída quando é clicado
+    if saida.nomes:
+        st.success("✅ PDFs renomeados com sucesso!")
+        st.write("### 📋 Arquivos disponíveis para download:")
+
+        if len(saida.nomes) <= LIMITE_BOTOES_INDIVIDUAIS:
+            for file_name in saida.nomes:
+                col1, col2 = st.columns([4, 1])
+                col1.write(f"📄 {file_name}")  # Exibir nome do arquivo
+                col2.download_button(
+                    label="📥 Baixar",
+                    data=lambda nome=file_name: saida.read(nome),
+                    file_name=file_name,
+                    mime="application/pdf",
+                )
+        else:
+            col1, col2 = st.columns([4, 1])
+            file_name = col1.selectbox(
+                f"📄 {len(saida.nomes)} arquivos renomeados", saida.nomes
+            )
+            col2.download_button(
+                label="📥 Baixar",
+                data=lambda: saida.read(file_name),
+                file_name=file_name,
+                mime="application/pdf",
+            )
+
+        st.markdown("### 📂 Baixar todos os arquivos:")
+        st.download_button(
+            label="📥 Baixar Tudo (ZIP)",
+            data=saida.getvalue,
+            file_name="Notas_Renomeadas.zip",
+            mime="application/zip",
+        )
+
+    else:
+        st.error("⚠️ Nenhum arquivo foi renomeado.")
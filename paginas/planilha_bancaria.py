@@ -0,0 +1,79 @@
+import streamlit as st
+
+from paginas.comum import botoes_de_exportacao, mostrar_estatisticas_cache
+from processamento.planilha_bancaria import (
+    COLUNAS_VALOR,
+    OPCOES_XLSX,
+    format_brl,
+    process_bank_statement,
+)
+
+
+# 🟢 FUNÇÃO "ORGANIZAÇÃO PLANILHA BANCÁRIA"
+def render():
+    st.title("📑 Organização de Planilha Bancária")
+
+    uploaded_file = st.file_uploader(
+        "📂 Selecione uma planilha bancária", type=["xls", "xlsx"], key="bancaria"
+    )
+
+    if uploaded_file:
+        st.session_state.uploaded_file_bancaria = uploaded_file
+
+    # Se o arquivo foi enviado, processa
+    if st.session_state.uploaded_file_bancaria:
+        with st.spinner("Processando a planilha..."):
+            try:
+                df_processed, layout = process_bank_statement(
+                    st.session_state.uploaded_file_bancaria
+                )
+            except ValueError as erro:
+                st.error(f"⚠️ {erro}")
+                return
+
+            st.success("✅ Planilha processada com sucesso!")
+            st.caption(f"🏦 Layout detectado: {layout.nome}")
+            mostrar_estatisticas_cache()
+
+            # Exibir a tabela processada
+            st.write("### 📊 Dados Processados")
+            st.dataframe(
+                df_processed,
+                column_config={
+                    coluna: st.column_config.NumberColumn(format="R$ %.2f")
+                    for coluna in COLUNAS_VALOR
+                },
+            )
+
+            # Calcular totais e diferença
+            total = df_processed.loc[df_processed["Historico"] == "TOTAL"].iloc[0]
+            diferenca = df_processed.loc[
+                df_processed["Historico"].str.startswith("DIFERENÇA", na=False),
+                "Valor Crédito",
+            ].iloc[0]
+
+            # Exibir totais de forma visual
+            st.write("### 📈 Resumo Financeiro")
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.metric(
+                    label="💰 Total Crédito", value=format_brl(total["Valor Crédito"])
+                )
+
+            with col2:
+                st.metric(
+                    label="📉 Total Débito", value=format_brl(total["Valor Débito"])
+                )
+
+            with col3:
+                st.metric(
+                    label="🔍 Diferença (Crédito - Débito)",
+                    value=format_brl(diferenca),
+                )
+
+            # Disponibilizar o download da planilha processada (e em CSV/Parquet);
+            # o Excel só é gravado no clique
+            botoes_de_exportacao(
+                df_processed, "Planilha_Bancaria_Processada", **OPCOES_XLSX
+            )
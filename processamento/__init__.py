@@ -0,0 +1,5 @@
+"""Lógica de processamento usada pelas páginas.
+
+Os módulos deste pacote não dependem do Streamlit, o que permite reutilizá-los
+em scripts e rodá-los fora do app.
+"""
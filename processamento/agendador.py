@@ -0,0 +1,225 @@
+"""Controle de admissão dos trabalhos pesados do servidor inteiro.
+
+O Streamlit roda cada sessão em uma thread do mesmo processo. Sem controle,
+várias pessoas lendo planilhas grandes ou convertendo PDFs ao mesmo tempo
+disputam o GIL e a memória, e o app fica lento para todo mundo. Aqui:
+
+* no máximo ``MAX_PESADAS`` trabalhos pesados rodam ao mesmo tempo; os outros
+  esperam em uma fila por ordem de chegada, com a posição visível;
+* cada trabalho reserva uma estimativa da memória que vai usar
+  (``memory_budget``) e só entra se a soma das reservas couber em
+  ``MEMORIA_MB``;
+* o trabalho que roda em processos (renomeador, leitura do extrato ML) usa um
+  único pool compartilhado (``process_pool``), em vez de cada sessão subir o
+  seu. Com ``CRM_MEMORIA_PROCESSO_MB``, cada processo do pool tem a memória
+  limitada pelo sistema e um trabalho que passe disso falha sozinho, sem
+  derrubar o servidor.
+
+``Agendador.admit`` é reentrante na mesma thread: um trabalho já admitido não
+espera de novo por uma etapa interna. Quem espera pode ser avisado da posição
+na fila (``ao_esperar``, ou ``on_wait`` para todo um trecho de código).
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+# Processos do pool compartilhado (padrão: um por núcleo)
+MAX_PROCESSOS = int(os.environ.get("CRM_MAX_PROCESSOS", os.cpu_count() or 1))
+
+
+def _memoria_fisica_mb():
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 1024**2
+    except (AttributeError, ValueError, OSError):  # Windows
+        return 8 * 1024
+
+
+# Trabalhos pesados ao mesmo tempo e memória total reservável (padrão: metade da RAM)
+MAX_PESADAS = int(os.environ.get("CRM_MAX_PESADAS", 2))
+MEMORIA_MB = int(os.environ.get("CRM_MEMORIA_MB", _memoria_fisica_mb() // 2))
+# Limite de memória de cada processo do pool (0 = sem limite)
+MEMORIA_PROCESSO_MB = int(os.environ.get("CRM_MEMORIA_PROCESSO_MB", 0))
+
+# Memória estimada de um trabalho: uma base mais um múltiplo do arquivo de entrada
+MEMORIA_BASE_MB = 64
+FATOR_EXCEL = 30  # o DataFrame lido ocupa dezenas de vezes o .xlsx compactado
+FATOR_PDF = 10
+FATOR_IMAGEM = 10  # uma foto decodificada ocupa umas dez vezes o JPEG
+
+# Segundos entre as conferências de quem está na fila
+INTERVALO_FILA = 0.5
+
+_ao_esperar_atual = ContextVar("ao_esperar_fila", default=None)
+_admitido = threading.local()
+
+
+def memory_budget(tamanho_bytes=0, fator=1):
+    """Reserva de memória (MB) de um trabalho sobre ``tamanho_bytes`` de entrada."""
+    return MEMORIA_BASE_MB + tamanho_bytes * fator / 1024 / 1024
+
+
+@dataclass
+class Pedido:
+    ticket: str
+    nome: str
+    memoria_mb: float
+
+
+class Agendador:
+    """Fila por ordem de chegada com vagas e memória limitadas."""
+
+    def __init__(self, max_simultaneas=MAX_PESADAS, memoria_mb=MEMORIA_MB):
+        self.max_simultaneas = max_simultaneas
+        self.memoria_mb = memoria_mb
+        self._fila = []  # Pedidos esperando, na ordem de chegada
+        self._executando = {}  # ticket -> Pedido
+        self._tickets = itertools.count(1)
+        self._condicao = threading.Condition()
+
+    @contextmanager
+    def admit(self, nome, memoria_mb=0, ticket=None, ao_esperar=None):
+        """Espera a vez de rodar o bloco e libera a vaga ao sair.
+
+        ``ao_esperar(posicao)`` é chamada fora do lock a cada
+        ``INTERVALO_FILA`` enquanto o pedido espera e com 0 quando a espera
+        termina; uma exceção levantada por ela (ex.: tarefa cancelada) tira o
+        pedido da fila.
+        """
+        if getattr(_admitido, "ativo", False):
+            yield None
+            return
+
+        # Um trabalho maior que a memória toda ainda roda, mas sozinho
+        pedido = Pedido(
+            ticket or f"p{next(self._tickets)}", nome, min(memoria_mb, self.memoria_mb)
+        )
+        ao_esperar = ao_esperar or _ao_esperar_atual.get()
+        esperou = self._esperar(pedido, ao_esperar)
+        _admitido.ativo = True
+        try:
+            if esperou and ao_esperar:
+                ao_esperar(0)
+            yield pedido
+        finally:
+            _admitido.ativo = False
+            with self._condicao:
+                del self._executando[pedido.ticket]
+                self._condicao.notify_all()
+
+    def _esperar(self, pedido, ao_esperar):
+        esperou = False
+        with self._condicao:
+            self._fila.append(pedido)
+        try:
+            while True:
+                with self._condicao:
+                    if self._cabe(pedido):
+                        self._fila.remove(pedido)
+                        self._executando[pedido.ticket] = pedido
+                        break
+                    posicao = self._fila.index(pedido) + 1
+                esperou = True
+                if ao_esperar:
+                    ao_esperar(posicao)
+                with self._condicao:
+                    self._condicao.wait_for(lambda: self._cabe(pedido), INTERVALO_FILA)
+        except BaseException:
+            with self._condicao:
+                if pedido in self._fila:
+                    self._fila.remove(pedido)
+                self._condicao.notify_all()
+            raise
+        return esperou
+
+    def _cabe(self, pedido):
+        # Ninguém fura a fila: um trabalho grande não espera para sempre
+        # atrás de vários pequenos
+        em_uso = sum(p.memoria_mb for p in self._executando.values())
+        return (
+            self._fila[0] is pedido
+            and len(self._executando) < self.max_simultaneas
+            and (not self._executando or em_uso + pedido.memoria_mb <= self.memoria_mb)
+        )
+
+    def position(self, ticket):
+        """Posição (a partir de 1) do pedido na fila; 0 se não está esperando."""
+        with self._condicao:
+            for posicao, pedido in enumerate(self._fila, start=1):
+                if pedido.ticket == ticket:
+                    return posicao
+        return 0
+
+    def stats(self):
+        with self._condicao:
+            return {
+                "executando": len(self._executando),
+                "na_fila": len(self._fila),
+                "memoria_reservada_mb": round(
+                    sum(p.memoria_mb for p in self._executando.values())
+                ),
+                "memoria_mb": self.memoria_mb,
+            }
+
+
+@contextmanager
+def on_wait(ao_esperar):
+    """Usa ``ao_esperar(posicao)`` em toda espera na fila dentro do bloco."""
+    token = _ao_esperar_atual.set(ao_esperar)
+    try:
+        yield
+    finally:
+        _ao_esperar_atual.reset(token)
+
+
+def _limitar_memoria(memoria_mb):
+    # Roda em cada processo novo do pool
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    _, maximo = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (memoria_mb * 1024 * 1024, maximo))
+
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def process_pool(max_workers=None):
+    """Pool de processos compartilhado por todas as sessões.
+
+    É criado no primeiro uso (com ``max_workers``, padrão ``MAX_PROCESSOS``) e
+    recriado depois que quem o usa o descarta com ``discard_pool``. "spawn"
+    porque o servidor do Streamlit tem várias threads, e fork de um processo
+    com threads pode travar os filhos.
+    """
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers or MAX_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limitar_memoria if MEMORIA_PROCESSO_MB else None,
+                initargs=(MEMORIA_PROCESSO_MB,) if MEMORIA_PROCESSO_MB else (),
+            )
+        return _pool
+
+
+def discard_pool(pool):
+    """Descarta o ``pool`` depois de um ``BrokenProcessPool`` (um processo
+    morreu, ex.: sem memória); o próximo ``process_pool`` cria outro."""
+    global _pool
+    with _lock_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Um só agendador por processo, compartilhado por todas as sessões
+agendador = Agendador()
@@ -0,0 +1,232 @@
+"""Cache das planilhas já lidas, compartilhado entre reruns e sessões.
+
+A chave é o SHA-256 do conteúdo enviado (mais as opções de leitura), então o
+mesmo arquivo enviado de novo — ou o mesmo upload a cada clique em um widget —
+não é lido outra vez pelo openpyxl. Os DataFrames ficam em um LRU limitado na
+memória e também são gravados em Parquet no disco, o que permite reaproveitá-los
+depois que o servidor reinicia. Sem o ``pyarrow`` instalado o cache funciona só
+em memória.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+from processamento.agendador import FATOR_EXCEL, agendador, memory_budget
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_PADRAO = os.path.join(RAIZ, ".cache", "planilhas")
+
+
+def sha256_bytes(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+class ParseCache:
+    """LRU de DataFrames em memória com cópia em Parquet no disco.
+
+    Os DataFrames devolvidos são compartilhados entre sessões e não devem ser
+    modificados no lugar (use ``assign``, filtros etc., que geram cópias).
+    """
+
+    def __init__(self, max_itens=8, diretorio=DIRETORIO_PADRAO, max_disco_mb=1024):
+        self.max_itens = max_itens
+        self.diretorio = diretorio
+        self.max_disco_bytes = max_disco_mb * 1024 * 1024
+        self._itens = OrderedDict()
+        # As sessões do Streamlit rodam em threads do mesmo processo
+        self._lock = threading.Lock()
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+
+    def get_or_parse(self, dados, parser, variante=""):
+        """Devolve o DataFrame de ``parser(dados)``, lendo-o só na primeira vez.
+
+        ``variante`` distingue leituras diferentes do mesmo arquivo (colunas,
+        dtypes, engine...).
+        """
+        return self.get_or_compute(
+            sha256_bytes(dados), lambda: parser(dados), variante
+        )
+
+    def get_or_compute(self, hash_conteudo, funcao, variante="", persistir=True):
+        """Como ``get_or_parse``, para quem já tem o hash do conteúdo e quer
+        guardar algo derivado dele (ex.: agregações feitas sobre a planilha).
+
+        Com ``persistir=False`` o resultado (que pode ser qualquer objeto, não
+        só um DataFrame) fica apenas no LRU em memória.
+        """
+        chave = self._chave(hash_conteudo, variante)
+
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.hits_memoria += 1
+                return self._itens[chave]
+
+        df = self._ler_do_disco(chave) if persistir else None
+        if df is not None:
+            with self._lock:
+                self.hits_disco += 1
+        else:
+            df = funcao()
+            with self._lock:
+                self.misses += 1
+            if persistir:
+                self._gravar_no_disco(chave, df)
+
+        self._guardar(chave, df)
+        return df
+
+    def get(self, hash_conteudo, variante=""):
+        """Consulta só a memória; devolve ``None`` (e conta uma falha) se o item
+        não estiver lá. Para quem calcula os valores em outro lugar (ex.: em um
+        pool de processos) e os guarda depois com ``put``."""
+        chave = self._chave(hash_conteudo, variante)
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.hits_memoria += 1
+                return self._itens[chave]
+            self.misses += 1
+            return None
+
+    def put(self, hash_conteudo, valor, variante=""):
+        self._guardar(self._chave(hash_conteudo, variante), valor)
+
+    def _chave(self, hash_conteudo, variante):
+        return sha256_bytes(f"{hash_conteudo}|{variante}".encode())
+
+    def _guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits_memoria": self.hits_memoria,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "itens_em_memoria": len(self._itens),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+    # Cópia em disco (Parquet)
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.parquet")
+
+    def _ler_do_disco(self, chave):
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(chave)
+        if not os.path.exists(caminho):
+            return None
+        try:
+            df = pd.read_parquet(caminho)
+            os.utime(caminho)  # marca como usado recentemente
+            return df
+        except Exception as e:
+            print(f"Erro ao ler cache de planilha: {e}")
+            return None
+
+    def _gravar_no_disco(self, chave, df):
+        if not self.diretorio:
+            return
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            # Sem pyarrow, ou colunas com tipos misturados que o Parquet não
+            # aceita: a planilha fica apenas no cache em memória
+            print(f"Cache de planilha não gravado em disco: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+        self._limitar_disco()
+
+    def _limitar_disco(self):
+        # Remove os arquivos usados há mais tempo até caber no limite
+        arquivos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(".parquet"):
+                info = os.stat(os.path.join(self.diretorio, nome))
+                arquivos.append((info.st_mtime, info.st_size, nome))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, nome in sorted(arquivos):
+            if total <= self.max_disco_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.diretorio, nome))
+            except OSError:
+                pass
+            total -= tamanho
+
+
+# Instância única por processo, compartilhada por todas as sessões
+parse_cache = ParseCache(
+    max_itens=int(os.environ.get("CRM_CACHE_ITENS", 8)),
+    diretorio=os.environ.get("CRM_CACHE_DIR", DIRETORIO_PADRAO),
+    max_disco_mb=int(os.environ.get("CRM_CACHE_DISCO_MB", 1024)),
+)
+
+
+def conteudo_do_arquivo(file):
+    """Bytes de um arquivo enviado pelo Streamlit (ou de qualquer file-like)."""
+    if isinstance(file, bytes):
+        return file
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+def hash_do_arquivo(file):
+    """SHA-256 do conteúdo de um arquivo enviado.
+
+    O hash fica guardado no próprio objeto do upload, que o Streamlit mantém
+    entre reruns, então o arquivo é percorrido uma única vez.
+    """
+    if isinstance(file, bytes):
+        return sha256_bytes(file)
+    digest = getattr(file, "_sha256_conteudo", None)
+    if digest is None:
+        digest = sha256_bytes(conteudo_do_arquivo(file))
+        try:
+            file._sha256_conteudo = digest
+        except AttributeError:
+            pass
+    return digest
+
+
+def read_excel_cached(file, preparar=None, **kwargs):
+    """``pd.read_excel`` com cache pelo conteúdo do arquivo e pelas opções.
+    A leitura de verdade (fora do cache) espera a vez no agendador.
+
+    ``preparar(df)`` é aplicada à planilha lida antes de ela ir para o cache
+    (ex.: deixar cada coluna com um só tipo, para que caiba no Parquet).
+    """
+    variante = "read_excel|" + repr(sorted(kwargs.items()))
+    if preparar is not None:
+        variante += f"|{preparar.__module__}.{preparar.__qualname__}"
+
+    def ler():
+        dados = conteudo_do_arquivo(file)
+        with agendador.admit("leitura de planilha", memory_budget(len(dados), FATOR_EXCEL)):
+            df = pd.read_excel(BytesIO(dados), **kwargs)
+        return df if preparar is None else preparar(df)
+
+    return parse_cache.get_or_compute(hash_do_arquivo(file), ler, variante)
@@ -0,0 +1,188 @@
+"""Normalização, validação e contagem de CNPJs/CPFs distintos.
+
+Os documentos chegam do ERP com e sem máscara ("12.345.678/0001-90" e
+"12345678000190") ou como número, sem os zeros à esquerda. Todos são reduzidos
+aos dígitos, têm os dígitos verificadores conferidos de forma vetorizada e
+viram uma chave ``int64``: o próprio número, com um bit a mais nos CPFs para
+que um CPF e um CNPJ com os mesmos dígitos não colidam.
+
+Cada arquivo é resumido uma única vez (chave e data da primeira nota); a
+união de vários arquivos é feita sobre esses resumos, então enviar mais um mês
+não relê os anteriores.
+"""
+
+import numpy as np
+import pandas as pd
+
+from processamento.diagnostico import medido
+
+TAMANHO_CPF = 11
+TAMANHO_CNPJ = 14
+BIT_CPF = np.int64(1) << 62
+
+# Datas guardadas como dias desde 1970; notas sem data usam este marcador
+SEM_DATA = np.iinfo(np.int64).max
+
+PESOS_CPF = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+PESOS_CNPJ = (
+    np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+    np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+)
+POTENCIAS_DE_10 = 10 ** np.arange(TAMANHO_CNPJ - 1, -1, -1, dtype=np.int64)
+
+
+def _matriz_de_digitos(documentos, tamanho):
+    """Matriz ``len(documentos) x tamanho`` com os dígitos de cada documento."""
+    if len(documentos) == 0:
+        return np.zeros((0, tamanho), dtype=np.int64)
+    texto = "".join(documentos.str.zfill(tamanho)).encode("ascii")
+    return (np.frombuffer(texto, dtype=np.uint8) - ord("0")).reshape(-1, tamanho).astype(
+        np.int64
+    )
+
+
+def _digito_verificador(digitos, pesos, modulo_cpf):
+    resto = (digitos[:, : len(pesos)] @ pesos) % 11
+    if modulo_cpf:
+        return (resto * 10 % 11) % 10
+    return np.where(resto < 2, 0, 11 - resto)
+
+
+def _validos(digitos, pesos, modulo_cpf):
+    if len(digitos) == 0:
+        return np.zeros(0, dtype=bool)
+    n = len(pesos[0])
+    ok = (_digito_verificador(digitos, pesos[0], modulo_cpf) == digitos[:, n]) & (
+        _digito_verificador(digitos, pesos[1], modulo_cpf) == digitos[:, n + 1]
+    )
+    # "000.000.000-00", "111.111.111-11"... passam na conta mas não existem
+    return ok & (digitos != digitos[:, :1]).any(axis=1)
+
+
+def _numero(digitos):
+    return digitos @ POTENCIAS_DE_10[-digitos.shape[1]:]
+
+
+def document_keys(documentos):
+    """Chaves ``int64`` dos documentos (Series de texto, com ou sem máscara).
+
+    Devolve ``(chaves, validos)``; documentos inválidos ficam com chave -1.
+    Até 11 dígitos, o documento é tratado como CPF quando os verificadores
+    batem e, senão, como CNPJ que perdeu os zeros à esquerda.
+    """
+    digitos = documentos.fillna("").astype("str").str.replace(r"\D", "", regex=True)
+    tamanhos = digitos.str.len().to_numpy()
+    chaves = np.full(len(digitos), -1, dtype=np.int64)
+
+    candidatos_cpf = np.flatnonzero((tamanhos > 0) & (tamanhos <= TAMANHO_CPF))
+    matriz = _matriz_de_digitos(digitos.iloc[candidatos_cpf], TAMANHO_CPF)
+    cpf = _validos(matriz, PESOS_CPF, modulo_cpf=True)
+    chaves[candidatos_cpf[cpf]] = _numero(matriz[cpf]) | BIT_CPF
+
+    candidatos_cnpj = np.flatnonzero((tamanhos > 0) & (tamanhos <= TAMANHO_CNPJ))
+    candidatos_cnpj = candidatos_cnpj[chaves[candidatos_cnpj] == -1]
+    matriz = _matriz_de_digitos(digitos.iloc[candidatos_cnpj], TAMANHO_CNPJ)
+    cnpj = _validos(matriz, PESOS_CNPJ, modulo_cpf=False)
+    chaves[candidatos_cnpj[cnpj]] = _numero(matriz[cnpj])
+
+    return chaves, chaves != -1
+
+
+def format_document(chave):
+    """Documento formatado ("12.345.678/0001-90" ou "123.456.789-09")."""
+    if chave & BIT_CPF:
+        d = f"{chave & ~BIT_CPF:0{TAMANHO_CPF}d}"
+        return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+    d = f"{chave:0{TAMANHO_CNPJ}d}"
+    return f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+
+
+@medido("resumo de CNPJs", contar=lambda resumo: {"linhas": len(resumo)})
+def summarize_documents(df, coluna="CLI_CGCCPF", coluna_data="NFS_EMISSAO"):
+    """Resumo de um arquivo: uma linha por documento distinto.
+
+    Colunas: ``CHAVE`` (-1 se inválido), ``DOCUMENTO`` (o texto original, só
+    nos inválidos) e ``PRIMEIRA_NOTA`` (data da primeira nota, se houver a
+    coluna de data).
+    """
+    documentos = df[coluna].dropna().astype("str").str.strip()
+    # Cada texto distinto é validado uma única vez
+    codigos, textos = pd.factorize(documentos)
+    chaves_dos_textos, _ = document_keys(pd.Series(textos, dtype="str"))
+    chaves = chaves_dos_textos[codigos]
+
+    # Válidos agrupados pela chave (máscaras diferentes, mesmo documento);
+    # inválidos pelo texto (códigos negativos), para listá-los na página
+    grupos = np.where(chaves != -1, chaves, -1 - codigos)
+    if coluna_data in df.columns:
+        datas = df.loc[documentos.index, coluna_data]
+    else:
+        datas = pd.Series(pd.NaT, index=documentos.index, dtype="datetime64[ns]")
+    primeira = datas.groupby(grupos, sort=False).min()
+
+    grupos = primeira.index.to_numpy()
+    invalidos = grupos < 0
+    return pd.DataFrame(
+        {
+            "CHAVE": np.where(invalidos, -1, grupos),
+            "DOCUMENTO": np.where(invalidos, textos[np.maximum(-1 - grupos, 0)], ""),
+            "PRIMEIRA_NOTA": primeira.to_numpy(),
+        }
+    )
+
+
+class CNPJTracker:
+    """União dos documentos válidos de vários arquivos, guardada na sessão.
+
+    ``primeira_vez`` é um dicionário (conjunto de hash) chave -> dia da
+    primeira nota entre todos os arquivos. Arquivos são somados pelo hash do
+    conteúdo: o mesmo arquivo enviado de novo não conta duas vezes.
+    """
+
+    def __init__(self):
+        self.primeira_vez = {}
+        self.resumos = {}
+        self.invalidos = {}
+
+    def __len__(self):
+        return len(self.primeira_vez)
+
+    def add(self, hash_arquivo, resumo):
+        """Soma o resumo de um arquivo; devolve quantos documentos eram novos."""
+        if hash_arquivo in self.resumos:
+            return 0
+        self.resumos[hash_arquivo] = resumo
+
+        validos = resumo["CHAVE"] != -1
+        for documento in resumo.loc[~validos, "DOCUMENTO"]:
+            self.invalidos[documento] = self.invalidos.get(documento, 0) + 1
+
+        datas = resumo.loc[validos, "PRIMEIRA_NOTA"].to_numpy().astype("datetime64[D]")
+        dias = np.where(np.isnat(datas), SEM_DATA, datas.astype(np.int64))
+        antes = len(self.primeira_vez)
+        primeira_vez = self.primeira_vez
+        for chave, dia in zip(resumo.loc[validos, "CHAVE"].tolist(), dias.tolist()):
+            atual = primeira_vez.get(chave)
+            if atual is None or dia < atual:
+                primeira_vez[chave] = dia
+        return len(primeira_vez) - antes
+
+    def sync(self, resumos):
+        """Deixa a união igual aos arquivos em ``resumos`` (``{hash: resumo}``).
+
+        Arquivos novos são somados ao que já existe; se algum arquivo saiu, a
+        união é refeita a partir dos resumos (sem reler planilhas).
+        """
+        if not set(self.resumos) <= set(resumos):
+            self.__init__()
+        for hash_arquivo, resumo in resumos.items():
+            self.add(hash_arquivo, resumo)
+
+    def new_per_day(self):
+        """Quantos documentos apareceram pela primeira vez em cada dia."""
+        dias = np.fromiter(self.primeira_vez.values(), dtype=np.int64)
+        dias = dias[dias != SEM_DATA]
+        contagem = pd.Series(dias).value_counts().sort_index()
+        contagem.index = pd.to_datetime(contagem.index, unit="D")
+        contagem.index.name = "Dia"
+        return contagem.rename("Novos")
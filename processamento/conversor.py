@@ -0,0 +1,289 @@
+"""Conversão de PDFs em imagens e de imagens entre formatos.
+
+As páginas são renderizadas pelo PyMuPDF uma de cada vez e gravadas direto em
+um ZIP (``RenamedZip``), então só uma página fica em memória por vez. O ZIP e
+as miniaturas ficam em cache pelo conteúdo do PDF e pelas opções escolhidas:
+um rerun da página (ex.: o clique no download) não renderiza nada de novo.
+
+Imagens são convertidas em lote por um pool de threads (o Pillow libera o GIL
+ao decodificar e codificar). Com um tamanho máximo, JPEGs são decodificados
+já reduzidos (``Image.draft``), sem abrir a foto inteira de 12 MP.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+
+from processamento.agendador import FATOR_PDF, agendador, memory_budget
+from processamento.cache import ParseCache, sha256_bytes
+from processamento.diagnostico import medido
+from processamento.notas_fiscais import RenamedZip
+
+# Formato -> (extensão, mime)
+FORMATOS_PAGINA = {"PNG": ("png", "image/png"), "JPEG": ("jpg", "image/jpeg")}
+OPCOES_DPI = (72, 100, 150, 200, 300)
+DPI_PADRAO = 150
+QUALIDADE_PADRAO = 85
+
+# Formato -> (extensão, mime) na conversão de imagens
+FORMATOS_IMAGEM = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "JPG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "PDF": ("pdf", "application/pdf"),
+}
+# Maior lado da imagem convertida (None mantém o tamanho original)
+OPCOES_TAMANHO = {
+    "Original": None,
+    "2400 px": 2400,
+    "1600 px": 1600,
+    "1024 px": 1024,
+}
+QUALIDADE_IMAGEM = 95
+
+# Threads da conversão de imagens
+MAX_THREADS = min(8, (os.cpu_count() or 1) + 2)
+
+# Miniaturas: uma página A4 a 20 DPI tem cerca de 165 x 234 pixels
+DPI_MINIATURA = 20
+MAXIMO_MINIATURAS = 12
+
+
+def count_pages(pdf_bytes):
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return len(doc)
+
+
+def parse_page_selection(texto, total):
+    """Páginas escolhidas em ``texto`` (ex.: "1-3, 5, 8-") como índices a
+    partir de 0, em ordem e sem repetição. Vazio seleciona todas."""
+    if not texto.strip():
+        return list(range(total))
+
+    paginas = set()
+    for parte in texto.replace(";", ",").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        inicio, separador, fim = parte.partition("-")
+        try:
+            inicio = int(inicio) if inicio.strip() else 1
+            fim = (int(fim) if fim.strip() else total) if separador else inicio
+        except ValueError:
+            raise ValueError(f"Intervalo de páginas inválido: {parte}") from None
+        if not 1 <= inicio <= fim <= total:
+            raise ValueError(f"Páginas fora do documento (1 a {total}): {parte}")
+        paginas.update(range(inicio - 1, fim))
+    return sorted(paginas)
+
+
+def render_page(page, dpi, formato="PNG", qualidade=QUALIDADE_PADRAO):
+    """Imagem de uma página (``fitz.Page``) codificada em ``formato``."""
+    pixmap = page.get_pixmap(dpi=dpi, alpha=False)
+    if formato == "JPEG":
+        return pixmap.tobytes("jpg", jpg_quality=qualidade)
+    return pixmap.tobytes("png")
+
+
+def iter_rendered_pages(pdf_bytes, paginas, dpi, formato="PNG", qualidade=QUALIDADE_PADRAO):
+    """Gera ``(índice da página, imagem)`` renderizando uma página por vez."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for numero in paginas:
+            yield numero, render_page(doc[numero], dpi, formato, qualidade)
+
+
+@medido("renderização das páginas", contar=lambda zip_: {"paginas": len(zip_.nomes)})
+def render_pages_to_zip(
+    pdf_bytes, paginas, dpi, formato="PNG", qualidade=QUALIDADE_PADRAO, ao_progredir=None
+):
+    """ZIP (``RenamedZip`` já fechado) com as páginas escolhidas, gravadas à
+    medida que são renderizadas. ``ao_progredir(concluidas)`` é chamada a
+    cada página; se ela interromper a renderização (ex.: tarefa cancelada), o
+    ZIP pela metade é descartado."""
+    extensao = FORMATOS_PAGINA[formato][0]
+    saida = RenamedZip()
+    try:
+        for concluidas, (numero, imagem) in enumerate(
+            iter_rendered_pages(pdf_bytes, paginas, dpi, formato, qualidade), start=1
+        ):
+            saida.add(f"pagina_{numero + 1}.{extensao}", imagem)
+            if ao_progredir:
+                ao_progredir(concluidas)
+    except BaseException:
+        saida.discard()
+        raise
+    saida.close()
+    return saida
+
+
+def variante_da_conversao(paginas, dpi, formato, qualidade):
+    # A qualidade só muda o resultado em JPEG
+    qualidade = qualidade if formato == "JPEG" else None
+    return f"paginas={paginas}|dpi={dpi}|{formato}|q={qualidade}"
+
+
+def cached_pages_zip(hash_pdf, paginas, dpi, formato, qualidade):
+    """ZIP já renderizado com estas opções, ou None."""
+    return conversoes_cache.get(
+        hash_pdf, variante_da_conversao(paginas, dpi, formato, qualidade)
+    )
+
+
+def store_pages_zip(hash_pdf, paginas, dpi, formato, qualidade, saida):
+    conversoes_cache.put(
+        hash_pdf, saida, variante_da_conversao(paginas, dpi, formato, qualidade)
+    )
+
+
+@medido("miniaturas", contar=lambda miniaturas: {"paginas": len(miniaturas)})
+def thumbnails(pdf_bytes, hash_pdf, paginas):
+    """Miniaturas PNG das primeiras ``MAXIMO_MINIATURAS`` páginas escolhidas,
+    como ``[(índice da página, imagem)]``. Fora do cache, a renderização
+    espera a vez no agendador, como a conversão completa."""
+    paginas = paginas[:MAXIMO_MINIATURAS]
+
+    def renderizar():
+        with agendador.admit("miniaturas", memory_budget(len(pdf_bytes), FATOR_PDF)):
+            return list(iter_rendered_pages(pdf_bytes, paginas, DPI_MINIATURA))
+
+    return miniaturas_cache.get_or_compute(
+        hash_pdf, renderizar, f"miniaturas|{paginas}", persistir=False
+    )
+
+
+def open_image(dados, tamanho_maximo=None):
+    """Abre a imagem já girada pela orientação do EXIF (fotos de celular) e,
+    com ``tamanho_maximo``, reduzida para que o maior lado caiba nele."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        img = Image.open(BytesIO(dados))
+    except UnidentifiedImageError:
+        raise ValueError("o arquivo não é uma imagem válida") from None
+    if tamanho_maximo and img.format == "JPEG":
+        # Decodifica direto em 1/2, 1/4 ou 1/8 do tamanho, o menor que ainda
+        # cubra o tamanho final (com a mesma proporção da foto)
+        fator = tamanho_maximo / max(img.size)
+        if fator < 1:
+            img.draft("RGB", tuple(math.ceil(lado * fator) for lado in img.size))
+    img = ImageOps.exif_transpose(img)
+    if tamanho_maximo:
+        img.thumbnail((tamanho_maximo, tamanho_maximo))
+    return img
+
+
+def convert_image(dados, formato, tamanho_maximo=None):
+    """Conteúdo da imagem convertida para ``formato`` (de ``FORMATOS_IMAGEM``);
+    em PDF, um documento de uma página."""
+    img = open_image(dados, tamanho_maximo)
+    saida = BytesIO()
+    if formato in ("JPEG", "JPG", "PDF"):
+        # JPEG e PDF não guardam transparência
+        img = img.convert("RGB")
+    if formato == "PDF":
+        img.save(saida, "PDF")
+    elif formato == "PNG":
+        img.save(saida, "PNG")
+    else:
+        img.save(saida, "JPEG", quality=QUALIDADE_IMAGEM)
+    return saida.getvalue()
+
+
+def _converter(tarefa):
+    nome, dados, formato, tamanho_maximo = tarefa
+    try:
+        return nome, convert_image(dados, formato, tamanho_maximo), None
+    except Exception as e:
+        return nome, None, f"{nome}: {e}"
+
+
+def iter_converted_images(arquivos, formato, tamanho_maximo=None, max_workers=None):
+    """Converte ``(nome, bytes)`` em paralelo e gera ``(nome, convertido,
+    erro)`` na ordem de envio."""
+    tarefas = ((nome, dados, formato, tamanho_maximo) for nome, dados in arquivos)
+    with ThreadPoolExecutor(max_workers or MAX_THREADS) as pool:
+        yield from pool.map(_converter, tarefas)
+
+
+@dataclass
+class ImagensConvertidas:
+    nome: str  # nome sugerido para o download
+    mime: str
+    conteudo: object  # função sem argumentos que devolve os bytes
+    convertidas: int
+    erros: list
+    segundos: float
+
+
+@medido("conversão de imagens")
+def convert_images(arquivos, formato, tamanho_maximo=None, ao_progredir=None):
+    """Converte um lote de ``(nome, bytes)``. Em PDF o resultado é um único
+    documento com uma página por imagem; nos outros formatos é a própria
+    imagem (se for só uma) ou um ZIP com todas."""
+    import fitz  # PyMuPDF
+
+    inicio = time.perf_counter()
+    extensao, mime = FORMATOS_IMAGEM[formato]
+    erros = []
+    paginas = fitz.open() if formato == "PDF" else None
+    saida = RenamedZip() if formato != "PDF" and len(arquivos) > 1 else None
+    unica = None
+
+    try:
+        for concluidas, (nome, convertido, erro) in enumerate(
+            iter_converted_images(arquivos, formato, tamanho_maximo), start=1
+        ):
+            if erro:
+                erros.append(erro)
+            elif paginas is not None:
+                # Cada imagem chega como PDF de uma página, já comprimido
+                with fitz.open(stream=convertido, filetype="pdf") as pagina:
+                    paginas.insert_pdf(pagina)
+            elif saida is not None:
+                saida.add(f"{os.path.splitext(nome)[0]}_convertido.{extensao}", convertido)
+            else:
+                unica = convertido
+            if ao_progredir:
+                ao_progredir(concluidas)
+    except BaseException:
+        # Conversão interrompida (ex.: tarefa cancelada): nada do lote é entregue
+        if paginas is not None:
+            paginas.close()
+        if saida is not None:
+            saida.discard()
+        raise
+
+    if paginas is not None:
+        convertidas = len(paginas)
+        dados = paginas.tobytes(garbage=3, deflate=True) if convertidas else b""
+        paginas.close()
+        nome, conteudo = "imagens_convertidas.pdf", lambda: dados
+    elif saida is not None:
+        saida.close()
+        convertidas = len(saida.nomes)
+        nome, conteudo, mime = "imagens_convertidas.zip", saida.getvalue, "application/zip"
+    else:
+        convertidas = int(unica is not None)
+        nome = f"{os.path.splitext(arquivos[0][0])[0]}_convertido.{extensao}"
+        conteudo = lambda: unica  # noqa: E731
+
+    return ImagensConvertidas(
+        nome, mime, conteudo, convertidas, erros, time.perf_counter() - inicio
+    )
+
+
+def chave_das_imagens(hashes, formato, tamanho_maximo):
+    """Chave do lote de imagens para o ``imagens_cache``."""
+    return sha256_bytes(f"{'|'.join(hashes)}|{formato}|{tamanho_maximo}".encode())
+
+
+conversoes_cache = ParseCache(max_itens=4, diretorio=None)
+miniaturas_cache = ParseCache(max_itens=16, diretorio=None)
+imagens_cache = ParseCache(max_itens=4, diretorio=None)
@@ -0,0 +1,167 @@
+"""Agregação de atividade dos clientes para o CRM.
+
+Calcula, em uma única passada sobre as notas, a recência (última compra), a
+frequência (quantidade de notas) e o valor total de cada cliente, tanto no
+histórico completo quanto em várias janelas de dias. Assim a página pode
+trocar o critério de "cliente ativo" sem recalcular nada.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+JANELAS_PADRAO = (30, 60, 90, 180, 365)
+
+# Nome das colunas de agrupamento no resumo
+NOMES_CHAVES = {"CLI_RAZ": "CLIENTES"}
+
+SEM_VENDEDOR = "(Sem vendedor)"
+
+ATIVO = "🟢 Ativo"
+INATIVO = "🔴 Inativo"
+
+
+def coluna_total(janela):
+    return f"TOTAL_{janela}D"
+
+
+def coluna_notas(janela):
+    return f"QTD_NOTAS_{janela}D"
+
+
+def referencia(hoje=None):
+    """Data de referência das janelas: o início do dia de ``hoje``."""
+    return pd.Timestamp(hoje or datetime.today()).normalize()
+
+
+def compute_client_activity(df, janelas=JANELAS_PADRAO, hoje=None, por=("CLI_RAZ",)):
+    """Resumo por cliente (``CLI_RAZ``) a partir das colunas ``NFS_EMISSAO`` e
+    ``NFS_CUSTO``.
+
+    Colunas devolvidas: ``CLIENTES``, ``ULTIMA_COMPRA``, ``DIAS_SEM_COMPRA``,
+    ``QTD_NOTAS``, ``TOTAL_GERAL`` e, para cada janela ``n``, ``QTD_NOTAS_nD``
+    e ``TOTAL_nD`` (notas emitidas a partir de ``hoje - n`` dias). Outras
+    colunas em ``por`` (ex.: ``VEND_NOME``) abrem o resumo também por elas.
+    """
+    hoje = referencia(hoje)
+    emissao = pd.to_datetime(df["NFS_EMISSAO"]).to_numpy()
+    custo = pd.to_numeric(df["NFS_CUSTO"], errors="coerce").fillna(0.0).to_numpy()
+
+    # Uma coluna de quantidade e uma de valor por janela, montadas com máscaras
+    # vetorizadas; depois um único groupby soma todas de uma vez
+    colunas = {"QTD_NOTAS": np.ones(len(df), dtype=np.int64), "TOTAL_GERAL": custo}
+    for janela in janelas:
+        na_janela = emissao >= (hoje - pd.Timedelta(days=janela)).to_datetime64()
+        colunas[coluna_notas(janela)] = na_janela.astype(np.int64)
+        colunas[coluna_total(janela)] = np.where(na_janela, custo, 0.0)
+
+    metricas = pd.DataFrame(colunas, index=df.index)
+    metricas["ULTIMA_COMPRA"] = emissao
+    chaves = [df[coluna].rename(NOMES_CHAVES.get(coluna, coluna)) for coluna in por]
+    return _resumir(metricas.groupby(chaves), hoje)
+
+
+def combine_client_activity(parciais, hoje=None):
+    """Junta resumos parciais do mesmo cliente (ex.: de vendedores diferentes)
+    sem voltar às notas: a última compra é o máximo e o resto é somado."""
+    hoje = referencia(hoje)
+    grupos = parciais.drop(columns=["VEND_NOME", "DIAS_SEM_COMPRA"], errors="ignore")
+    return _resumir(grupos.groupby("CLIENTES"), hoje)
+
+
+def _resumir(grupos, hoje):
+    clientes = grupos.sum(numeric_only=True)
+    clientes.insert(0, "ULTIMA_COMPRA", grupos["ULTIMA_COMPRA"].max())
+    clientes.insert(1, "DIAS_SEM_COMPRA", (hoje - clientes["ULTIMA_COMPRA"]).dt.days)
+    return clientes.reset_index()
+
+
+def classify_activity(clientes, limiar, hoje=None):
+    """Situação de cada cliente: ativo se comprou nos últimos ``limiar`` dias."""
+    limite = referencia(hoje) - pd.Timedelta(days=limiar)
+    return pd.Series(
+        np.where(clientes["ULTIMA_COMPRA"] >= limite, ATIVO, INATIVO),
+        index=clientes.index,
+    )
+
+
+class VendorIndex:
+    """Notas e resumos de clientes particionados por vendedor.
+
+    Montado uma vez por planilha: as notas são ordenadas por ``VEND_NOME``
+    (cada vendedor vira uma faixa contígua de linhas) e o resumo por cliente
+    de cada vendedor, além do consolidado de todos, já fica calculado. Trocar
+    de vendedor passa a ser uma consulta em dicionário.
+    """
+
+    def __init__(self, df, janelas=JANELAS_PADRAO, hoje=None):
+        self.janelas = tuple(janelas)
+        self.hoje = referencia(hoje)
+
+        codigos, nomes = pd.factorize(df["VEND_NOME"].fillna(SEM_VENDEDOR), sort=True)
+        self.vendedores = list(nomes)
+        ordem = np.argsort(codigos, kind="stable")
+        self.notas = df.iloc[ordem].reset_index(drop=True)
+        self.notas["VEND_NOME"] = np.asarray(nomes, dtype=object)[codigos[ordem]]
+
+        limites = np.concatenate(
+            [[0], np.cumsum(np.bincount(codigos, minlength=len(nomes)))]
+        )
+        self.faixas = {
+            vendedor: (int(limites[i]), int(limites[i + 1]))
+            for i, vendedor in enumerate(self.vendedores)
+        }
+
+        # Um único groupby (vendedor, cliente); como o resultado sai ordenado
+        # por vendedor, cada vendedor é também uma faixa contígua do resumo
+        base = compute_client_activity(
+            self.notas, self.janelas, self.hoje, por=("VEND_NOME", "CLI_RAZ")
+        )
+        contagem = base["VEND_NOME"].value_counts()
+        inicio = 0
+        self.por_vendedor = {}
+        for vendedor in self.vendedores:
+            fim = inicio + int(contagem.get(vendedor, 0))
+            self.por_vendedor[vendedor] = (
+                base.iloc[inicio:fim].drop(columns="VEND_NOME").reset_index(drop=True)
+            )
+            inicio = fim
+        self.todos = combine_client_activity(base, self.hoje)
+        self._combinados = {}
+
+    def linhas(self, vendedor):
+        """Notas de um vendedor (fatia das notas ordenadas, sem filtro)."""
+        inicio, fim = self.faixas[vendedor]
+        return self.notas.iloc[inicio:fim]
+
+    def clientes(self, vendedores=None):
+        """Resumo por cliente de um ou mais vendedores (todos se vazio)."""
+        if not vendedores or set(vendedores) >= set(self.vendedores):
+            return self.todos
+        if len(vendedores) == 1:
+            return self.por_vendedor[vendedores[0]]
+
+        chave = frozenset(vendedores)
+        if chave not in self._combinados:
+            parciais = pd.concat([self.por_vendedor[v] for v in vendedores])
+            self._combinados[chave] = combine_client_activity(parciais, self.hoje)
+        return self._combinados[chave]
+
+    def comparativo(self, vendedores, limiar):
+        """Uma linha por vendedor com clientes, ativos, inativos e o total da
+        janela ``limiar``, a partir dos resumos já calculados."""
+        linhas = []
+        for vendedor in vendedores:
+            clientes = self.por_vendedor[vendedor]
+            ativos = int((classify_activity(clientes, limiar, self.hoje) == ATIVO).sum())
+            linhas.append(
+                {
+                    "VENDEDOR": vendedor,
+                    "CLIENTES": len(clientes),
+                    "ATIVOS": ativos,
+                    "INATIVOS": len(clientes) - ativos,
+                    coluna_total(limiar): clientes[coluna_total(limiar)].sum(),
+                }
+            )
+        return pd.DataFrame(linhas)
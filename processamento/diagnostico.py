@@ -0,0 +1,226 @@
+"""Medição de cada etapa das páginas (tempo, CPU, memória e volume).
+
+Cada execução da página (um rerun do Streamlit) vira uma ``Execucao`` com os
+trechos medidos por ``span`` (gerenciador de contexto) ou ``medido``
+(decorador); cada tarefa em segundo plano abre a sua. Fora de uma execução —
+em processos e threads auxiliares, ou em scripts — os dois não fazem nada
+além de chamar o código medido.
+
+Para cada trecho são guardados o tempo de relógio, o tempo de CPU da thread
+da sessão e, se a execução foi aberta com ``memoria=True``, o pico de memória
+alocada pelo Python (``tracemalloc``, que deixa tudo mais lento e por isso só
+é ligado pelo painel de diagnóstico). O ``tracemalloc`` é do processo inteiro:
+fica ligado enquanto alguma sessão estiver medindo a memória e, com várias
+sessões ao mesmo tempo, o pico inclui o que as outras alocaram.
+
+Ao fim, a execução é gravada como uma linha JSON em ``logs/diagnostico.jsonl``
+(``CRM_DIAGNOSTICO_LOG`` muda o caminho; vazio desliga o log). Quando o log
+passa de ``CRM_DIAGNOSTICO_LOG_MB`` (padrão 10 MB), ele vira
+``diagnostico.jsonl.1`` (substituindo o anterior) e um novo é começado.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+# Sem importar processamento.cache (e o pandas): main.py importa este módulo
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_PADRAO = os.path.join(RAIZ, "logs", "diagnostico.jsonl")
+LOG_DIAGNOSTICO = os.environ.get("CRM_DIAGNOSTICO_LOG", LOG_PADRAO)
+MAX_LOG_MB = float(os.environ.get("CRM_DIAGNOSTICO_LOG_MB", 10))
+
+_execucao_atual = ContextVar("execucao_diagnostico", default=None)
+_lock_log = threading.Lock()
+
+# Execuções medindo a memória agora; o tracemalloc para quando a última termina
+_lock_tracemalloc = threading.Lock()
+_medindo_memoria = 0
+_ligou_tracemalloc = False
+
+
+@dataclass
+class Trecho:
+    nome: str
+    nivel: int  # profundidade (trechos dentro de trechos)
+    segundos: float = 0.0
+    cpu_segundos: float = 0.0
+    pico_mb: float = None
+    linhas: int = None
+    paginas: int = None
+    # Maior memória alocada vista enquanto o trecho estava aberto
+    _pico_bytes: int = field(default=0, repr=False)
+    _inicio_bytes: int = field(default=0, repr=False)
+
+    def contar(self, linhas=None, paginas=None):
+        """Registra o volume processado no trecho."""
+        if linhas is not None:
+            self.linhas = int(linhas)
+        if paginas is not None:
+            self.paginas = int(paginas)
+
+
+@dataclass
+class Execucao:
+    pagina: str
+    memoria: bool = False
+    inicio: str = ""
+    trechos: list = field(default_factory=list)
+    _abertos: list = field(default_factory=list, repr=False)
+    # Execuções de tarefas em segundo plano mostradas junto no painel
+    anexadas: list = field(default_factory=list, repr=False)
+
+    def _atualizar_picos(self):
+        # O pico do tracemalloc é um só; ele é repassado a todos os trechos
+        # abertos e zerado, para que o próximo trecho meça só o seu pedaço
+        if not tracemalloc.is_tracing():
+            return
+        _, pico = tracemalloc.get_traced_memory()
+        for trecho in self._abertos:
+            trecho._pico_bytes = max(trecho._pico_bytes, pico)
+        tracemalloc.reset_peak()
+
+    def as_dict(self):
+        return {
+            "inicio": self.inicio,
+            "pagina": self.pagina,
+            "memoria": self.memoria,
+            "trechos": [
+                {
+                    chave: valor
+                    for chave, valor in asdict(trecho).items()
+                    if not chave.startswith("_") and valor is not None
+                }
+                for trecho in self.trechos
+            ],
+        }
+
+
+@contextmanager
+def span(nome, linhas=None, paginas=None):
+    """Mede o bloco como um trecho da execução atual. Devolve o ``Trecho``
+    (ou ``None`` fora de uma execução) para registrar o volume depois."""
+    execucao = _execucao_atual.get()
+    if execucao is None:
+        yield None
+        return
+
+    trecho = Trecho(nome, len(execucao._abertos), linhas=linhas, paginas=paginas)
+    execucao.trechos.append(trecho)
+    if execucao.memoria:
+        execucao._atualizar_picos()
+        trecho._inicio_bytes = trecho._pico_bytes = tracemalloc.get_traced_memory()[0]
+    execucao._abertos.append(trecho)
+    inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield trecho
+    finally:
+        trecho.segundos = round(time.perf_counter() - inicio, 4)
+        trecho.cpu_segundos = round(time.thread_time() - inicio_cpu, 4)
+        if execucao.memoria:
+            execucao._atualizar_picos()
+            trecho.pico_mb = round(
+                (trecho._pico_bytes - trecho._inicio_bytes) / 1024 / 1024, 2
+            )
+        execucao._abertos.remove(trecho)
+
+
+def medido(nome=None, contar=None):
+    """Decorador que mede cada chamada da função como um trecho.
+
+    ``contar(resultado)`` pode devolver ``{"linhas": n}`` e/ou
+    ``{"paginas": n}`` para registrar o volume processado.
+    """
+
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if _execucao_atual.get() is None:
+                return funcao(*args, **kwargs)
+            with span(rotulo) as trecho:
+                resultado = funcao(*args, **kwargs)
+                if contar:
+                    trecho.contar(**contar(resultado))
+                return resultado
+
+        return medida
+
+    return decorador
+
+
+@contextmanager
+def run_page(pagina, memoria=False):
+    """Abre a execução de uma página; todo o corpo vira o trecho "página".
+    No fim (mesmo com erro) a execução vai para o log."""
+    execucao = Execucao(pagina, memoria, datetime.now().isoformat(timespec="seconds"))
+    if memoria:
+        _ligar_tracemalloc()
+    token = _execucao_atual.set(execucao)
+    try:
+        with span("página"):
+            yield execucao
+    finally:
+        _execucao_atual.reset(token)
+        if memoria:
+            _desligar_tracemalloc()
+        write_log(execucao)
+
+
+def current_run():
+    """Execução aberta neste contexto, ou None."""
+    return _execucao_atual.get()
+
+
+def attach_run(execucao):
+    """Mostra ``execucao`` (ex.: a de uma tarefa em segundo plano, que já foi
+    para o log por conta própria) junto da execução atual no painel."""
+    atual = _execucao_atual.get()
+    if atual is not None and execucao is not None and execucao not in atual.anexadas:
+        atual.anexadas.append(execucao)
+
+
+def _ligar_tracemalloc():
+    global _medindo_memoria, _ligou_tracemalloc
+    with _lock_tracemalloc:
+        if _medindo_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _ligou_tracemalloc = True
+        _medindo_memoria += 1
+
+
+def _desligar_tracemalloc():
+    # Só quem ligou desliga (um script pode ter ligado o tracemalloc antes)
+    global _medindo_memoria, _ligou_tracemalloc
+    with _lock_tracemalloc:
+        _medindo_memoria -= 1
+        if _medindo_memoria == 0 and _ligou_tracemalloc:
+            tracemalloc.stop()
+            _ligou_tracemalloc = False
+
+
+def write_log(execucao, caminho=None):
+    caminho = LOG_DIAGNOSTICO if caminho is None else caminho
+    if not caminho:
+        return
+    linha = json.dumps(execucao.as_dict(), ensure_ascii=False)
+    try:
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with _lock_log:
+            if (
+                MAX_LOG_MB
+                and os.path.exists(caminho)
+                and os.path.getsize(caminho) > MAX_LOG_MB * 1024 * 1024
+            ):
+                os.replace(caminho, f"{caminho}.1")
+            with open(caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha + "\n")
+    except OSError as e:
+        print(f"Diagnóstico não gravado: {e}")
@@ -0,0 +1,264 @@
+"""Exportação de DataFrames para Excel, CSV e Parquet.
+
+O Excel é gravado pelo XlsxWriter em modo ``constant_memory``: cada linha vai
+para o arquivo assim que é escrita, sem montar a planilha inteira em memória
+como o ``DataFrame.to_excel`` com openpyxl. Os valores também são convertidos
+para objetos Python em blocos de ``LINHAS_POR_BLOCO`` linhas, não a tabela
+toda de uma vez. Os formatos (moeda, data) e as larguras são definidos uma vez
+por coluna. Sem o XlsxWriter instalado, o
+openpyxl em modo ``write_only`` é usado no lugar.
+"""
+
+import datetime
+import math
+from io import BytesIO
+
+import pandas as pd
+
+from processamento.diagnostico import medido
+
+# Formato contábil do Excel em reais
+FORMATO_CONTABIL = '_-"R$" * #,##0.00_-;-"R$" * #,##0.00_-;_-"R$" * "-"??_-;_-@_-'
+FORMATO_DATA = "dd/mm/yyyy"
+FORMATO_DATA_HORA = "dd/mm/yyyy hh:mm:ss"
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Larguras automáticas: calculadas pelas primeiras linhas e limitadas
+LINHAS_PARA_LARGURA = 200
+LARGURA_MINIMA = 8
+LARGURA_MAXIMA = 60
+
+# Linhas convertidas para objetos Python de cada vez durante a gravação
+LINHAS_POR_BLOCO = 10_000
+
+
+def _vazio(valor):
+    return valor is None or valor is pd.NaT or valor is pd.NA or (
+        isinstance(valor, float) and math.isnan(valor)
+    )
+
+
+def _tipo_da_coluna(serie):
+    """Como gravar os valores da coluna: "numero", "data" ou "misto"."""
+    if pd.api.types.is_bool_dtype(serie):
+        return "misto"
+    if pd.api.types.is_numeric_dtype(serie):
+        return "numero"
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "data"
+    return "misto"
+
+
+def _valores(serie, tipo):
+    if tipo == "data":
+        # Excel não guarda fuso horário
+        if getattr(serie.dt, "tz", None) is not None:
+            serie = serie.dt.tz_localize(None)
+        return [None if _vazio(v) else v.to_pydatetime() for v in serie]
+    return serie.tolist()
+
+
+def _linhas(df, tipos):
+    """Gera as linhas de ``df`` como tuplas de valores prontos para gravar,
+    convertendo ``LINHAS_POR_BLOCO`` linhas por vez."""
+    for inicio in range(0, len(df), LINHAS_POR_BLOCO):
+        bloco = df.iloc[inicio : inicio + LINHAS_POR_BLOCO]
+        colunas = [_valores(bloco.iloc[:, i], tipo) for i, tipo in enumerate(tipos)]
+        yield from zip(*colunas)
+
+
+def _larguras_automaticas(df):
+    larguras = {}
+    for coluna in df.columns:
+        amostra = df[coluna].head(LINHAS_PARA_LARGURA)
+        maior = max(
+            [len(str(coluna))]
+            + [len(str(v)) for v in amostra if not _vazio(v)]
+        )
+        larguras[coluna] = min(max(maior + 2, LARGURA_MINIMA), LARGURA_MAXIMA)
+    return larguras
+
+
+def _formato_padrao(tipo, valores):
+    if tipo == "data":
+        com_hora = any(
+            v is not None and (v.hour or v.minute or v.second) for v in valores[:50]
+        )
+        return FORMATO_DATA_HORA if com_hora else FORMATO_DATA
+    return None
+
+
+@medido("gravação do xlsx")
+def to_xlsx(df, destino=None, nome_aba="Dados", formatos=None, larguras=None):
+    """Grava ``df`` em xlsx e devolve os bytes (ou grava em ``destino``, um
+    caminho ou arquivo aberto em modo binário).
+
+    ``formatos`` e ``larguras`` são dicionários ``{coluna: valor}``; colunas
+    de data sem formato usam ``FORMATO_DATA`` e as larguras não informadas são
+    estimadas pelo conteúdo.
+    """
+    formatos = formatos or {}
+    larguras = {**_larguras_automaticas(df), **(larguras or {})}
+    tipos = [_tipo_da_coluna(df.iloc[:, i]) for i in range(df.shape[1])]
+    # O formato padrão das datas olha só as primeiras linhas
+    inicio = df.head(LINHAS_PARA_LARGURA)
+    formatos = [
+        formatos.get(coluna) or _formato_padrao(tipo, _valores(inicio.iloc[:, i], tipo))
+        for i, (coluna, tipo) in enumerate(zip(df.columns, tipos))
+    ]
+    larguras = [larguras[coluna] for coluna in df.columns]
+    cabecalho = [str(coluna) for coluna in df.columns]
+    linhas = _linhas(df, tipos)
+
+    saida = BytesIO() if destino is None else destino
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        _gravar_openpyxl(saida, nome_aba, cabecalho, linhas, tipos, formatos, larguras)
+    else:
+        _gravar_xlsxwriter(saida, nome_aba, cabecalho, linhas, tipos, formatos, larguras)
+    return saida.getvalue() if destino is None else None
+
+
+def _gravar_xlsxwriter(saida, nome_aba, cabecalho, linhas, tipos, formatos, larguras):
+    import xlsxwriter
+
+    # constant_memory grava linha a linha em arquivos temporários
+    livro = xlsxwriter.Workbook(saida, {"constant_memory": True})
+    aba = livro.add_worksheet(nome_aba)
+    estilo_cabecalho = livro.add_format(
+        {"bold": True, "border": 1, "align": "center", "valign": "top"}
+    )
+    # Um objeto de formato por coluna, reaproveitado em todas as células
+    estilos = [livro.add_format({"num_format": f}) if f else None for f in formatos]
+    estilo_data = livro.add_format({"num_format": FORMATO_DATA})
+    for indice, largura in enumerate(larguras):
+        aba.set_column(indice, indice, largura)
+
+    aba.write_row(0, 0, cabecalho, estilo_cabecalho)
+    # Um método de escrita por coluna, escolhido pelo tipo uma única vez
+    escritas = []
+    for tipo, estilo in zip(tipos, estilos):
+        if tipo == "numero":
+            escritas.append(_escrever_numero(aba, estilo))
+        elif tipo == "data":
+            escritas.append(_escrever_data(aba, estilo))
+        else:
+            escritas.append(_escrever_misto(aba, estilo, estilo_data))
+
+    for linha, valores in enumerate(linhas, start=1):
+        for indice, valor in enumerate(valores):
+            escritas[indice](linha, indice, valor)
+    livro.close()
+
+
+def _escrever_numero(aba, estilo):
+    def escrever(linha, coluna, valor):
+        if not _vazio(valor):
+            aba.write_number(linha, coluna, valor, estilo)
+
+    return escrever
+
+
+def _escrever_data(aba, estilo):
+    def escrever(linha, coluna, valor):
+        if valor is not None:
+            aba.write_datetime(linha, coluna, valor, estilo)
+
+    return escrever
+
+
+def _escrever_misto(aba, estilo, estilo_data):
+    def escrever(linha, coluna, valor):
+        if _vazio(valor) or valor == "":
+            return
+        if isinstance(valor, bool):
+            aba.write_boolean(linha, coluna, valor)
+        elif isinstance(valor, (int, float)):
+            aba.write_number(linha, coluna, valor, estilo)
+        elif isinstance(valor, datetime.date):
+            aba.write_datetime(linha, coluna, valor, estilo or estilo_data)
+        else:
+            aba.write_string(linha, coluna, str(valor))
+
+    return escrever
+
+
+def _gravar_openpyxl(saida, nome_aba, cabecalho, linhas, tipos, formatos, larguras):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    from openpyxl.utils import get_column_letter
+
+    livro = Workbook(write_only=True)
+    aba = livro.create_sheet(nome_aba)
+    for indice, largura in enumerate(larguras, start=1):
+        aba.column_dimensions[get_column_letter(indice)].width = largura
+
+    fino = Side(style="thin")
+    titulos = []
+    for titulo in cabecalho:
+        celula = WriteOnlyCell(aba, value=titulo)
+        celula.font = Font(bold=True)
+        celula.border = Border(left=fino, right=fino, top=fino, bottom=fino)
+        celula.alignment = Alignment(horizontal="center", vertical="top")
+        titulos.append(celula)
+    aba.append(titulos)
+
+    for valores in linhas:
+        linha = []
+        for valor, tipo, formato in zip(valores, tipos, formatos):
+            if _vazio(valor) or valor == "":
+                linha.append(None)
+                continue
+            celula = WriteOnlyCell(aba, value=valor)
+            if formato and (tipo != "misto" or not isinstance(valor, str)):
+                celula.number_format = formato
+            elif isinstance(valor, datetime.date):
+                celula.number_format = FORMATO_DATA
+            linha.append(celula)
+        aba.append(linha)
+    livro.save(saida)
+
+
+def _sem_vazios_misturados(df):
+    """Colunas de texto com números e vazios misturados (ex.: "Valor" do
+    extrato ML) viram numéricas com nulos; as demais ficam como estão."""
+    mistas = df.columns[df.dtypes == object]
+    if len(mistas) == 0:
+        return df
+    df = df.copy()
+    for coluna in mistas:
+        df[coluna] = df[coluna].replace("", None).infer_objects()
+    return df
+
+
+def to_csv(df, destino=None):
+    """CSV no padrão do Excel em português: ``;`` entre colunas, vírgula
+    decimal e BOM para os acentos abrirem certo."""
+    dados = _sem_vazios_misturados(df).to_csv(sep=";", decimal=",", index=False)
+    dados = dados.encode("utf-8-sig")
+    if destino is None:
+        return dados
+    if isinstance(destino, str):
+        with open(destino, "wb") as arquivo:
+            arquivo.write(dados)
+    else:
+        destino.write(dados)
+    return None
+
+
+def to_parquet(df, destino=None):
+    """Parquet (precisa do pyarrow)."""
+    saida = BytesIO() if destino is None else destino
+    _sem_vazios_misturados(df).to_parquet(saida, index=False)
+    return saida.getvalue() if destino is None else None
+
+
+# Nome -> (extensão, mime, função de exportação)
+FORMATOS_EXPORTACAO = {
+    "Excel": ("xlsx", MIME_XLSX, to_xlsx),
+    "CSV": ("csv", "text/csv", to_csv),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", to_parquet),
+}
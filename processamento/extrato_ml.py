@@ -0,0 +1,378 @@
+"""Extração das transações do extrato do Mercado Livre (PDF).
+
+O texto é processado em fluxo: páginas -> linhas -> blocos de transação ->
+registros. Cada bloco começa em uma linha iniciada por data.
+
+Há dois motores de leitura. O padrão ("posição das palavras") lê as palavras
+com suas coordenadas, acha as colunas (data, descrição, ID, valor e saldo)
+uma vez pelo cabeçalho da tabela e põe cada palavra na coluna em que ela
+está; assim números longos na descrição não se confundem com o ID ou o
+saldo. O "texto corrido" lê o texto da página e separa data, valores em
+reais e ID da operação com um único regex; o que sobra é a descrição. Ele é
+usado quando o cabeçalho da tabela não é encontrado.
+
+Extratos grandes são divididos em faixas de páginas lidas em paralelo pelo
+pool de processos compartilhado do app. Uma transação pode começar no fim de
+uma faixa e terminar no início da seguinte, então cada faixa devolve também
+as linhas soltas do começo e o bloco ainda aberto do fim, que são emendados
+na ordem original.
+"""
+
+import os
+import re
+import tempfile
+import unicodedata
+from bisect import bisect_right
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import pandas as pd
+
+from processamento.agendador import MAX_PROCESSOS, discard_pool, process_pool
+from processamento.diagnostico import medido
+
+PADRAO_DATA = re.compile(r"\d{2}-\d{2}-\d{4}")
+
+TOKENIZADOR = re.compile(
+    r"(?P<data>\d{2}-\d{2}-\d{4})"
+    r"|(?P<valor>R\$ -?\d{1,3}(?:\.\d{3})*,\d{2})"
+    r"|(?P<id>\b\d{9,}\b)"
+)
+
+MOTOR_POSICAO = "Posição das palavras"
+MOTOR_TEXTO = "Texto corrido"
+MOTORES = (MOTOR_POSICAO, MOTOR_TEXTO)
+
+# Palavra do cabeçalho da tabela (sem acento, minúscula) -> coluna. Palavras
+# seguintes sem coluna própria ("da operação") estendem a anterior
+ROTULOS_COLUNAS = {
+    "data": "data",
+    "descricao": "descricao",
+    "id": "id",
+    "valor": "valor",
+    "saldo": "saldo",
+}
+COLUNAS_OBRIGATORIAS = {"data", "descricao", "valor"}
+# Valores em reais ficam alinhados à direita e começam antes do rótulo
+COLUNAS_A_DIREITA = {"valor", "saldo"}
+
+# Páginas iniciais procuradas pelo cabeçalho da tabela
+PAGINAS_COM_CABECALHO = 3
+# Palavras cuja base difere até esta distância (em pontos) estão na mesma linha
+TOLERANCIA_LINHA = 3
+# Folga à esquerda das colunas alinhadas pelo começo do rótulo
+MARGEM_COLUNA = 2
+
+# fitz.TEXT_MEDIABOX_CLIP: sem preservar ligaduras e espaços, que não mudam as
+# palavras e deixam a extração mais lenta (o fitz só é importado na leitura)
+_FLAGS_PALAVRAS = 64
+
+_NUMERO = re.compile(r"-?\d{1,3}(?:\.\d{3})*,\d{2}")
+
+# Páginas por faixa no modo paralelo e tamanho mínimo do extrato para usá-lo
+PAGINAS_POR_FAIXA = 50
+MINIMO_PAGINAS_PARALELO = 2 * PAGINAS_POR_FAIXA
+
+# "R$ -1.234,56" -> "-1234.56"
+_TABELA_DECIMAL = str.maketrans({".": None, ",": "."})
+
+
+def iter_page_lines(doc, inicio=0, fim=None):
+    """Linhas não vazias das páginas ``inicio`` até ``fim`` (exclusivo)."""
+    for numero in range(inicio, len(doc) if fim is None else fim):
+        for linha in doc[numero].get_text().splitlines():
+            linha = linha.strip()
+            if linha:
+                yield linha
+
+
+def _normalizar(palavra):
+    palavra = unicodedata.normalize("NFKD", palavra)
+    return "".join(c for c in palavra if not unicodedata.combining(c)).lower()
+
+
+def _linhas_da_pagina(page):
+    """Linhas visuais da página, de cima para baixo, como listas de
+    ``(x0, x1, palavra)`` da esquerda para a direita."""
+    linhas = []
+    base = None
+    for x0, _, x1, y1, palavra, *_ in sorted(
+        page.get_text("words", flags=_FLAGS_PALAVRAS), key=lambda p: (p[3], p[0])
+    ):
+        if base is None or y1 - base > TOLERANCIA_LINHA:
+            linhas.append([])
+            base = y1
+        linhas[-1].append((x0, x1, palavra))
+    for linha in linhas:
+        linha.sort()
+    return linhas
+
+
+def _colunas_do_cabecalho(linha):
+    """``{coluna: [x0, x1]}`` se a linha for o cabeçalho da tabela."""
+    colunas = {}
+    atual = None
+    for x0, x1, palavra in linha:
+        coluna = ROTULOS_COLUNAS.get(_normalizar(palavra))
+        if coluna and coluna not in colunas:
+            colunas[coluna] = [x0, x1]
+            atual = coluna
+        elif atual:
+            colunas[atual][1] = x1
+    return colunas if COLUNAS_OBRIGATORIAS <= colunas.keys() else None
+
+
+def detect_columns(doc):
+    """Colunas da tabela do extrato, achadas pelo cabeçalho nas primeiras
+    páginas: tupla de ``(coluna, x inicial)`` da esquerda para a direita, ou
+    None se o cabeçalho não for encontrado."""
+    for numero in range(min(PAGINAS_COM_CABECALHO, len(doc))):
+        for linha in _linhas_da_pagina(doc[numero]):
+            colunas = _colunas_do_cabecalho(linha)
+            if colunas:
+                limites = []
+                fim_anterior = None
+                for coluna, (x0, x1) in sorted(colunas.items(), key=lambda c: c[1]):
+                    if fim_anterior is None:
+                        inicio = float("-inf")
+                    elif coluna in COLUNAS_A_DIREITA:
+                        inicio = (fim_anterior + x0) / 2
+                    else:
+                        inicio = x0 - MARGEM_COLUNA
+                    limites.append((coluna, inicio))
+                    fim_anterior = x1
+                return tuple(limites)
+    return None
+
+
+def iter_page_rows(doc, colunas, inicio=0, fim=None):
+    """Linhas da tabela das páginas ``inicio`` até ``fim`` (exclusivo) como
+    ``{coluna: texto}``, com o texto inteiro da linha em ``"linha"``. O
+    cabeçalho da tabela e o que vem acima dele em cada página são pulados."""
+    nomes = [coluna for coluna, _ in colunas]
+    inicios = [x for _, x in colunas]
+    for numero in range(inicio, len(doc) if fim is None else fim):
+        linhas = _linhas_da_pagina(doc[numero])
+        for indice, linha in enumerate(linhas):
+            if PADRAO_DATA.match(linha[0][2]):
+                break
+            if _colunas_do_cabecalho(linha):
+                linhas = linhas[indice + 1 :]
+                break
+
+        for linha in linhas:
+            # A primeira coluna começa em -inf, então o índice nunca é negativo
+            celulas = [[] for _ in nomes]
+            for x0, x1, palavra in linha:
+                celulas[bisect_right(inicios, (x0 + x1) / 2) - 1].append(palavra)
+            celulas = dict(zip(nomes, map(" ".join, celulas)))
+            celulas["linha"] = " ".join(palavra for *_, palavra in linha)
+            yield celulas
+
+
+def _inicia_transacao(linha):
+    # Linhas do texto corrido são textos; as da tabela, dicionários
+    return PADRAO_DATA.match(linha if isinstance(linha, str) else linha["data"])
+
+
+def iter_blocks(linhas):
+    """Agrupa as linhas (de ``iter_page_lines`` ou ``iter_page_rows``) em
+    blocos de transação. Cada bloco começa em uma linha iniciada por data; as
+    linhas antes da primeira data formam um bloco sem data (o cabeçalho do
+    extrato)."""
+    bloco = []
+    for linha in linhas:
+        if bloco and _inicia_transacao(linha):
+            yield bloco
+            bloco = []
+        bloco.append(linha)
+    if bloco:
+        yield bloco
+
+
+def is_transaction(bloco):
+    return _inicia_transacao(bloco[0]) is not None
+
+
+def _numero(texto):
+    return float(texto.translate(_TABELA_DECIMAL))
+
+
+def parse_block(bloco):
+    """Registro de um bloco de transação. O primeiro valor em reais é o da
+    operação, o último (se houver mais de um) é o saldo, e a última sequência
+    de 9 ou mais dígitos é o ID da operação."""
+    texto = " ".join(bloco)
+    data = id_operacao = None
+    valores = []
+    descricao = []
+    fim = 0
+    for token in TOKENIZADOR.finditer(texto):
+        descricao.append(texto[fim : token.start()])
+        fim = token.end()
+        if token.lastgroup == "data":
+            data = data or token.group()
+        elif token.lastgroup == "valor":
+            valores.append(token.group())
+        else:
+            id_operacao = token.group()
+    descricao.append(texto[fim:])
+
+    return {
+        "Data": datetime.strptime(data, "%d-%m-%Y").date(),
+        "Descrição": " ".join("".join(descricao).split()),
+        "ID da Operação": id_operacao or "",
+        "Valor": _numero(valores[0][3:]) if valores else "",
+        "Saldo": _numero(valores[-1][3:]) if len(valores) > 1 else "",
+    }
+
+
+def _id_do_texto(texto):
+    # Última sequência de 9 ou mais dígitos fora de datas e valores, como no
+    # texto corrido
+    ids = [t.group() for t in TOKENIZADOR.finditer(texto) if t.lastgroup == "id"]
+    return ids[-1] if ids else ""
+
+
+def parse_row_block(bloco):
+    """Registro de um bloco de linhas da tabela: cada campo sai da sua coluna.
+    Sem valor na coluna de valor, o bloco é lido como texto corrido; sem
+    coluna de ID no cabeçalho, o ID é procurado no texto das linhas."""
+    celulas = {
+        coluna: " ".join(linha[coluna] for linha in bloco if linha[coluna])
+        for coluna in bloco[0]
+    }
+    valor = _NUMERO.search(celulas["valor"])
+    if valor is None:
+        return parse_block([linha["linha"] for linha in bloco])
+    saldo = _NUMERO.search(celulas.get("saldo", ""))
+    if "id" in celulas:
+        id_operacao = "".join(re.findall(r"\d+", celulas["id"]))
+    else:
+        id_operacao = _id_do_texto(celulas["linha"])
+        # Sem coluna própria, o ID cai na descrição
+        celulas["descricao"] = celulas["descricao"].replace(id_operacao, "")
+
+    return {
+        "Data": datetime.strptime(
+            PADRAO_DATA.match(celulas["data"]).group(), "%d-%m-%Y"
+        ).date(),
+        "Descrição": " ".join(celulas["descricao"].split()),
+        "ID da Operação": id_operacao,
+        "Valor": _numero(valor.group()),
+        "Saldo": _numero(saldo.group()) if saldo else "",
+    }
+
+
+def parse_blocks(blocos):
+    """Gera ``(registro, None)`` ou ``(None, erro)`` para cada bloco de
+    transação, ignorando o cabeçalho do extrato."""
+    for bloco in blocos:
+        if not is_transaction(bloco):
+            continue
+        try:
+            if isinstance(bloco[0], str):
+                yield parse_block(bloco), None
+            else:
+                yield parse_row_block(bloco), None
+        except Exception as e:
+            yield None, f"Erro ao processar uma transação: {e}"
+
+
+def iter_document_blocks(doc, colunas=None, inicio=0, fim=None):
+    """Blocos das páginas ``inicio`` até ``fim``: pela posição das palavras
+    quando há ``colunas`` (de ``detect_columns``), senão pelo texto corrido."""
+    if colunas is None:
+        return iter_blocks(iter_page_lines(doc, inicio, fim))
+    return iter_blocks(iter_page_rows(doc, colunas, inicio, fim))
+
+
+def parse_page_range(caminho, inicio, fim, colunas=None):
+    """Lê as páginas ``inicio`` até ``fim`` (exclusivo) do PDF em ``caminho``.
+
+    Devolve ``(prefixo, resultados, aberto)``: as linhas antes da primeira
+    data da faixa (continuação do bloco da faixa anterior), os resultados de
+    ``parse_blocks`` para os blocos completos e o último bloco, que pode
+    continuar na faixa seguinte. Sem nenhuma data, tudo vai para ``prefixo``
+    e ``aberto`` é None.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(caminho) as doc:
+        blocos = list(iter_document_blocks(doc, colunas, inicio, fim))
+
+    prefixo = blocos.pop(0) if blocos and not is_transaction(blocos[0]) else []
+    aberto = blocos.pop() if blocos else None
+    return prefixo, list(parse_blocks(blocos)), aberto
+
+
+def _parse_in_parallel(pdf_bytes, paginas, max_workers, colunas):
+    """Resultados de ``parse_blocks`` para o extrato todo, lendo faixas de
+    páginas em processos separados e emendando os blocos entre as faixas."""
+    faixas = [
+        (inicio, min(inicio + PAGINAS_POR_FAIXA, paginas))
+        for inicio in range(0, paginas, PAGINAS_POR_FAIXA)
+    ]
+    # Os processos abrem o PDF pelo caminho em vez de receber os bytes
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "extrato.pdf")
+        with open(caminho, "wb") as f:
+            f.write(pdf_bytes)
+
+        pool = process_pool(max_workers)
+        try:
+            partes = pool.map(
+                parse_page_range,
+                [caminho] * len(faixas),
+                *zip(*faixas),
+                [colunas] * len(faixas),
+            )
+            # "aberto" é o bloco que ainda pode receber linhas da faixa
+            # seguinte; antes da primeira data ele é o cabeçalho do extrato
+            aberto = []
+            for prefixo, resultados, fim_da_faixa in partes:
+                aberto.extend(prefixo)
+                if fim_da_faixa is None:
+                    continue
+                yield from parse_blocks([aberto] if aberto else [])
+                yield from resultados
+                aberto = fim_da_faixa
+        except BrokenProcessPool:
+            discard_pool(pool)
+            raise
+        yield from parse_blocks([aberto] if aberto else [])
+
+
+# Função para extrair as transações do extrato do Mercado Livre (PDF)
+@medido("leitura do extrato ML", contar=lambda r: {"linhas": len(r[0])})
+def parse_ml_statement(pdf_bytes, paralelo=True, max_workers=None, motor=MOTOR_POSICAO):
+    """Retorna ``(df, erros)``: as transações extraídas e as mensagens de erro
+    das transações que não puderam ser lidas.
+
+    Com ``paralelo``, extratos a partir de ``MINIMO_PAGINAS_PARALELO`` páginas
+    são lidos em faixas por até ``max_workers`` processos (padrão: um por
+    núcleo); o resultado é o mesmo da leitura sequencial. ``motor`` é um de
+    ``MOTORES``; sem cabeçalho de tabela, o de posição cai no texto corrido."""
+    # Importado aqui para não pesar na inicialização das outras páginas
+    import fitz  # PyMuPDF
+
+    dados_extraidos = []
+    erros = []
+    max_workers = max_workers or MAX_PROCESSOS
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        # As colunas são achadas uma vez e valem para todas as faixas
+        colunas = detect_columns(doc) if motor == MOTOR_POSICAO else None
+        if paralelo and max_workers > 1 and len(doc) >= MINIMO_PAGINAS_PARALELO:
+            resultados = _parse_in_parallel(
+                pdf_bytes, len(doc), max_workers, colunas
+            )
+        else:
+            resultados = parse_blocks(iter_document_blocks(doc, colunas))
+
+        for registro, erro in resultados:
+            if erro:
+                erros.append(erro)
+            else:
+                dados_extraidos.append(registro)
+
+    return pd.DataFrame(dados_extraidos), erros
@@ -0,0 +1,261 @@
+"""Histórico de notas fiscais em um banco SQLite local.
+
+Em vez de reenviar a exportação completa do ERP a cada sessão, as notas
+(cliente, vendedor, emissão, valor e CNPJ/CPF) ficam gravadas em
+``dados/historico.sqlite3`` e as páginas de CRM e de CNPJ podem consultá-las
+direto. Reenviar um ano de notas para acrescentar um dia só grava o dia novo.
+
+Não há número de nota nas exportações, então a chave de cada nota é o hash do
+seu conteúdo mais a ordem entre notas idênticas no mesmo arquivo (duas notas
+iguais no mesmo dia continuam sendo duas). O banco usa WAL: as páginas leem
+enquanto outra sessão grava.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from processamento.cache import RAIZ, hash_do_arquivo
+from processamento.cnpj import document_keys
+from processamento.diagnostico import medido
+from processamento.ingestao import DATA, NUMERO, TEXTO, as_text, read_columns
+
+CAMINHO_PADRAO = os.path.join(RAIZ, "dados", "historico.sqlite3")
+
+COLUNAS_HISTORICO = {
+    "NFS_EMISSAO": DATA,
+    "VEND_NOME": TEXTO,
+    "CLI_RAZ": TEXTO,
+    "NFS_CUSTO": NUMERO,
+    "CLI_CGCCPF": TEXTO,
+}
+OBRIGATORIAS_HISTORICO = ("NFS_EMISSAO", "CLI_RAZ", "NFS_CUSTO")
+
+# Coluna da planilha -> coluna da tabela
+CAMPOS = {
+    "NFS_EMISSAO": "emissao",
+    "VEND_NOME": "vendedor",
+    "CLI_RAZ": "cliente",
+    "NFS_CUSTO": "valor",
+    "CLI_CGCCPF": "documento",
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS notas (
+    hash INTEGER NOT NULL,
+    ordem INTEGER NOT NULL,
+    emissao TEXT,
+    vendedor TEXT,
+    cliente TEXT,
+    valor REAL,
+    documento TEXT,
+    chave_documento INTEGER NOT NULL,
+    PRIMARY KEY (hash, ordem)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS notas_vendedor ON notas (vendedor, cliente, emissao);
+CREATE INDEX IF NOT EXISTS notas_cliente ON notas (cliente, emissao);
+CREATE INDEX IF NOT EXISTS notas_emissao ON notas (emissao);
+CREATE INDEX IF NOT EXISTS notas_documento ON notas (chave_documento, emissao);
+CREATE TABLE IF NOT EXISTS arquivos (
+    hash TEXT PRIMARY KEY,
+    nome TEXT,
+    importado_em TEXT NOT NULL,
+    linhas INTEGER NOT NULL,
+    novas INTEGER NOT NULL
+);
+"""
+
+FORMATO_EMISSAO = "%Y-%m-%d %H:%M:%S"
+
+# Tipos das colunas antes do hash de cada nota (as demais viram texto)
+TIPOS_DO_HASH = {"emissao": "datetime64[us]", "valor": "float64"}
+
+
+@dataclass
+class Importacao:
+    linhas: int  # notas no arquivo
+    novas: int  # notas que ainda não estavam no histórico
+    ja_importado: bool = False  # o mesmo arquivo já tinha sido importado
+
+
+class InvoiceStore:
+    """Notas fiscais gravadas em SQLite, com deduplicação por nota."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._criado = False
+        # Uma importação por vez no processo; leituras não esperam
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        # Uma conexão por operação: as sessões do Streamlit rodam em threads
+        # diferentes e uma conexão do sqlite3 não deve ser compartilhada
+        if not self._criado:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        if not self._criado:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            self._criado = True
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    def import_dataframe(self, df, hash_arquivo=None, nome=""):
+        """Grava as notas de ``df`` (colunas do ERP) que ainda não existem."""
+        notas = _linhas_da_tabela(df)
+        with self._lock, closing(self._conectar()) as conexao, conexao:
+            antes = conexao.total_changes
+            conexao.executemany(
+                "INSERT OR IGNORE INTO notas VALUES (?, ?, ?, ?, ?, ?, ?, ?)", notas
+            )
+            novas = conexao.total_changes - antes
+            if hash_arquivo:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?)",
+                    (
+                        hash_arquivo,
+                        nome,
+                        datetime.now().strftime(FORMATO_EMISSAO),
+                        len(df),
+                        novas,
+                    ),
+                )
+        return Importacao(len(df), novas)
+
+    def import_file(self, file):
+        """Importa uma planilha enviada; um arquivo já importado (mesmo
+        conteúdo) nem é lido. Levanta ``ValueError`` se faltar coluna."""
+        hash_arquivo = hash_do_arquivo(file)
+        with closing(self._conectar()) as conexao:
+            importado = conexao.execute(
+                "SELECT linhas FROM arquivos WHERE hash = ?", (hash_arquivo,)
+            ).fetchone()
+        if importado:
+            return Importacao(importado[0], 0, ja_importado=True)
+
+        df = read_columns(file, COLUNAS_HISTORICO, OBRIGATORIAS_HISTORICO)
+        return self.import_dataframe(df, hash_arquivo, getattr(file, "name", ""))
+
+    def version(self):
+        """Muda sempre que notas são gravadas; serve de chave de cache."""
+        with closing(self._conectar()) as conexao:
+            total, ultima = conexao.execute(
+                "SELECT COUNT(*), MAX(importado_em) FROM arquivos"
+            ).fetchone()
+            notas = conexao.execute("SELECT COUNT(*) FROM notas").fetchone()[0]
+        return f"{notas}|{total}|{ultima}"
+
+    def stats(self):
+        if not os.path.exists(self.caminho):
+            # Sem importação nenhuma ainda: não cria o banco só para consultar
+            return {
+                "notas": 0,
+                "arquivos": 0,
+                "primeira_emissao": None,
+                "ultima_emissao": None,
+            }
+        with closing(self._conectar()) as conexao:
+            notas, primeira, ultima = conexao.execute(
+                "SELECT COUNT(*), MIN(emissao), MAX(emissao) FROM notas"
+            ).fetchone()
+            arquivos = conexao.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0]
+        return {
+            "notas": notas,
+            "arquivos": arquivos,
+            "primeira_emissao": pd.to_datetime(primeira),
+            "ultima_emissao": pd.to_datetime(ultima),
+        }
+
+    @medido("leitura do histórico", contar=lambda df: {"linhas": len(df)})
+    def read_invoices(self, vendedores=None, desde=None):
+        """Notas com os nomes de coluna do ERP (``NFS_EMISSAO``, ``VEND_NOME``,
+        ``CLI_RAZ``, ``NFS_CUSTO``, ``CLI_CGCCPF``), já tipadas. Os filtros
+        usam os índices por vendedor e por emissão."""
+        condicoes, parametros = [], []
+        if vendedores:
+            condicoes.append(f"vendedor IN ({', '.join('?' * len(vendedores))})")
+            parametros.extend(vendedores)
+        if desde is not None:
+            condicoes.append("emissao >= ?")
+            parametros.append(pd.Timestamp(desde).strftime(FORMATO_EMISSAO))
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        selecao = ", ".join(f"{campo} AS {coluna}" for coluna, campo in CAMPOS.items())
+        with closing(self._conectar()) as conexao:
+            df = pd.read_sql_query(
+                f"SELECT {selecao} FROM notas {onde}", conexao, params=parametros
+            )
+        df["NFS_EMISSAO"] = pd.to_datetime(df["NFS_EMISSAO"], format=FORMATO_EMISSAO)
+        df["NFS_CUSTO"] = df["NFS_CUSTO"].astype(float)
+        for coluna in ("VEND_NOME", "CLI_RAZ", "CLI_CGCCPF"):
+            df[coluna] = as_text(df[coluna])
+        return df
+
+    @medido("resumo de CNPJs no histórico", contar=lambda df: {"linhas": len(df)})
+    def document_summary(self):
+        """Primeira nota de cada CNPJ/CPF, no formato de
+        ``processamento.cnpj.summarize_documents``, agregada pelo SQLite."""
+        with closing(self._conectar()) as conexao:
+            resumo = pd.read_sql_query(
+                """
+                SELECT chave_documento AS CHAVE,
+                       CASE WHEN chave_documento = -1 THEN documento ELSE '' END
+                           AS DOCUMENTO,
+                       MIN(emissao) AS PRIMEIRA_NOTA
+                FROM notas
+                WHERE documento IS NOT NULL
+                GROUP BY 1, 2
+                """,
+                conexao,
+            )
+        resumo["CHAVE"] = resumo["CHAVE"].astype(np.int64)
+        resumo["PRIMEIRA_NOTA"] = pd.to_datetime(
+            resumo["PRIMEIRA_NOTA"], format=FORMATO_EMISSAO
+        )
+        return resumo
+
+
+def _linhas_da_tabela(df):
+    """Tuplas ``(hash, ordem, emissao, vendedor, cliente, valor, documento,
+    chave_documento)`` prontas para o ``executemany``."""
+    notas = pd.DataFrame(
+        {campo: df[coluna] if coluna in df.columns else None for coluna, campo in CAMPOS.items()}
+    )
+    # O hash depende dos tipos: pd.to_numeric dá int64 quando todos os valores
+    # do arquivo são inteiros e float64 quando não, e a data pode vir em outra
+    # resolução. Com os tipos fixados, a mesma nota gera o mesmo hash em
+    # qualquer exportação, com ou sem as colunas extras do ERP
+    notas = notas.astype(TIPOS_DO_HASH)
+    for campo in ("vendedor", "cliente", "documento"):
+        notas[campo] = as_text(notas[campo])
+    hashes = pd.util.hash_pandas_object(notas, index=False).to_numpy()
+    ordem = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+
+    documentos = notas["documento"]
+    chaves = np.full(len(notas), -1, dtype=np.int64)
+    presentes = documentos.notna().to_numpy()
+    if presentes.any():
+        codigos, textos = pd.factorize(documentos[presentes])
+        chaves[presentes] = document_keys(pd.Series(textos, dtype="str"))[0][codigos]
+
+    emissao = notas["emissao"].dt.strftime(FORMATO_EMISSAO)
+    colunas = [
+        hashes.view(np.int64).tolist(),
+        ordem.tolist(),
+        emissao.astype(object).where(emissao.notna(), None).tolist(),
+    ]
+    for campo in ("vendedor", "cliente", "valor", "documento"):
+        serie = notas[campo].astype(object)
+        colunas.append(serie.where(serie.notna(), None).tolist())
+    colunas.append(chaves.tolist())
+    return list(zip(*colunas))
+
+
+# Instância única por processo, compartilhada por todas as sessões
+historico = InvoiceStore(os.environ.get("CRM_HISTORICO", CAMINHO_PADRAO))
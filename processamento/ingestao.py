@@ -0,0 +1,139 @@
+"""Leitura das planilhas do ERP só com as colunas que cada página usa.
+
+As exportações do ERP têm dezenas de colunas, mas o CRM usa quatro e a
+positivação de CNPJ uma. ``read_columns`` lê apenas as colunas pedidas, já com
+o tipo certo (datas convertidas na leitura, valores como número, textos como
+texto) e passa pelo cache de planilhas; a leitura fora do cache espera a vez
+no agendador do servidor.
+
+O motor é o ``calamine`` (pacote ``python-calamine``, bem mais rápido) quando
+está instalado. Sem ele, ``.xlsx`` são lidos pelo openpyxl em modo somente
+leitura, linha a linha, guardando só as colunas pedidas, e ``.xls`` pelo xlrd.
+"""
+
+import importlib.util
+from io import BytesIO
+
+import pandas as pd
+
+from processamento.agendador import FATOR_EXCEL, agendador, memory_budget
+from processamento.cache import conteudo_do_arquivo, hash_do_arquivo, parse_cache
+from processamento.diagnostico import medido
+
+DATA = "data"
+NUMERO = "número"
+TEXTO = "texto"
+
+# Colunas usadas por página e o tipo de cada uma
+COLUNAS_CRM = {
+    "NFS_EMISSAO": DATA,
+    "VEND_NOME": TEXTO,
+    "CLI_RAZ": TEXTO,
+    "NFS_CUSTO": NUMERO,
+}
+# A data da nota é opcional: sem ela não há contagem de clientes novos por dia
+COLUNAS_CNPJ = {"CLI_CGCCPF": TEXTO, "NFS_EMISSAO": DATA}
+OBRIGATORIAS_CNPJ = ("CLI_CGCCPF",)
+
+
+def excel_engine(nome_arquivo):
+    if importlib.util.find_spec("python_calamine"):
+        return "calamine"
+    return "xlrd" if nome_arquivo.lower().endswith(".xls") else "openpyxl"
+
+
+@medido("leitura do Excel", contar=lambda df: {"linhas": len(df)})
+def read_columns(file, colunas, obrigatorias=None):
+    """DataFrame só com ``colunas`` (``{nome: DATA | NUMERO | TEXTO}``), na
+    ordem pedida. Levanta ``ValueError`` se faltar alguma das ``obrigatorias``
+    (por padrão, todas); as opcionais ausentes ficam de fora do resultado."""
+    engine = excel_engine(getattr(file, "name", ""))
+    variante = f"colunas|{engine}|{sorted(colunas.items())}"
+    df = parse_cache.get_or_compute(
+        hash_do_arquivo(file),
+        lambda: _ler(conteudo_do_arquivo(file), colunas, engine),
+        variante,
+    )
+    if obrigatorias is None:
+        obrigatorias = colunas
+    faltando = [coluna for coluna in obrigatorias if coluna not in df.columns]
+    if faltando:
+        nomes = ", ".join(f"'{coluna}'" for coluna in faltando)
+        raise ValueError(f"A planilha deve conter a(s) coluna(s) {nomes}")
+    return df
+
+
+def _ler(dados, colunas, engine):
+    with agendador.admit("leitura de planilha", memory_budget(len(dados), FATOR_EXCEL)):
+        return _ler_colunas(dados, colunas, engine)
+
+
+def _ler_colunas(dados, colunas, engine):
+    if engine == "openpyxl":
+        df = _ler_openpyxl(dados, colunas)
+    else:
+        df = pd.read_excel(
+            BytesIO(dados),
+            engine=engine,
+            usecols=lambda nome: str(nome).strip() in colunas,
+            dtype={nome: str for nome, tipo in colunas.items() if tipo == TEXTO},
+        )
+        df.columns = [str(nome).strip() for nome in df.columns]
+    return _tipar(df, colunas)
+
+
+def _ler_openpyxl(dados, colunas):
+    """Lê a primeira aba guardando só as colunas pedidas."""
+    from openpyxl import load_workbook
+
+    livro = load_workbook(BytesIO(dados), read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        indices = {}
+        for indice, nome in enumerate(next(linhas, ())):
+            nome = str(nome).strip()
+            if nome in colunas and nome not in indices:
+                indices[nome] = indice
+
+        valores = {nome: [] for nome in indices}
+        pares = list(indices.items())
+        for linha in linhas:
+            celulas = [linha[i] if i < len(linha) else None for _, i in pares]
+            # Linhas vazias (comuns no fim das exportações) ficam de fora
+            if all(celula is None for celula in celulas):
+                continue
+            for (nome, _), celula in zip(pares, celulas):
+                valores[nome].append(celula)
+    finally:
+        livro.close()
+    return pd.DataFrame(valores)
+
+
+def _tipar(df, colunas):
+    tipadas = {}
+    for nome, tipo in colunas.items():
+        if nome not in df.columns:
+            continue
+        serie = df[nome]
+        if tipo == DATA:
+            if not pd.api.types.is_datetime64_any_dtype(serie):
+                serie = pd.to_datetime(serie, errors="coerce", dayfirst=True)
+        elif tipo == NUMERO:
+            serie = pd.to_numeric(serie, errors="coerce")
+        else:
+            # Números inteiros (ex.: CNPJ sem máscara) sem ".0" no fim
+            serie = as_text(serie.map(_texto, na_action="ignore"))
+        tipadas[nome] = serie
+    return pd.DataFrame(tipadas, index=df.index).reset_index(drop=True)
+
+
+def as_text(serie):
+    """``serie`` como texto com os vazios ainda vazios (NaN). No pandas 2,
+    ``astype("str")`` sozinho transforma NaN no texto "nan"."""
+    return serie.astype("str").where(serie.notna())
+
+
+def _texto(valor):
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
@@ -0,0 +1,260 @@
+"""Layouts de extratos bancários.
+
+Cada banco exporta o extrato de um jeito. Um ``LayoutBancario`` reconhece o
+seu formato pelo cabeçalho (e por uma amostra das linhas) e sabe separar os
+valores de crédito e débito. Para aceitar um banco novo basta registrar mais
+um layout com ``register_layout``; ``parse_statement`` lê o cabeçalho uma vez,
+escolhe o primeiro layout que o reconhece e devolve as transações no formato
+padrão (Data, Documento, Historico, Valor Crédito, Valor Débito).
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# Tipos de linha do extrato; só as transações vão para a planilha final
+TIPO_TRANSACAO = "transação"
+TIPO_SALDO = "saldo"
+TIPO_SEPARADOR = "separador"
+TIPO_VAZIA = "vazia"
+
+# Um único regex classifica a linha pelo histórico
+_CLASSIFICADOR = r"(?P<separador>====>)|(?P<saldo>SALDO)"
+
+# Palavras que identificam cada campo no cabeçalho (já sem acentos e em
+# minúsculas). A ordem importa: "data lancamento" é data, não histórico, e
+# "valor credito" é crédito, não valor.
+PALAVRAS_CAMPOS = {
+    "data": ("data", "dt mov", "dt lanc"),
+    "credito": ("credito", "entrada"),
+    "debito": ("debito", "saida"),
+    "documento": ("documento", "doc", "nr ", "numero"),
+    "historico": ("historico", "descricao", "lancamento", "complemento"),
+    "valor": ("valor", "montante", "quantia"),
+}
+
+# Linhas iniciais procuradas pelo cabeçalho (muitos bancos põem o nome da
+# conta, o período etc. antes dele)
+LINHAS_PROCURADAS = 20
+TAMANHO_AMOSTRA = 50
+
+_SUFIXO_CD = r"([\d.,]+)\s*([CD])$"
+
+
+def _proporcao_sufixo_cd(valores):
+    """Fração dos valores da amostra que terminam em C ou D."""
+    return valores.str.contains(r"[\d.,]+\s*[CD]$").mean()
+
+# "1.234,56" -> "1234.56" em uma única passada por valor
+_TABELA_DECIMAL = str.maketrans({".": None, ",": "."})
+_NUMERO_BRASILEIRO = r"-?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?"
+_NUMERO_MAQUINA = r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?"
+
+
+@dataclass
+class LayoutBancario:
+    nome: str
+    # (cabeçalho normalizado, amostra das linhas seguintes) -> {campo: coluna}
+    # ou None quando o layout não reconhece a planilha
+    identificar: Callable
+    # tabela com as colunas padrão -> (crédito, débito) como Series numéricas
+    separar_valores: Callable
+
+
+LAYOUTS = []
+
+
+def register_layout(layout):
+    """Registra um layout. Os registrados primeiro têm prioridade."""
+    LAYOUTS.append(layout)
+    return layout
+
+
+def normalize_header(texto):
+    if texto is None or (isinstance(texto, float) and np.isnan(texto)):
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().replace(".", " ").split())
+
+
+def map_header_fields(cabecalho):
+    """{campo: índice da coluna} pelas palavras de ``PALAVRAS_CAMPOS``."""
+    campos = {}
+    for indice, nome in enumerate(cabecalho):
+        for campo, palavras in PALAVRAS_CAMPOS.items():
+            if campo not in campos and any(p in f"{nome} " for p in palavras):
+                campos[campo] = indice
+                break
+    return campos
+
+
+def parse_amounts(valores):
+    """Converte textos de valor para float em uma passada. O padrão
+    brasileiro ("1.234,56", "1.500") vem primeiro; só o que não segue esse
+    padrão é lido como número com ponto decimal ("1234.5"). Vazios e textos
+    inválidos viram 0.0."""
+    valores = valores.str.replace("R$", "", regex=False).str.strip()
+    brasileiro = valores.str.fullmatch(_NUMERO_BRASILEIRO).fillna(False).astype(bool)
+    maquina = valores.str.fullmatch(_NUMERO_MAQUINA).fillna(False).astype(bool)
+    maquina &= ~brasileiro
+    texto = valores.where(maquina, valores.str.translate(_TABELA_DECIMAL).where(brasileiro))
+    return pd.to_numeric(texto, errors="coerce").fillna(0.0)
+
+
+def _texto_da_celula(valor):
+    # Números guardados como número no Excel viram texto no padrão brasileiro,
+    # como os valores digitados: assim "1.500" só pode ser mil e quinhentos
+    if isinstance(valor, float):
+        return repr(valor).replace(".", ",")
+    return str(valor)
+
+
+def cells_as_text(bruto):
+    """Células de um extrato lido com ``dtype=object`` como texto (as vazias
+    continuam NaN), com os números do Excel no padrão brasileiro. Cada coluna
+    fica com um só tipo, o que o cache em Parquet aceita."""
+    return bruto.map(_texto_da_celula, na_action="ignore")
+
+
+def classify_rows(tabela, colunas_valor):
+    """Tipo de cada linha (transação, saldo, separador ou vazia)."""
+    marcas = tabela["Historico"].str.extract(_CLASSIFICADOR, flags=re.IGNORECASE)
+    vazia = tabela[["Historico", *colunas_valor]].isna().all(axis=1)
+    return pd.Series(
+        np.select(
+            [vazia.to_numpy(), marcas["separador"].notna(), marcas["saldo"].notna()],
+            [TIPO_VAZIA, TIPO_SEPARADOR, TIPO_SALDO],
+            TIPO_TRANSACAO,
+        ),
+        index=tabela.index,
+    )
+
+
+# Layouts embutidos
+def _identificar_colunas_credito_debito(cabecalho, amostra):
+    campos = map_header_fields(cabecalho)
+    if {"data", "historico", "credito", "debito"} <= campos.keys():
+        return campos
+    return None
+
+
+def _valores_credito_debito(tabela):
+    return parse_amounts(tabela["Crédito"]).abs(), parse_amounts(tabela["Débito"]).abs()
+
+
+def _identificar_valor_com_sinal(cabecalho, amostra):
+    campos = map_header_fields(cabecalho)
+    if not {"data", "historico", "valor"} <= campos.keys():
+        return None
+    valores = amostra.iloc[:, campos["valor"]].dropna().str.strip()
+    # Com sufixo C/D é o layout do próximo registro
+    if len(valores) and _proporcao_sufixo_cd(valores) >= 0.5:
+        return None
+    return campos
+
+
+def _valores_com_sinal(tabela):
+    # "-1.234,56", "1.234,56-" e "(1.234,56)" são débitos, também com "R$"
+    # antes ou depois do sinal ("R$ -1.234,56", "-R$ 1.234,56")
+    valores = tabela["Valor"].str.replace("R$", "", regex=False).str.replace(
+        r"\s+", "", regex=True
+    )
+    negativo = valores.str.contains(r"^-|-$|^\(.*\)$", na=False)
+    numeros = parse_amounts(valores.str.strip("-()")).abs()
+    return numeros.where(~negativo, 0.0), numeros.where(negativo, 0.0)
+
+
+def _identificar_sufixo_cd(cabecalho, amostra):
+    # Layout original: exatamente quatro colunas (Data, Documento, Histórico,
+    # Valor) e o valor terminando em C ou D, com qualquer cabeçalho
+    if len(cabecalho) != 4:
+        return None
+    valores = amostra.iloc[:, 3].dropna().str.strip()
+    if len(valores) == 0 or _proporcao_sufixo_cd(valores) < 0.5:
+        return None
+    return {"data": 0, "documento": 1, "historico": 2, "valor": 3}
+
+
+def _valores_sufixo_cd(tabela):
+    # Número e indicador C/D saem de uma única leitura da coluna
+    partes = tabela["Valor"].str.extract(_SUFIXO_CD)
+    valor = parse_amounts(partes[0])
+    return valor.where(partes[1] == "C", 0.0), valor.where(partes[1] == "D", 0.0)
+
+
+register_layout(
+    LayoutBancario(
+        "Colunas de crédito e débito",
+        _identificar_colunas_credito_debito,
+        _valores_credito_debito,
+    )
+)
+register_layout(
+    LayoutBancario("Valor com sinal", _identificar_valor_com_sinal, _valores_com_sinal)
+)
+register_layout(
+    LayoutBancario("Valor com sufixo C/D", _identificar_sufixo_cd, _valores_sufixo_cd)
+)
+
+# Nome padrão de cada campo na tabela intermediária
+NOMES_CAMPOS = {
+    "data": "Data",
+    "documento": "Documento",
+    "historico": "Historico",
+    "valor": "Valor",
+    "credito": "Crédito",
+    "debito": "Débito",
+}
+
+
+def detect_layout(bruto):
+    """Procura o cabeçalho nas primeiras linhas e o primeiro layout que o
+    reconhece. Devolve ``(layout, linha_do_cabecalho, {campo: coluna})``."""
+    limite = min(LINHAS_PROCURADAS, len(bruto))
+    cabecalhos = [
+        [normalize_header(celula) for celula in bruto.iloc[linha]]
+        for linha in range(limite)
+    ]
+    for layout in LAYOUTS:
+        for linha, cabecalho in enumerate(cabecalhos):
+            amostra = bruto.iloc[linha + 1 : linha + 1 + TAMANHO_AMOSTRA]
+            campos = layout.identificar(cabecalho, amostra)
+            if campos is not None:
+                return layout, linha, campos
+    raise ValueError(
+        "Layout de extrato não reconhecido. Layouts aceitos: "
+        + ", ".join(layout.nome for layout in LAYOUTS)
+    )
+
+
+def parse_statement(bruto):
+    """Transações de um extrato lido sem cabeçalho (``header=None``) e como
+    texto (de preferência por ``cells_as_text``). Devolve ``(df, layout)``
+    com as colunas Data, Documento, Historico, Valor Crédito e Valor Débito."""
+    # Colunas totalmente vazias (comuns em exportações) não contam no layout
+    bruto = bruto.dropna(axis=1, how="all")
+    bruto.columns = range(bruto.shape[1])
+    layout, linha, campos = detect_layout(bruto)
+
+    tabela = pd.DataFrame(
+        {
+            NOMES_CAMPOS[campo]: bruto.iloc[linha + 1 :, coluna].str.strip()
+            for campo, coluna in campos.items()
+        }
+    )
+    if "Documento" not in tabela:
+        tabela["Documento"] = ""
+
+    colunas_valor = [c for c in ("Valor", "Crédito", "Débito") if c in tabela]
+    tabela = tabela[classify_rows(tabela, colunas_valor) == TIPO_TRANSACAO]
+
+    credito, debito = layout.separar_valores(tabela)
+    df = tabela[["Data", "Documento", "Historico"]].assign(
+        **{"Valor Crédito": credito, "Valor Débito": debito}
+    )
+    return df.reset_index(drop=True), layout
@@ -0,0 +1,212 @@
+"""Processamento em lote, fora do Streamlit, de pastas inteiras de arquivos.
+
+Usado pelo ``scripts/processar_lote.py``. Cada arquivo é processado por um
+processo do pool e o resultado vai direto para o disco; para o processo
+principal volta só um resumo pequeno (``ResultadoArquivo``). As tarefas são
+enviadas aos poucos ao pool, então milhares de arquivos não ficam todos na
+fila ao mesmo tempo.
+"""
+
+import filecmp
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from processamento.agendador import MAX_PROCESSOS, discard_pool, process_pool
+from processamento.notas_fiscais import extract_batch, iter_pdfs_from_zip
+
+EXTENSOES_PLANILHA = (".xls", ".xlsx")
+EXTENSOES_PDF = (".pdf",)
+
+
+@dataclass
+class ResultadoArquivo:
+    entrada: str
+    saida: str | None = None
+    linhas: int | None = None
+    erro: str | None = None
+    segundos: float = 0.0
+    detalhe: str | None = None  # layout detectado, método de leitura, avisos
+
+
+def iter_input_files(entradas, extensoes):
+    """Gera ``(caminho, caminho relativo)`` dos arquivos com ``extensoes`` em
+    ``entradas`` (arquivos ou pastas, percorridas recursivamente em ordem)."""
+    for entrada in entradas:
+        if os.path.isfile(entrada):
+            if entrada.lower().endswith(extensoes):
+                yield entrada, os.path.basename(entrada)
+            continue
+        for pasta, subpastas, arquivos in os.walk(entrada):
+            subpastas.sort()
+            for nome in sorted(arquivos):
+                if nome.lower().endswith(extensoes):
+                    caminho = os.path.join(pasta, nome)
+                    yield caminho, os.path.relpath(caminho, entrada)
+
+
+def output_path(destino, relativo, sufixo, extensao):
+    """Caminho de saída que mantém as subpastas da entrada."""
+    base = os.path.splitext(relativo)[0]
+    caminho = os.path.join(destino, f"{base}{sufixo}.{extensao}")
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    return caminho
+
+
+def run_in_pool(funcao, tarefas, max_workers=None):
+    """Executa ``funcao(*tarefa)`` para cada tarefa e gera os resultados na
+    ordem em que terminam. No máximo duas tarefas por processo ficam
+    pendentes; com um processo só, roda tudo aqui mesmo."""
+    max_workers = max_workers or MAX_PROCESSOS
+    if max_workers <= 1:
+        for tarefa in tarefas:
+            yield funcao(*tarefa)
+        return
+
+    # O mesmo pool das outras etapas (o de process_pool), criado no primeiro uso
+    pool = process_pool(max_workers)
+    pendentes = set()
+    try:
+        for tarefa in tarefas:
+            pendentes.add(pool.submit(funcao, *tarefa))
+            if len(pendentes) >= 2 * max_workers:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                yield from (futuro.result() for futuro in prontos)
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            yield from (futuro.result() for futuro in prontos)
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+
+
+def _exportar(df, caminho, formato):
+    from processamento.exportacao import FORMATOS_EXPORTACAO
+
+    FORMATOS_EXPORTACAO[formato][2](df, caminho)
+
+
+def process_bank_file(caminho, saida, formato="Excel"):
+    """Organiza um extrato bancário e grava o resultado em ``saida``."""
+    from processamento.planilha_bancaria import OPCOES_XLSX, process_bank_statement
+
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, "rb") as arquivo:
+            df, layout = process_bank_statement(arquivo)
+        if formato == "Excel":
+            from processamento.exportacao import to_xlsx
+
+            to_xlsx(df, saida, **OPCOES_XLSX)
+        else:
+            _exportar(df, saida, formato)
+    except Exception as e:
+        return ResultadoArquivo(caminho, erro=str(e), segundos=time.perf_counter() - inicio)
+    # As duas últimas linhas são os totais
+    return ResultadoArquivo(
+        caminho, saida, len(df) - 2, segundos=time.perf_counter() - inicio, detalhe=layout.nome
+    )
+
+
+def process_ml_file(
+    caminho, saida, formato="Excel", motor=None, paralelo=False, max_workers=None
+):
+    """Extrai as transações de um extrato do Mercado Livre para ``saida``."""
+    from processamento.exportacao import FORMATO_CONTABIL
+    from processamento.extrato_ml import MOTOR_POSICAO, parse_ml_statement
+
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, "rb") as arquivo:
+            df, erros = parse_ml_statement(
+                arquivo.read(), paralelo, max_workers, motor=motor or MOTOR_POSICAO
+            )
+        if formato == "Excel":
+            from processamento.exportacao import to_xlsx
+
+            to_xlsx(
+                df,
+                saida,
+                formatos={"Valor": FORMATO_CONTABIL, "Saldo": FORMATO_CONTABIL},
+            )
+        else:
+            _exportar(df, saida, formato)
+    except Exception as e:
+        return ResultadoArquivo(caminho, erro=str(e), segundos=time.perf_counter() - inicio)
+    return ResultadoArquivo(
+        caminho,
+        saida,
+        len(df),
+        segundos=time.perf_counter() - inicio,
+        detalhe=f"{len(erros)} transação(ões) não lida(s)" if erros else None,
+    )
+
+
+def _destino_da_nota(pasta, nome, pdf, usados):
+    """Nome em ``pasta`` para a nota ``pdf`` e se ela já está lá. Duas notas
+    com o mesmo emitente e número não se sobrescrevem (a segunda vira
+    "nome (2)"), mas uma cópia idêntica deixada por uma execução anterior é
+    reaproveitada, então rodar o lote de novo não duplica a pasta."""
+    base, extensao = os.path.splitext(nome)
+    candidato, copia = nome, 2
+    while True:
+        caminho = os.path.join(pasta, candidato)
+        if candidato not in usados:
+            if not os.path.exists(caminho):
+                existe = False
+                break
+            if filecmp.cmp(pdf, caminho, shallow=False):
+                existe = True
+                break
+        candidato = f"{base} ({copia}){extensao}"
+        copia += 1
+    usados.add(candidato)
+    return caminho, existe
+
+
+def rename_invoices(entradas, destino, rapido=True, max_workers=None):
+    """Renomeia as notas (PDFs soltos e dentro de ZIPs) de ``entradas``,
+    copiando cada uma para ``destino`` com o nome novo assim que termina.
+    Gera um ``ResultadoArquivo`` por nota."""
+    os.makedirs(destino, exist_ok=True)
+    origens = {}  # índice no lote → (entrada, PDF em disco, se é temporário)
+    indices = itertools.count()
+    usados = set()
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+
+        def pdfs():
+            # PDFs de ZIPs são descompactados um por vez para a pasta temporária
+            for caminho, _ in iter_input_files(entradas, EXTENSOES_PDF + (".zip",)):
+                if caminho.lower().endswith(".zip"):
+                    pasta = tempfile.mkdtemp(dir=pasta_temporaria)
+                    for nome, pdf in iter_pdfs_from_zip(caminho, pasta):
+                        origens[next(indices)] = (f"{caminho}:{nome}", pdf, True)
+                        yield nome, pdf
+                else:
+                    origens[next(indices)] = (caminho, caminho, False)
+                    yield os.path.basename(caminho), caminho
+
+        for resultado in extract_batch(pdfs(), max_workers, rapido):
+            entrada, pdf, temporario = origens.pop(resultado.indice)
+            saida = detalhe = None
+            if resultado.novo_nome:
+                saida, existe = _destino_da_nota(destino, resultado.novo_nome, pdf, usados)
+                if existe:
+                    detalhe = "já estava no destino"
+                else:
+                    shutil.copyfile(pdf, saida)
+            if temporario:
+                os.remove(pdf)
+            yield ResultadoArquivo(
+                entrada,
+                saida,
+                erro=None if saida else "emitente e número da nota não encontrados",
+                segundos=resultado.segundos,
+                detalhe=", ".join(filter(None, (resultado.metodo, detalhe))) or None,
+            )
@@ -0,0 +1,399 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+
+from processamento.agendador import MAX_PROCESSOS, discard_pool, process_pool
+from processamento.cache import RAIZ, ParseCache, sha256_bytes
+
+# Abaixo disso não compensa mandar os PDFs para outros processos
+MINIMO_PARA_PARALELO = 4
+
+# Parte de cima da página 1 lida no caminho rápido (cabeçalho do DANFE)
+FRACAO_CABECALHO = 0.35
+
+# Caminho que encontrou os dados de cada nota
+METODO_CABECALHO = "cabeçalho"
+METODO_COMPLETO = "documento completo"
+
+# O ZIP de saída fica em memória até este tamanho e depois passa para o disco
+LIMITE_ZIP_EM_MEMORIA = 32 * 1024 * 1024
+
+
+# 🟢 FUNÇÕES DE RENOMEAÇÃO DE NOTAS
+# Função para extrair PDFs do ZIP enviado
+def extract_pdfs_from_zip(zip_file):
+    extracted_pdfs = []
+    with zipfile.ZipFile(zip_file, "r") as z:
+        for file_name in z.namelist():
+            if file_name.lower().endswith(".pdf"):  # Apenas arquivos .pdf
+                with z.open(file_name) as f:
+                    pdf_bytes = f.read()
+                    extracted_pdfs.append((file_name, pdf_bytes))
+    return extracted_pdfs
+
+
+def count_pdfs_in_zip(zip_file):
+    """Quantidade de PDFs no ZIP (lê só o índice do arquivo)."""
+    with zipfile.ZipFile(zip_file, "r") as z:
+        return sum(
+            1
+            for info in z.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".pdf")
+        )
+
+
+def iter_pdfs_from_zip(zip_file, diretorio):
+    """Gera ``(nome_original, caminho)`` para cada PDF do ZIP, um de cada vez.
+
+    Cada PDF é descompactado direto para um arquivo em ``diretorio`` (em
+    blocos, sem passar inteiro pela memória) só quando o consumidor pede o
+    próximo, então o uso de memória não cresce com o tamanho do ZIP.
+    """
+    with zipfile.ZipFile(zip_file, "r") as z:
+        for indice, info in enumerate(z.infolist()):
+            if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                continue  # Apenas arquivos .pdf
+            # Nome sequencial: o nome dentro do ZIP pode ter pastas ou "../"
+            caminho = os.path.join(diretorio, f"{indice:06d}.pdf")
+            with z.open(info) as origem, open(caminho, "wb") as destino:
+                shutil.copyfileobj(origem, destino)
+            yield info.filename, caminho
+
+
+# Função para extrair informações do PDF e gerar nome novo
+# (aceita o conteúdo do PDF em bytes ou o caminho do arquivo)
+def extract_info_from_pdf(pdf_bytes):
+    # Importado aqui para não pesar na inicialização das outras páginas
+    import PyPDF2
+
+    try:
+        origem = BytesIO(pdf_bytes) if isinstance(pdf_bytes, bytes) else pdf_bytes
+        reader = PyPDF2.PdfReader(origem)
+        # Extrai o texto de cada página uma única vez
+        textos = (page.extract_text() for page in reader.pages)
+        text = "\n".join(texto for texto in textos if texto)
+        return _parse_nf_text(text)
+    except Exception as e:
+        print(f"Erro ao processar PDF: {e}")
+    return None
+
+
+def extract_info_from_header(pdf):
+    """Caminho rápido: lê só o cabeçalho da primeira página com o PyMuPDF.
+
+    No DANFE o emitente e o número da nota ficam sempre no quadro do topo da
+    página 1, então não é preciso extrair o texto da lista de itens nem das
+    outras páginas. Devolve ``None`` quando não encontra os dois campos.
+    """
+    import fitz  # PyMuPDF
+
+    try:
+        if isinstance(pdf, bytes):
+            doc = fitz.open(stream=pdf, filetype="pdf")
+        else:
+            doc = fitz.open(pdf)
+        with doc:
+            if doc.page_count == 0:
+                return None
+            pagina = doc[0]
+            area = pagina.rect
+            cabecalho = fitz.Rect(
+                area.x0, area.y0, area.x1, area.y0 + area.height * FRACAO_CABECALHO
+            )
+            return _parse_nf_text(pagina.get_text("text", clip=cabecalho))
+    except Exception:
+        # PDF que o PyMuPDF não abre: o caminho completo tenta com o PyPDF2
+        return None
+
+
+def _parse_nf_text(text):
+    emitente_match = re.search(
+        r"IDENTIFICAÇÃO DO EMITENTE\s*([\wÀ-ÿ\-.,& ]+)", text, re.MULTILINE
+    )
+    numero_match = re.search(r"Nº\.:\s*(\d{3}\.\d{3}\.\d{3})", text)
+
+    if emitente_match and numero_match:
+        emitente = emitente_match.group(1).strip()
+        numero_nota = numero_match.group(1).strip()
+        return f"{numero_nota} - {emitente}.pdf"
+    return None
+
+
+@dataclass
+class ResultadoNota:
+    indice: int  # posição do arquivo no lote enviado
+    nome_original: str
+    novo_nome: str | None  # None quando não foi possível renomear
+    segundos: float
+    metodo: str | None = None  # METODO_CABECALHO, METODO_COMPLETO ou None
+    sha256: str | None = None  # hash do conteúdo do PDF
+    do_cache: bool = False  # True quando veio do cache, sem abrir o PDF
+
+
+def rename_pdf(indice, nome_original, pdf, rapido=True, sha256=None):
+    """Extrai os dados da nota e monta o nome novo no formato "Nome - Número".
+
+    Com ``rapido`` tenta primeiro só o cabeçalho da página 1 e recorre ao
+    documento completo apenas quando ele não traz os dois campos.
+    """
+    inicio = time.perf_counter()
+    extracted_info = extract_info_from_header(pdf) if rapido else None
+    metodo = METODO_CABECALHO
+    if not extracted_info:
+        extracted_info = extract_info_from_pdf(pdf)
+        metodo = METODO_COMPLETO
+
+    novo_nome = None
+    if extracted_info:
+        # Inverter a ordem para "Nome - Número"
+        numero, nome = extracted_info.removesuffix(".pdf").split(" - ", 1)
+        novo_nome = f"{nome} - {numero}.pdf"
+    else:
+        metodo = None
+    return ResultadoNota(
+        indice, nome_original, novo_nome, time.perf_counter() - inicio, metodo, sha256
+    )
+
+
+def hash_pdf(pdf):
+    """SHA-256 de um PDF em bytes ou do arquivo em ``pdf`` (lido em blocos)."""
+    if isinstance(pdf, bytes):
+        return sha256_bytes(pdf)
+    digest = hashlib.sha256()
+    with open(pdf, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def extract_batch(pdfs, max_workers=None, rapido=True, cache=None):
+    """Renomeia um lote de ``(nome_original, pdf)`` em paralelo, onde ``pdf`` é
+    o conteúdo em bytes ou o caminho do arquivo.
+
+    Gera um ``ResultadoNota`` por arquivo à medida que cada um termina (fora da
+    ordem de envio; use ``indice`` para reordenar). No máximo duas tarefas por
+    processo ficam pendentes ao mesmo tempo e ``pdfs`` pode ser um gerador: o
+    lote é consumido aos poucos em vez de ser todo copiado para o pool (o
+    ``process_pool`` compartilhado). ``rapido`` liga o caminho rápido pelo
+    cabeçalho (veja ``rename_pdf``).
+
+    Os PDFs já vistos (mesmo conteúdo) saem do ``cache`` sem ser abertos; o
+    padrão é o ``resultados_cache`` do processo.
+    """
+    max_workers = max_workers or MAX_PROCESSOS
+    cache = resultados_cache if cache is None else cache
+    variante = f"nf|rapido={rapido}"
+
+    def guardar(resultado):
+        cache.put(resultado.sha256, (resultado.novo_nome, resultado.metodo), variante)
+        return resultado
+
+    # Os PDFs fora do cache esperam em "aguardando" até que sejam suficientes
+    # para compensar usar o pool; lotes pequenos rodam aqui mesmo
+    aguardando = []
+    pendentes = set()
+    pool = None
+    try:
+        for indice, (nome_original, pdf) in enumerate(pdfs):
+            digest = hash_pdf(pdf)
+            em_cache = cache.get(digest, variante)
+            if em_cache is not None:
+                novo_nome, metodo = em_cache
+                yield ResultadoNota(
+                    indice, nome_original, novo_nome, 0.0, metodo, digest, True
+                )
+                continue
+
+            tarefa = (indice, nome_original, pdf, rapido, digest)
+            if max_workers <= 1:
+                yield guardar(rename_pdf(*tarefa))
+                continue
+            if pool is None:
+                aguardando.append(tarefa)
+                if len(aguardando) < MINIMO_PARA_PARALELO:
+                    continue
+                pool = process_pool(max_workers)
+                pendentes = {pool.submit(rename_pdf, *t) for t in aguardando}
+                aguardando = []
+            else:
+                pendentes.add(pool.submit(rename_pdf, *tarefa))
+
+            if len(pendentes) >= 2 * max_workers:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    yield guardar(futuro.result())
+
+        for tarefa in aguardando:
+            yield guardar(rename_pdf(*tarefa))
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield guardar(futuro.result())
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+    finally:
+        # O pool é compartilhado: só as tarefas deste lote que ainda não
+        # começaram são canceladas
+        for futuro in pendentes:
+            futuro.cancel()
+
+
+class RenamedZip:
+    """ZIP de saída gravado aos poucos, um PDF por vez.
+
+    Sem ``caminho`` o arquivo fica em um ``SpooledTemporaryFile``: em memória
+    enquanto é pequeno e no disco quando passa de ``limite_memoria``. Com
+    ``caminho`` é gravado direto nesse arquivo (que aparece só no ``close``).
+    """
+
+    def __init__(self, caminho=None, limite_memoria=LIMITE_ZIP_EM_MEMORIA):
+        self.caminho = caminho
+        if caminho:
+            self._temporario = f"{caminho}.{threading.get_ident()}.tmp"
+            self.arquivo = open(self._temporario, "w+b")
+        else:
+            self.arquivo = tempfile.SpooledTemporaryFile(max_size=limite_memoria)
+        self._zip = zipfile.ZipFile(self.arquivo, "w")
+        self.nomes = []
+        self._usados = set()
+        # Downloads simultâneos leem o mesmo arquivo
+        self._lock = threading.Lock()
+
+    def add(self, novo_nome, pdf):
+        """Adiciona o PDF (bytes ou caminho) e devolve o nome usado no ZIP."""
+        nome = novo_nome
+        base, extensao = os.path.splitext(novo_nome)
+        copia = 2
+        while nome in self._usados:  # duas notas com o mesmo emitente e número
+            nome = f"{base} ({copia}){extensao}"
+            copia += 1
+        self._usados.add(nome)
+
+        if isinstance(pdf, bytes):
+            self._zip.writestr(nome, pdf)
+        else:
+            self._zip.write(pdf, nome)
+        self.nomes.append(nome)
+        return nome
+
+    def read(self, nome):
+        """Conteúdo de um PDF já gravado (só depois de ``close``)."""
+        with self._lock, zipfile.ZipFile(self.arquivo, "r") as z:
+            return z.read(nome)
+
+    def getvalue(self):
+        """Conteúdo do ZIP inteiro (só depois de ``close``)."""
+        with self._lock:
+            self.arquivo.seek(0)
+            return self.arquivo.read()
+
+    def close(self):
+        """Finaliza o ZIP e devolve o arquivo posicionado no início."""
+        self._zip.close()
+        self.arquivo.flush()
+        if self.caminho:
+            os.replace(self._temporario, self.caminho)
+        self.arquivo.seek(0)
+        return self.arquivo
+
+    def discard(self):
+        """Abandona um ZIP que não vai ser terminado (ex.: lote cancelado)."""
+        self._zip.close()
+        self.arquivo.close()
+        if self.caminho:
+            os.remove(self._temporario)
+
+
+@dataclass
+class LoteRenomeado:
+    resultados: list  # ResultadoNota na ordem de envio
+    arquivo: RenamedZip  # ZIP com os PDFs renomeados
+    segundos: float
+
+
+def rename_batch_to_zip(pdfs, caminho_zip=None, rapido=True, ao_progredir=None):
+    """Renomeia o lote com ``extract_batch`` gravando cada PDF no ZIP de saída
+    assim que ele termina. Os PDFs recebidos como caminho (ex.: vindos de
+    ``iter_pdfs_from_zip``) são apagados depois de entrar no ZIP.
+
+    ``ao_progredir(concluidos)`` é chamada a cada arquivo processado; se ela
+    levantar uma exceção (ex.: lote cancelado), o ZIP incompleto é apagado.
+    """
+    resultados = []
+    origens = {}  # só guarda os PDFs ainda não gravados no ZIP
+    saida = RenamedZip(caminho_zip)
+    inicio = time.perf_counter()
+
+    def registrar_origem(pdfs):
+        for indice, (nome_original, pdf) in enumerate(pdfs):
+            origens[indice] = pdf
+            yield nome_original, pdf
+
+    # Os arquivos chegam fora de ordem; cada um vai para o ZIP assim que termina
+    try:
+        for resultado in extract_batch(registrar_origem(pdfs), rapido=rapido):
+            resultados.append(resultado)
+            pdf = origens.pop(resultado.indice)
+            if resultado.novo_nome:
+                resultado.novo_nome = saida.add(resultado.novo_nome, pdf)
+            if not isinstance(pdf, bytes):
+                os.remove(pdf)
+            if ao_progredir:
+                ao_progredir(len(resultados))
+    except BaseException:
+        saida.discard()
+        raise
+
+    saida.close()
+    resultados.sort(key=lambda r: r.indice)
+    return LoteRenomeado(resultados, saida, time.perf_counter() - inicio)
+
+
+def chave_do_lote(hashes, rapido=True):
+    """Identifica um lote pelo conjunto dos hashes dos arquivos enviados."""
+    return sha256_bytes(f"{sorted(hashes)}|rapido={rapido}".encode())
+
+
+def cached_batch(chave):
+    """Lote já processado com esta chave, se o ZIP dele ainda existir."""
+    lote = lotes_cache.get(chave)
+    if lote is not None and os.path.exists(lote.arquivo.caminho):
+        return lote
+    return None
+
+
+def caminho_do_lote(chave):
+    os.makedirs(DIRETORIO_LOTES, exist_ok=True)
+    return os.path.join(DIRETORIO_LOTES, f"{chave}.zip")
+
+
+def store_batch(chave, lote):
+    lotes_cache.put(chave, lote)
+    # Mantém no disco só os ZIPs mais recentes (o dobro dos que cabem na memória)
+    arquivos = sorted(
+        (os.path.getmtime(os.path.join(DIRETORIO_LOTES, nome)), nome)
+        for nome in os.listdir(DIRETORIO_LOTES)
+        if nome.endswith(".zip")
+    )
+    for _, nome in arquivos[: -2 * lotes_cache.max_itens]:
+        try:
+            os.remove(os.path.join(DIRETORIO_LOTES, nome))
+        except OSError:
+            pass
+
+
+# Nome novo de cada PDF já processado (pelo hash do conteúdo) e os lotes
+# completos, para que os reruns dos botões de download não processem tudo de novo
+resultados_cache = ParseCache(max_itens=100_000, diretorio=None)
+lotes_cache = ParseCache(max_itens=8, diretorio=None)
+DIRETORIO_LOTES = os.path.join(RAIZ, ".cache", "notas")
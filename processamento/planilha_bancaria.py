@@ -0,0 +1,62 @@
+import pandas as pd
+
+from processamento.cache import read_excel_cached
+from processamento.diagnostico import span
+from processamento.exportacao import FORMATO_CONTABIL
+from processamento.layouts_bancarios import cells_as_text, parse_statement
+
+COLUNAS_VALOR = ["Valor Crédito", "Valor Débito"]
+
+# Opções do ``to_xlsx`` para a planilha processada, com os valores como números
+OPCOES_XLSX = {
+    "nome_aba": "Dados Processados",
+    "formatos": {coluna: FORMATO_CONTABIL for coluna in COLUNAS_VALOR},
+    "larguras": {coluna: 18 for coluna in COLUNAS_VALOR},
+}
+
+
+def format_brl(valor):
+    """Formata um número como moeda brasileira ("R$ 1.234,56")."""
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+# Função para organizar planilha bancária
+def process_bank_statement(file):
+    """Devolve ``(DataFrame com totais, layout detectado)``. O Excel só é
+    gravado quando pedido: ``to_xlsx(df, **OPCOES_XLSX)``."""
+    # Ler a planilha original sem cabeçalho e com as células como estão (os
+    # números do Excel não passam por texto com ponto decimal); elas viram
+    # texto antes de ir para o cache. O cabeçalho é procurado pelo layout,
+    # que também separa crédito e débito
+    engine = "xlrd" if file.name.endswith(".xls") else "openpyxl"
+    with span("leitura do Excel") as trecho:
+        bruto = read_excel_cached(
+            file, cells_as_text, dtype=object, engine=engine, header=None
+        )
+        if trecho:
+            trecho.contar(linhas=len(bruto))
+    with span("layout e valores") as trecho:
+        df, layout = parse_statement(bruto)
+        if trecho:
+            trecho.contar(linhas=len(df))
+
+    # Calcular totais
+    total_credito = df["Valor Crédito"].sum()
+    total_debito = df["Valor Débito"].sum()
+    diferenca = total_credito - total_debito
+
+    # Linhas de totais e diferença, mantendo os valores numéricos
+    resumo_df = pd.DataFrame(
+        {
+            "Data": ["", ""],
+            "Documento": ["", ""],
+            "Historico": ["TOTAL", "DIFERENÇA (Crédito - Débito)"],
+            "Valor Crédito": [total_credito, diferenca],
+            "Valor Débito": [total_debito, None],
+        }
+    )
+
+    # Concatenar os totais ao final do DataFrame
+    df = pd.concat([df, resumo_df], ignore_index=True)
+
+    return df, layout
@@ -0,0 +1,69 @@
+"""Busca, filtro, ordenação e paginação de tabelas no servidor.
+
+Em vez de formatar a tabela inteira com o ``Styler`` (uma chamada Python por
+célula) e mandar tudo para o navegador, a página filtra e ordena o DataFrame
+aqui e só a página visível é formatada e enviada.
+"""
+
+import math
+
+import pandas as pd
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+
+
+def query_table(df, busca="", filtros=None, ordenar_por=None, crescente=True):
+    """Linhas de ``df`` que contêm ``busca`` (em qualquer coluna de texto, sem
+    diferenciar maiúsculas) e cujos valores estão em ``filtros``
+    (``{coluna: valores aceitos}``; vazio aceita tudo), ordenadas por
+    ``ordenar_por``."""
+    mascara = pd.Series(True, index=df.index)
+    for coluna, valores in (filtros or {}).items():
+        if valores:
+            mascara &= df[coluna].isin(valores)
+
+    busca = busca.strip()
+    if busca:
+        encontrado = pd.Series(False, index=df.index)
+        for coluna in df.columns:
+            if pd.api.types.is_string_dtype(df[coluna]) or df[coluna].dtype == object:
+                encontrado |= df[coluna].astype("str").str.contains(
+                    busca, case=False, regex=False, na=False
+                )
+        mascara &= encontrado
+
+    resultado = df[mascara] if not mascara.all() else df
+    if ordenar_por:
+        resultado = resultado.sort_values(
+            ordenar_por, ascending=crescente, kind="stable", na_position="last"
+        )
+    return resultado
+
+
+def page_count(total, tamanho):
+    return max(math.ceil(total / tamanho), 1)
+
+
+def page_slice(df, pagina, tamanho):
+    """Linhas da página ``pagina`` (a partir de 1)."""
+    inicio = (pagina - 1) * tamanho
+    return df.iloc[inicio : inicio + tamanho]
+
+
+def format_page(df, formatos):
+    """Cópia de ``df`` com as colunas de ``formatos`` já como texto.
+
+    Cada formato é uma função, um modelo de ``str.format`` (``"R$ {:,.2f}"``)
+    ou, em colunas de data, um modelo de ``strftime`` (``"%d/%m/%Y"``).
+    """
+    pagina = df.copy()
+    for coluna, formato in formatos.items():
+        serie = pagina[coluna]
+        if callable(formato):
+            texto = serie.map(formato, na_action="ignore")
+        elif pd.api.types.is_datetime64_any_dtype(serie) and "{" not in formato:
+            texto = serie.dt.strftime(formato)
+        else:
+            texto = serie.map(formato.format, na_action="ignore")
+        pagina[coluna] = texto.astype(object).where(serie.notna(), "")
+    return pagina
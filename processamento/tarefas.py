@@ -0,0 +1,183 @@
+"""Tarefas demoradas em segundo plano, fora do rerun do Streamlit.
+
+Cada clique em um widget refaz a página inteira; um trabalho longo rodando
+dentro do script (renderizar um PDF, renomear mil notas) seria interrompido e
+começaria do zero. Aqui o trabalho vai para um pool de threads do servidor,
+compartilhado por todas as sessões, e fica registrado com um ID e uma chave
+(o hash do conteúdo mais as opções). A página refeita acha a tarefa pela
+chave e volta a acompanhar o progresso; quando a tarefa termina, o resultado
+fica guardado nela (e nos caches de cada ferramenta). Antes de rodar, cada
+tarefa espera a vez no ``agendador`` (vagas e memória do servidor inteiro).
+
+A função da tarefa recebe a ``Tarefa`` como primeiro argumento e informa o
+progresso com ``tarefa.progresso(concluidos)``, que também é onde um pedido
+de cancelamento interrompe o trabalho. Ela não pode chamar ``st.*``: roda
+fora da sessão. Ela é medida como uma execução própria do diagnóstico
+(``tarefa: <rótulo>``), com a memória medida se a página que a enviou estava
+medindo.
+"""
+
+import itertools
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from processamento.agendador import agendador
+from processamento.diagnostico import current_run, run_page
+
+ESPERANDO = "esperando"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluída"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+
+# Threads das tarefas. Quantas rodam de fato ao mesmo tempo é o agendador que
+# decide; as demais esperam na fila dele (com a posição visível)
+MAX_THREADS = 32
+# Tarefas terminadas mantidas (com o resultado) para as páginas as reencontrarem
+MAX_TERMINADAS = 32
+
+
+class TarefaCancelada(Exception):
+    """Levantada por ``Tarefa.progresso`` quando o cancelamento foi pedido."""
+
+
+@dataclass
+class Tarefa:
+    id: str
+    chave: str
+    rotulo: str
+    total: int | None = None
+    memoria_mb: float = 0  # reserva de memória no agendador
+    concluidos: int = 0
+    estado: str = ESPERANDO
+    resultado: object = None
+    erro: str | None = None
+    criada_em: float = field(default_factory=time.time)
+    inicio: float | None = None
+    fim: float | None = None
+    diagnostico: object = field(default=None, repr=False)  # Execucao da tarefa
+    _cancelar: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def ativa(self):
+        return self.estado in (ESPERANDO, EXECUTANDO)
+
+    @property
+    def fracao(self):
+        if not self.total:
+            return 0.0
+        return min(self.concluidos / self.total, 1.0)
+
+    @property
+    def posicao(self):
+        """Posição na fila do agendador (0 se não está esperando nela)."""
+        return agendador.position(self.id)
+
+    @property
+    def segundos(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.time()) - self.inicio
+
+    def progresso(self, concluidos, total=None):
+        """Registra o progresso; interrompe a tarefa se ela foi cancelada."""
+        if total is not None:
+            self.total = total
+        self.concluidos = concluidos
+        if self._cancelar.is_set():
+            raise TarefaCancelada
+
+    def cancelar(self):
+        """Pede o cancelamento; a tarefa para no próximo ``progresso``."""
+        self._cancelar.set()
+
+
+class GerenciadorDeTarefas:
+    """Registro das tarefas e o pool de threads que as executa."""
+
+    def __init__(self, max_threads=MAX_THREADS, max_terminadas=MAX_TERMINADAS):
+        self.max_terminadas = max_terminadas
+        self._pool = ThreadPoolExecutor(max_threads, thread_name_prefix="tarefa")
+        self._tarefas = OrderedDict()  # id -> Tarefa, na ordem de envio
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, chave, rotulo, funcao, *args, total=None, memoria_mb=0, **kwargs):
+        """Envia ``funcao(tarefa, *args, **kwargs)`` para o pool e devolve a
+        ``Tarefa``. Se já houver uma tarefa ativa ou concluída com a mesma
+        ``chave``, ela é devolvida em vez de começar outra. ``memoria_mb`` é a
+        reserva da tarefa no agendador (veja ``agendador.memory_budget``)."""
+        with self._lock:
+            existente = self._find(chave)
+            if existente is not None:
+                if existente.estado not in (FALHOU, CANCELADA):
+                    return existente
+                del self._tarefas[existente.id]
+            tarefa = Tarefa(f"{next(self._ids):05d}", chave, rotulo, total, memoria_mb=memoria_mb)
+            self._tarefas[tarefa.id] = tarefa
+            self._limitar()
+        execucao = current_run()
+        memoria = execucao is not None and execucao.memoria
+        self._pool.submit(self._executar, tarefa, funcao, args, kwargs, memoria)
+        return tarefa
+
+    def get(self, id_tarefa):
+        with self._lock:
+            return self._tarefas.get(id_tarefa)
+
+    def find(self, chave):
+        """Tarefa mais recente com esta chave, ou None."""
+        with self._lock:
+            return self._find(chave)
+
+    def forget(self, chave):
+        """Remove as tarefas terminadas com esta chave (ex.: para tentar de novo)."""
+        with self._lock:
+            for tarefa in [t for t in self._tarefas.values() if t.chave == chave]:
+                if not tarefa.ativa:
+                    del self._tarefas[tarefa.id]
+
+    def _find(self, chave):
+        for tarefa in reversed(self._tarefas.values()):
+            if tarefa.chave == chave:
+                return tarefa
+        return None
+
+    def _limitar(self):
+        # Descarta as terminadas mais antigas (e seus resultados)
+        terminadas = [t for t in self._tarefas.values() if not t.ativa]
+        for tarefa in terminadas[: max(len(terminadas) - self.max_terminadas, 0)]:
+            del self._tarefas[tarefa.id]
+
+    def _executar(self, tarefa, funcao, args, kwargs, memoria=False):
+        def na_fila(_posicao):
+            # Cancelar uma tarefa ainda na fila a tira de lá
+            if tarefa._cancelar.is_set():
+                raise TarefaCancelada
+
+        try:
+            na_fila(None)
+            with agendador.admit(tarefa.rotulo, tarefa.memoria_mb, tarefa.id, na_fila):
+                tarefa.estado, tarefa.inicio = EXECUTANDO, time.time()
+                with run_page(f"tarefa: {tarefa.rotulo}", memoria) as execucao:
+                    tarefa.diagnostico = execucao
+                    tarefa.resultado = funcao(tarefa, *args, **kwargs)
+            tarefa.estado = CONCLUIDA
+        except TarefaCancelada:
+            tarefa.estado = CANCELADA
+        except Exception as e:
+            traceback.print_exc()
+            tarefa.erro = str(e) or type(e).__name__
+            tarefa.estado = FALHOU
+        finally:
+            tarefa.fim = time.time()
+            with self._lock:
+                self._limitar()
+
+
+# Um só gerenciador por processo, compartilhado por todas as sessões
+tarefas = GerenciadorDeTarefas()
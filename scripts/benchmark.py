@@ -0,0 +1,290 @@
+"""Benchmark das ferramentas do app com entradas sintéticas.
+
+Mede, sem abrir o Streamlit, o tempo (melhor de algumas execuções) e o pico de
+memória alocada pelo Python (``tracemalloc``, em uma execução à parte) de cada
+ferramenta, e compara com uma linha de base gravada antes. Sai com código 1 se
+algum caso ficou mais lento ou mais pesado que a tolerância. Uso (na raiz do
+projeto):
+
+    python scripts/benchmark.py [--tamanho medio] [--casos crm cnpj]
+    python scripts/benchmark.py --atualizar   # grava a linha de base
+
+A linha de base depende da máquina: grave-a na mesma máquina em que os
+benchmarks vão rodar. Sem linha de base para um caso, ele só é medido; na CI,
+use ``--exigir-linha-de-base`` para que a falta dela (ex.: o arquivo não foi
+gravado no runner) também saia com código 1 em vez de passar sem comparar:
+
+    python scripts/benchmark.py --exigir-linha-de-base --linha-de-base CAMINHO
+
+O ``tracemalloc`` não enxerga a memória alocada dentro
+das bibliotecas em C (PyMuPDF, Pillow).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from functools import cached_property
+from io import BytesIO
+
+# Sem cache em disco: cada execução tem de ler as planilhas de verdade
+os.environ["CRM_CACHE_DIR"] = ""
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "scripts"))
+
+import dados_sinteticos  # noqa: E402
+from processamento.cache import parse_cache  # noqa: E402
+
+LINHA_DE_BASE = os.path.join(RAIZ, "scripts", "benchmark_baseline.json")
+
+# Diferenças menores que estas são ruído, mesmo acima da tolerância
+MINIMO_SEGUNDOS = 0.05
+MINIMO_MB = 1.0
+
+PAGINAS_CONVERTIDAS = 10
+
+
+class Entradas:
+    """Entradas de um tamanho, geradas só quando algum caso pede."""
+
+    def __init__(self, tamanho):
+        self.quantidades = dados_sinteticos.TAMANHOS[tamanho]
+
+    @cached_property
+    def planilha_de_notas(self):
+        return dados_sinteticos.planilha_de_notas(self.quantidades["notas"])
+
+    @cached_property
+    def notas(self):
+        return dados_sinteticos.notas_fiscais(self.quantidades["notas"])
+
+    @cached_property
+    def extrato_bancario(self):
+        return dados_sinteticos.extrato_bancario(self.quantidades["extrato_bancario"])
+
+    @cached_property
+    def zip_de_notas(self):
+        return dados_sinteticos.zip_de_notas(self.quantidades["danfes"])
+
+    @cached_property
+    def danfes(self):
+        from processamento.notas_fiscais import extract_pdfs_from_zip
+
+        return [pdf for _, pdf in extract_pdfs_from_zip(BytesIO(self.zip_de_notas))]
+
+    @cached_property
+    def extrato_ml(self):
+        return dados_sinteticos.extrato_ml(self.quantidades["paginas_ml"])
+
+    @cached_property
+    def fotos(self):
+        return dados_sinteticos.fotos(self.quantidades["fotos"])
+
+
+def _arquivo(dados, nome):
+    # Um objeto novo por execução, como um upload novo
+    arquivo = BytesIO(dados)
+    arquivo.name = nome
+    return arquivo
+
+
+# Cada caso recebe as entradas e devolve a função (sem argumentos) medida
+def caso_leitura_de_notas(entradas):
+    from processamento.ingestao import COLUNAS_CRM, read_columns
+
+    dados = entradas.planilha_de_notas
+
+    def executar():
+        parse_cache.clear()
+        read_columns(_arquivo(dados, "notas.xlsx"), COLUNAS_CRM)
+
+    return executar
+
+
+def caso_crm(entradas):
+    from processamento.crm import VendorIndex
+
+    notas = entradas.notas
+    return lambda: VendorIndex(notas)
+
+
+def caso_cnpj(entradas):
+    from processamento.cnpj import summarize_documents
+
+    notas = entradas.notas
+    return lambda: summarize_documents(notas)
+
+
+def caso_planilha_bancaria(entradas):
+    from processamento.exportacao import to_xlsx
+    from processamento.planilha_bancaria import OPCOES_XLSX, process_bank_statement
+
+    dados = entradas.extrato_bancario
+
+    def executar():
+        parse_cache.clear()
+        df, _ = process_bank_statement(_arquivo(dados, "extrato.xlsx"))
+        to_xlsx(df, **OPCOES_XLSX)
+
+    return executar
+
+
+def caso_zip_de_notas(entradas):
+    from processamento.notas_fiscais import extract_pdfs_from_zip
+
+    dados = entradas.zip_de_notas
+    return lambda: extract_pdfs_from_zip(BytesIO(dados))
+
+
+def caso_dados_da_nota(entradas):
+    from processamento.notas_fiscais import extract_info_from_pdf
+
+    danfes = entradas.danfes
+    return lambda: [extract_info_from_pdf(pdf) for pdf in danfes]
+
+
+def caso_cabecalho_da_nota(entradas):
+    from processamento.notas_fiscais import extract_info_from_header
+
+    danfes = entradas.danfes
+    return lambda: [extract_info_from_header(pdf) for pdf in danfes]
+
+
+def caso_extrato_ml(entradas):
+    from processamento.extrato_ml import parse_ml_statement
+
+    dados = entradas.extrato_ml
+    return lambda: parse_ml_statement(dados, paralelo=False)
+
+
+def caso_pdf_para_imagens(entradas):
+    from processamento.conversor import render_pages_to_zip
+
+    dados = entradas.extrato_ml
+    paginas = list(range(min(PAGINAS_CONVERTIDAS, entradas.quantidades["paginas_ml"])))
+    return lambda: render_pages_to_zip(dados, paginas, 150).close()
+
+
+def caso_conversao_de_imagens(entradas):
+    from processamento.conversor import convert_images
+
+    fotos = entradas.fotos
+    return lambda: convert_images(fotos, "JPEG", 1600).conteudo()
+
+
+CASOS = {
+    "leitura_de_notas": caso_leitura_de_notas,
+    "crm": caso_crm,
+    "cnpj": caso_cnpj,
+    "planilha_bancaria": caso_planilha_bancaria,
+    "zip_de_notas": caso_zip_de_notas,
+    "dados_da_nota": caso_dados_da_nota,
+    "cabecalho_da_nota": caso_cabecalho_da_nota,
+    "extrato_ml": caso_extrato_ml,
+    "pdf_para_imagens": caso_pdf_para_imagens,
+    "conversao_de_imagens": caso_conversao_de_imagens,
+}
+
+
+def medir(executar, repeticoes):
+    """``(segundos, pico_mb)`` de ``executar()``."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+
+    tracemalloc.start()
+    executar()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return melhor, pico / 1024 / 1024
+
+
+def regressoes(atual, base, tolerancia):
+    """Lista do que piorou além da tolerância em relação à linha de base."""
+    problemas = []
+    for chave, unidade, minimo in (
+        ("segundos", "s", MINIMO_SEGUNDOS),
+        ("pico_mb", "MB", MINIMO_MB),
+    ):
+        antes, agora = base[chave], atual[chave]
+        if agora > antes * (1 + tolerancia) and agora - antes > minimo:
+            problemas.append(f"{antes:.2f} → {agora:.2f} {unidade}")
+    return problemas
+
+
+def ler_linha_de_base(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanho", choices=dados_sinteticos.TAMANHOS, default="pequeno")
+    parser.add_argument("--casos", nargs="+", choices=CASOS, default=list(CASOS))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument(
+        "--tolerancia", type=float, default=0.25, help="piora aceita (0.25 = 25%%)"
+    )
+    parser.add_argument("--linha-de-base", default=LINHA_DE_BASE)
+    parser.add_argument(
+        "--atualizar", action="store_true", help="grava os resultados como linha de base"
+    )
+    parser.add_argument(
+        "--exigir-linha-de-base",
+        action="store_true",
+        help="falha se algum caso não tiver linha de base (para a CI)",
+    )
+    args = parser.parse_args()
+
+    linha_de_base = ler_linha_de_base(args.linha_de_base)
+    base = linha_de_base.get(args.tamanho, {})
+    entradas = Entradas(args.tamanho)
+    resultados = {}
+    falhas = []
+
+    print(f"Tamanho: {args.tamanho} {entradas.quantidades}")
+    print(f"{'Caso':<22} {'Tempo (s)':>10} {'Pico (MB)':>10}  Situação")
+    for nome in args.casos:
+        executar = CASOS[nome](entradas)  # gera as entradas fora da medição
+        segundos, pico = medir(executar, args.repeticoes)
+        resultados[nome] = {"segundos": round(segundos, 4), "pico_mb": round(pico, 2)}
+
+        if nome not in base:
+            situacao = "sem linha de base"
+            if args.exigir_linha_de_base and not args.atualizar:
+                situacao = f"❌ {situacao}"
+                falhas.append(nome)
+        else:
+            problemas = regressoes(resultados[nome], base[nome], args.tolerancia)
+            situacao = f"❌ REGRESSÃO: {'; '.join(problemas)}" if problemas else "ok"
+            if problemas:
+                falhas.append(nome)
+        print(f"{nome:<22} {segundos:>10.3f} {pico:>10.1f}  {situacao}")
+
+    if args.atualizar:
+        linha_de_base[args.tamanho] = {**base, **resultados}
+        with open(args.linha_de_base, "w", encoding="utf-8") as arquivo:
+            json.dump(linha_de_base, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.linha_de_base}")
+        return 0
+
+    if falhas:
+        print(
+            f"\n{len(falhas)} caso(s) com regressão ou sem linha de base: "
+            f"{', '.join(falhas)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Compara os gravadores de Excel, CSV e Parquet em extratos sintéticos.
+
+Para cada quantidade de linhas, mede o tempo (melhor de algumas execuções) e
+o pico de memória alocada pelo Python (``tracemalloc``, em uma execução à
+parte para não distorcer o tempo). Uso (na raiz do projeto):
+
+    python scripts/benchmark_exportacao.py [--linhas 1000 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from processamento import exportacao  # noqa: E402
+from processamento.exportacao import FORMATO_CONTABIL  # noqa: E402
+
+COLUNAS_VALOR = ["Valor Crédito", "Valor Débito"]
+
+
+def extrato_sintetico(linhas, semente=0):
+    """DataFrame no formato da planilha bancária processada."""
+    rng = np.random.default_rng(semente)
+    valores = rng.integers(1, 10**7, linhas) / 100
+    credito = rng.random(linhas) < 0.6
+    return pd.DataFrame(
+        {
+            "Data": [f"{dia % 28 + 1:02d}/01/2025" for dia in range(linhas)],
+            "Documento": rng.integers(1000, 999_999, linhas).astype(str),
+            "Historico": [f"PIX RECEBIDO {i}" for i in range(linhas)],
+            "Valor Crédito": np.where(credito, valores, 0.0),
+            "Valor Débito": np.where(credito, 0.0, valores),
+        }
+    )
+
+
+def pandas_openpyxl(df):
+    # Como era feito antes: to_excel com openpyxl e formato célula a célula
+    saida = BytesIO()
+    with pd.ExcelWriter(saida, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Dados Processados", index=False)
+        planilha = writer.sheets["Dados Processados"]
+        for indice in (df.columns.get_loc(c) + 1 for c in COLUNAS_VALOR):
+            for (celula,) in planilha.iter_rows(min_row=2, min_col=indice, max_col=indice):
+                celula.number_format = FORMATO_CONTABIL
+    return saida.getvalue()
+
+
+def xlsxwriter_constante(df):
+    return exportacao.to_xlsx(
+        df, formatos={c: FORMATO_CONTABIL for c in COLUNAS_VALOR}
+    )
+
+
+def openpyxl_write_only(df):
+    # O caminho usado quando o XlsxWriter não está instalado
+    xlsxwriter = sys.modules.get("xlsxwriter")
+    sys.modules["xlsxwriter"] = None
+    try:
+        return xlsxwriter_constante(df)
+    finally:
+        if xlsxwriter is None:
+            del sys.modules["xlsxwriter"]
+        else:
+            sys.modules["xlsxwriter"] = xlsxwriter
+
+
+GRAVADORES = {
+    "pandas + openpyxl (antigo)": pandas_openpyxl,
+    "openpyxl write_only": openpyxl_write_only,
+    "XlsxWriter constant_memory": xlsxwriter_constante,
+    "CSV": exportacao.to_csv,
+    "Parquet": exportacao.to_parquet,
+}
+
+
+def medir(gravador, df, repeticoes):
+    """``(segundos, pico_mb, tamanho_kb)`` de ``gravador(df)``."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        dados = gravador(df)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+
+    tracemalloc.start()
+    gravador(df)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return melhor, pico / 1024 / 1024, len(dados) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--linhas", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    for linhas in args.linhas:
+        df = extrato_sintetico(linhas)
+        print(f"\n{linhas} linhas")
+        print(f"{'Gravador':<30} {'Tempo (s)':>10} {'Pico (MB)':>10} {'Arquivo (KB)':>13}")
+        for nome, gravador in GRAVADORES.items():
+            try:
+                segundos, pico, tamanho = medir(gravador, df, args.repeticoes)
+            except Exception as e:  # ex.: sem pyarrow
+                print(f"{nome:<30} erro: {e}")
+                continue
+            print(f"{nome:<30} {segundos:>10.3f} {pico:>10.1f} {tamanho:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
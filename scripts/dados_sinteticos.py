@@ -0,0 +1,271 @@
+"""Entradas sintéticas, mas realistas, para as ferramentas do app.
+
+Usado pelo ``scripts/benchmark.py``; também grava os arquivos em uma pasta
+para testes manuais. Uso (na raiz do projeto):
+
+    python scripts/dados_sinteticos.py DESTINO [--tamanho pequeno|medio|grande]
+
+Tudo é gerado a partir de uma semente fixa: o mesmo tamanho gera sempre os
+mesmos arquivos.
+"""
+
+import argparse
+import os
+import sys
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from processamento.exportacao import to_xlsx  # noqa: E402
+
+# Quantidade de cada entrada por tamanho
+TAMANHOS = {
+    "pequeno": {
+        "notas": 10_000,
+        "extrato_bancario": 1_000,
+        "danfes": 20,
+        "paginas_ml": 10,
+        "fotos": 4,
+    },
+    "medio": {
+        "notas": 100_000,
+        "extrato_bancario": 10_000,
+        "danfes": 200,
+        "paginas_ml": 100,
+        "fotos": 12,
+    },
+    "grande": {
+        "notas": 1_000_000,
+        "extrato_bancario": 100_000,
+        "danfes": 1_000,
+        "paginas_ml": 500,
+        "fotos": 40,
+    },
+}
+
+VENDEDORES = [
+    "ANA", "BRUNO", "CARLA", "DIEGO", "ELAINE", "FABIO",
+    "GABRIELA", "HUGO", "IARA", "JOAO", "KAREN", "LUCAS",
+]  # fmt: skip
+
+PESOS_CNPJ = (
+    np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+    np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+)
+PESOS_CPF = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+
+
+def _brl(valor):
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _com_verificadores(base, pesos, cpf):
+    """Acrescenta os dois dígitos verificadores a cada linha de ``base``."""
+    digitos = base
+    for peso in pesos:
+        resto = (digitos @ peso) % 11
+        dv = (resto * 10 % 11) % 10 if cpf else np.where(resto < 2, 0, 11 - resto)
+        digitos = np.column_stack([digitos, dv])
+    return ["".join(map(str, linha)) for linha in digitos]
+
+
+def documentos(quantidade, rng):
+    """CNPJs (80%) e CPFs válidos, metade com máscara, como nas exportações."""
+    cnpjs = quantidade * 4 // 5
+    base = rng.integers(0, 10, (cnpjs, 12))
+    base[:, 8:12] = [0, 0, 0, 1]  # matriz
+    textos = _com_verificadores(base, PESOS_CNPJ, cpf=False)
+    textos += _com_verificadores(
+        rng.integers(0, 10, (quantidade - cnpjs, 9)), PESOS_CPF, cpf=True
+    )
+    for i in range(0, quantidade, 2):
+        d = textos[i]
+        if len(d) == 14:
+            textos[i] = f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+        else:
+            textos[i] = f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+    return np.array(textos, dtype=object)
+
+
+def notas_fiscais(linhas, semente=0):
+    """DataFrame no formato da exportação de notas do ERP (um ano de notas,
+    um cliente a cada ~20 notas, alguns sem vendedor)."""
+    rng = np.random.default_rng(semente)
+    clientes = max(linhas // 20, 10)
+    cliente = rng.zipf(1.3, linhas) % clientes
+    nomes = np.array([f"CLIENTE {i} LTDA" for i in range(clientes)], dtype=object)
+    vendedor = np.array(VENDEDORES + [None], dtype=object)[
+        rng.integers(0, len(VENDEDORES) + 1, linhas)
+    ]
+    hoje = pd.Timestamp.today().normalize()
+    return pd.DataFrame(
+        {
+            "NFS_EMISSAO": hoje - pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+            "VEND_NOME": vendedor,
+            "CLI_RAZ": nomes[cliente],
+            "NFS_CUSTO": np.round(rng.lognormal(6, 1.2, linhas), 2),
+            "CLI_CGCCPF": documentos(clientes, rng)[cliente],
+        }
+    )
+
+
+def planilha_de_notas(linhas, semente=0):
+    """Bytes do xlsx exportado pelo ERP, com as colunas que o app usa."""
+    return to_xlsx(notas_fiscais(linhas, semente), nome_aba="Notas")
+
+
+def extrato_bancario(linhas, semente=0):
+    """Bytes do xlsx de um extrato no layout "valor com sufixo C/D" (Data,
+    Documento, Histórico, Valor), com saldos no meio das transações."""
+    rng = np.random.default_rng(semente)
+    valores = rng.integers(1, 10**7, linhas) / 100
+    sinais = np.where(rng.random(linhas) < 0.6, "C", "D")
+    tabela = [["01/01/2025", "", "SALDO ANTERIOR", "1.000,00C"]]
+    for i, (valor, sinal) in enumerate(zip(valores, sinais)):
+        dia = f"{i * 28 // linhas + 1:02d}/01/2025"
+        tabela.append([dia, str(100_000 + i), f"PIX RECEBIDO {i}", f"{_brl(valor)}{sinal}"])
+        if i % 50 == 49:
+            tabela.append([dia, "", "SALDO DO DIA", f"{_brl(valor)}C"])
+    return to_xlsx(
+        pd.DataFrame(tabela, columns=["Data", "Documento", "Histórico", "Valor"]),
+        nome_aba="Extrato",
+    )
+
+
+def danfe(numero, paginas=1):
+    """Bytes de um PDF com o cabeçalho de um DANFE (emitente e ``Nº.:``)."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    pagina = doc.new_page()
+    pagina.insert_text((40, 60), "DANFE - DOCUMENTO AUXILIAR DA NOTA FISCAL ELETRONICA", fontsize=9)
+    pagina.insert_text((40, 80), "IDENTIFICAÇÃO DO EMITENTE", fontsize=8)
+    pagina.insert_text((40, 95), f"EMPRESA NUMERO {numero} LTDA", fontsize=10)
+    pagina.insert_text(
+        (400, 120),
+        f"Nº.: {numero // 1_000_000 % 1000:03d}.{numero // 1000 % 1000:03d}.{numero % 1000:03d}",
+        fontsize=10,
+    )
+    for item in range(40):
+        pagina.insert_text(
+            (40, 200 + item * 14), f"ITEM {item} PRODUTO QUALQUER 1,00 UN 10,00", fontsize=8
+        )
+    for _ in range(paginas - 1):
+        continuacao = doc.new_page()
+        for item in range(50):
+            continuacao.insert_text((40, 60 + item * 14), f"ITEM {item} CONTINUAÇÃO", fontsize=8)
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def zip_de_notas(quantidade):
+    """Bytes de um ZIP com ``quantidade`` DANFEs (de 1 a 3 páginas)."""
+    saida = BytesIO()
+    with zipfile.ZipFile(saida, "w") as z:
+        for i in range(quantidade):
+            z.writestr(f"notas/nota_{i}.pdf", danfe(1_000 + i, paginas=1 + i % 3))
+        z.writestr("leiame.txt", "arquivo que não é PDF")
+    return saida.getvalue()
+
+
+def extrato_ml(paginas, semente=0):
+    """Bytes de um extrato do Mercado Livre em tabela (Data, Descrição, ID da
+    operação, Valor, Saldo), com descrições em duas linhas."""
+    import fitz  # PyMuPDF
+
+    rng = np.random.default_rng(semente)
+    descricoes = [
+        "Pagamento com QR Pix",
+        "Transferência recebida",
+        "Reembolso do pedido 2000012345678 processado",
+        "Tarifa de venda",
+    ]
+    colunas = {"data": 40, "descricao": 110, "id": 300, "valor": 470, "saldo": 560}
+
+    def direita(pagina, y, texto, fim):
+        pagina.insert_text((fim - fitz.get_text_length(texto, fontsize=9), y), texto, fontsize=9)
+
+    doc = fitz.open()
+    saldo = 100.0
+    for numero in range(paginas):
+        pagina = doc.new_page()
+        y = 40
+        if numero == 0:
+            pagina.insert_text(
+                (40, y), "Extrato de conta - Periodo: 01-01-2025 a 31-01-2025 "
+                "Saldo inicial: R$ 100,00", fontsize=9,
+            )
+            y += 20
+        pagina.insert_text((colunas["data"], y), "Data", fontsize=9)
+        pagina.insert_text((colunas["descricao"], y), "Descrição", fontsize=9)
+        pagina.insert_text((colunas["id"], y), "ID da operação", fontsize=9)
+        direita(pagina, y, "Valor", colunas["valor"])
+        direita(pagina, y, "Saldo", colunas["saldo"])
+        y += 16
+        while y <= 780:
+            valor = round(float(rng.uniform(-3000, 3000)), 2)
+            saldo += valor
+            palavras = descricoes[rng.integers(len(descricoes))].split()
+            pagina.insert_text((colunas["data"], y), f"{rng.integers(1, 29):02d}-01-2025", fontsize=9)
+            pagina.insert_text((colunas["descricao"], y), " ".join(palavras[:3]), fontsize=9)
+            pagina.insert_text((colunas["id"], y), str(rng.integers(10**10, 10**11)), fontsize=9)
+            direita(pagina, y, f"R$ {_brl(valor)}", colunas["valor"])
+            direita(pagina, y, f"R$ {_brl(saldo)}", colunas["saldo"])
+            y += 11
+            if len(palavras) > 3:
+                pagina.insert_text((colunas["descricao"], y), " ".join(palavras[3:]), fontsize=9)
+                y += 11
+            y += 4
+    dados = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return dados
+
+
+def fotos(quantidade, semente=0):
+    """``[(nome, bytes)]`` de fotos JPEG de 12 MP (4000 x 3000) com ruído."""
+    from PIL import Image
+
+    rng = np.random.default_rng(semente)
+    # Um bloco de ruído repetido: rápido de gerar e ainda difícil de comprimir
+    bloco = rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    resultado = []
+    for i in range(quantidade):
+        pixels = np.tile(np.roll(bloco, i * 7, axis=1), (10, 10, 1))
+        saida = BytesIO()
+        Image.fromarray(pixels).save(saida, "JPEG", quality=90)
+        resultado.append((f"foto_{i}.jpg", saida.getvalue()))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("destino")
+    parser.add_argument("--tamanho", choices=TAMANHOS, default="pequeno")
+    args = parser.parse_args()
+
+    quantidades = TAMANHOS[args.tamanho]
+    os.makedirs(args.destino, exist_ok=True)
+    arquivos = {
+        "notas.xlsx": lambda: planilha_de_notas(quantidades["notas"]),
+        "extrato_bancario.xlsx": lambda: extrato_bancario(quantidades["extrato_bancario"]),
+        "notas_fiscais.zip": lambda: zip_de_notas(quantidades["danfes"]),
+        "extrato_ml.pdf": lambda: extrato_ml(quantidades["paginas_ml"]),
+    }
+    for nome, gerar in arquivos.items():
+        with open(os.path.join(args.destino, nome), "wb") as arquivo:
+            arquivo.write(gerar())
+        print(f"✅ {nome}")
+    for nome, dados in fotos(quantidades["fotos"]):
+        with open(os.path.join(args.destino, nome), "wb") as arquivo:
+            arquivo.write(dados)
+    print(f"✅ {quantidades['fotos']} fotos")
+
+
+if __name__ == "__main__":
+    main()
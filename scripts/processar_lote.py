@@ -0,0 +1,150 @@
+"""Processa pastas inteiras de arquivos sem abrir o Streamlit.
+
+Organiza extratos bancários, renomeia notas fiscais (PDFs soltos ou em ZIPs)
+e extrai extratos do Mercado Livre, com um processo por núcleo. Cada
+resultado é gravado em ``--saida`` assim que fica pronto; no fim, um resumo
+em JSON vai para a saída padrão (ou ``--resumo``) e o progresso para a saída
+de erros. Uso (na raiz do projeto):
+
+    python scripts/processar_lote.py bancaria EXTRATOS... --saida DESTINO
+    python scripts/processar_lote.py notas PDFS_OU_ZIPS... --saida DESTINO
+    python scripts/processar_lote.py extrato-ml PDFS... --saida DESTINO
+
+Entradas podem ser arquivos ou pastas (percorridas com as subpastas). Sai com
+código 0 se todos os arquivos foram processados, 1 se algum falhou e 2 se
+não havia nada a processar ou os argumentos estão errados.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+# Os arquivos são lidos uma vez só: o cache em disco só ocuparia espaço
+os.environ.setdefault("CRM_CACHE_DIR", "")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from processamento.agendador import MAX_PROCESSOS  # noqa: E402
+from processamento.exportacao import FORMATOS_EXPORTACAO  # noqa: E402
+from processamento.lote import (  # noqa: E402
+    EXTENSOES_PDF,
+    EXTENSOES_PLANILHA,
+    iter_input_files,
+    output_path,
+    process_bank_file,
+    process_ml_file,
+    rename_invoices,
+    run_in_pool,
+)
+
+
+def bancaria(args):
+    extensao = FORMATOS_EXPORTACAO[args.formato][0]
+    tarefas = (
+        (caminho, output_path(args.saida, relativo, "_processada", extensao), args.formato)
+        for caminho, relativo in iter_input_files(args.entradas, EXTENSOES_PLANILHA)
+    )
+    return run_in_pool(process_bank_file, tarefas, args.processos)
+
+
+def notas(args):
+    return rename_invoices(args.entradas, args.saida, not args.completo, args.processos)
+
+
+def extrato_ml(args):
+    from processamento.extrato_ml import MOTOR_POSICAO, MOTOR_TEXTO
+
+    motor = {"posicao": MOTOR_POSICAO, "texto": MOTOR_TEXTO}[args.motor]
+    extensao = FORMATOS_EXPORTACAO[args.formato][0]
+    arquivos = list(iter_input_files(args.entradas, EXTENSOES_PDF))
+    # Com um extrato só, as páginas dele é que são divididas entre os processos
+    if len(arquivos) == 1:
+        caminho, relativo = arquivos[0]
+        saida = output_path(args.saida, relativo, "", extensao)
+        return iter(
+            [process_ml_file(caminho, saida, args.formato, motor, True, args.processos)]
+        )
+    tarefas = (
+        (caminho, output_path(args.saida, relativo, "", extensao), args.formato, motor)
+        for caminho, relativo in arquivos
+    )
+    return run_in_pool(process_ml_file, tarefas, args.processos)
+
+
+COMANDOS = {
+    "bancaria": (bancaria, "organiza extratos bancários (.xls/.xlsx)"),
+    "notas": (notas, "renomeia notas fiscais em PDF (soltas ou em ZIPs)"),
+    "extrato-ml": (extrato_ml, "extrai extratos do Mercado Livre em PDF"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    for nome, (_, ajuda) in COMANDOS.items():
+        sub = subparsers.add_parser(nome, help=ajuda, description=ajuda)
+        sub.add_argument("entradas", nargs="+", help="arquivos ou pastas")
+        sub.add_argument("--saida", required=True, help="pasta dos resultados")
+        sub.add_argument("--processos", type=int, default=MAX_PROCESSOS)
+        sub.add_argument("--resumo", help="grava o resumo JSON neste arquivo")
+        if nome == "notas":
+            sub.add_argument(
+                "--completo",
+                action="store_true",
+                help="lê o documento inteiro, sem o atalho pelo cabeçalho",
+            )
+        else:
+            sub.add_argument("--formato", choices=FORMATOS_EXPORTACAO, default="Excel")
+        if nome == "extrato-ml":
+            sub.add_argument(
+                "--motor",
+                choices=("posicao", "texto"),
+                default="posicao",
+                help="leitura pela posição das palavras ou pelo texto corrido",
+            )
+    args = parser.parse_args()
+
+    faltando = [entrada for entrada in args.entradas if not os.path.exists(entrada)]
+    if faltando:
+        parser.error(f"não encontrado: {', '.join(faltando)}")
+    os.makedirs(args.saida, exist_ok=True)
+
+    inicio = time.perf_counter()
+    resultados = []
+    for resultado in COMANDOS[args.comando][0](args):
+        resultados.append(resultado)
+        situacao = f"❌ {resultado.erro}" if resultado.erro else f"✅ {resultado.saida}"
+        print(f"[{len(resultados)}] {resultado.entrada}: {situacao}", file=sys.stderr)
+
+    erros = sum(resultado.erro is not None for resultado in resultados)
+    resumo = {
+        "comando": args.comando,
+        "saida": os.path.abspath(args.saida),
+        "arquivos": len(resultados),
+        "ok": len(resultados) - erros,
+        "erros": erros,
+        "segundos": round(time.perf_counter() - inicio, 3),
+        "resultados": [
+            {**asdict(resultado), "segundos": round(resultado.segundos, 3)}
+            for resultado in sorted(resultados, key=lambda r: r.entrada)
+        ],
+    }
+    texto = json.dumps(resumo, indent=2, ensure_ascii=False)
+    if args.resumo:
+        with open(args.resumo, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if not resultados:
+        print("Nenhum arquivo a processar.", file=sys.stderr)
+        return 2
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Relatório do custo de importação de cada página e das bibliotecas pesadas.
+
+Cada medição roda em um processo Python novo com ``-X importtime``, para que
+nada já carregado em memória distorça os números. Uso (na raiz do projeto):
+
+    python scripts/relatorio_importacao.py [--top 10]
+"""
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from paginas import PAGINAS  # noqa: E402
+
+# Bibliotecas carregadas apenas no primeiro uso dentro das páginas
+BIBLIOTECAS_ADIADAS = ["fitz", "PyPDF2", "plotly.express", "PIL.Image"]
+
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir_importacao(codigo):
+    """Executa ``codigo`` em um processo novo e devolve ``{modulo: (proprio_us,
+    acumulado_us, nivel)}`` a partir da saída do ``-X importtime``."""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1])
+
+    modulos = {}
+    for linha in resultado.stderr.splitlines():
+        match = LINHA_IMPORTTIME.match(linha)
+        if match:
+            proprio, acumulado, recuo, nome = match.groups()
+            modulos[nome] = (int(proprio), int(acumulado), (len(recuo) - 1) // 2)
+    return modulos
+
+
+def custo_importacao(modulo, repeticoes, preambulo="import streamlit"):
+    """Tempo (ms) para importar ``modulo`` depois do ``preambulo`` e os módulos
+    que ele trouxe, na execução mais rápida entre ``repeticoes`` (a menos
+    afetada por ruído do sistema)."""
+    melhor = None
+    for _ in range(repeticoes):
+        modulos = medir_importacao(f"{preambulo}; import {modulo}")
+        if melhor is None or modulos[modulo][1] < melhor[modulo][1]:
+            melhor = modulos
+    return melhor[modulo][1] / 1000, melhor
+
+
+def imports_do_main():
+    """Módulos que o ``main.py`` importa no topo (na ordem do arquivo)."""
+    with open(os.path.join(RAIZ, "main.py"), encoding="utf-8") as arquivo:
+        arvore = ast.parse(arquivo.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module:
+            modulos.append(no.module)
+    return [modulo for modulo in modulos if modulo != "streamlit"]
+
+
+def custo_do_menu(modulos, repeticoes):
+    """Tempo (ms) de todos os imports de ``modulos`` depois do streamlit: a
+    soma dos módulos importados no topo depois dele, na execução mais rápida."""
+    codigo = "import streamlit; " + "; ".join(f"import {m}" for m in modulos)
+    melhor = None
+    for _ in range(repeticoes):
+        medidos = medir_importacao(codigo)
+        nomes = list(medidos)
+        depois = nomes[nomes.index("streamlit") + 1 :]
+        total = sum(medidos[nome][1] for nome in depois if medidos[nome][2] == 0)
+        melhor = total if melhor is None else min(melhor, total)
+    return melhor / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--top", type=int, default=5, help="módulos mais caros listados por página"
+    )
+    parser.add_argument(
+        "--repeticoes", type=int, default=3, help="execuções por medição"
+    )
+    args = parser.parse_args()
+
+    base_ms, _ = custo_importacao("streamlit", args.repeticoes, preambulo="pass")
+    print(f"{'streamlit (base do app)':<45} {base_ms:>10.1f} ms")
+    modulos_do_main = imports_do_main()
+    menu_ms = custo_do_menu(modulos_do_main, args.repeticoes)
+    print(f"{'main.py até o menu (imports do main.py)':<45} {menu_ms:>10.1f} ms")
+    print(f"    {', '.join(modulos_do_main)}")
+
+    print("\n📄 Custo adicional de cada página (além do streamlit):")
+    for menu, modulo in PAGINAS.items():
+        pagina_ms, modulos = custo_importacao(modulo, args.repeticoes)
+        print(f"{menu:<45} {pagina_ms:>10.1f} ms")
+        # Dependências diretas da página, da mais cara para a mais barata. No
+        # "-X importtime" os filhos aparecem logo antes da linha do módulo pai.
+        nomes = list(modulos)
+        nivel_pagina = modulos[modulo][2]
+        filhos = []
+        for nome in reversed(nomes[: nomes.index(modulo)]):
+            _, acum, nivel = modulos[nome]
+            if nivel <= nivel_pagina:
+                break
+            if nivel == nivel_pagina + 1:
+                filhos.append((acum, nome))
+        mais_caros = sorted(filhos, reverse=True)[: args.top]
+        for acum, nome in mais_caros:
+            print(f"    {nome:<41} {acum / 1000:>10.1f} ms")
+
+    print("\n⏳ Bibliotecas adiadas até o primeiro uso:")
+    for biblioteca in BIBLIOTECAS_ADIADAS:
+        try:
+            biblioteca_ms, _ = custo_importacao(biblioteca, args.repeticoes)
+        except RuntimeError as e:
+            print(f"{biblioteca:<45} {'indisponível':>13} ({e})")
+            continue
+        print(f"{biblioteca:<45} {biblioteca_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from processamento import agendador as modulo
+from processamento.agendador import Agendador
+
+
+@pytest.fixture(autouse=True)
+def fila_rapida(monkeypatch):
+    monkeypatch.setattr(modulo, "INTERVALO_FILA", 0.01)
+
+
+def _esperar_ate(condicao, limite=5):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.005)
+
+
+def _em_thread(agendador, nome, memoria_mb, ordem, liberar=None, ao_esperar=None):
+    def rodar():
+        with agendador.admit(nome, memoria_mb, ticket=nome, ao_esperar=ao_esperar):
+            ordem.append(nome)
+            if liberar:
+                liberar.wait(5)
+
+    thread = threading.Thread(target=rodar)
+    thread.start()
+    return thread
+
+
+def test_fila_por_ordem_de_chegada_com_posicao():
+    agendador = Agendador(max_simultaneas=1, memoria_mb=1000)
+    ordem, liberar, posicoes = [], threading.Event(), []
+    threads = [_em_thread(agendador, "A", 10, ordem, liberar)]
+    _esperar_ate(lambda: ordem == ["A"])
+    threads.append(_em_thread(agendador, "B", 10, ordem, ao_esperar=posicoes.append))
+    _esperar_ate(lambda: agendador.position("B") == 1)
+    threads.append(_em_thread(agendador, "C", 10, ordem))
+    _esperar_ate(lambda: agendador.position("C") == 2)
+    assert agendador.stats()["executando"] == 1 and agendador.stats()["na_fila"] == 2
+
+    liberar.set()
+    for thread in threads:
+        thread.join(5)
+    assert ordem == ["A", "B", "C"]
+    # A espera termina com 0
+    assert posicoes[0] == 1 and posicoes[-1] == 0
+    assert agendador.stats()["executando"] == agendador.stats()["na_fila"] == 0
+
+
+def test_memoria_reservada_limita_quem_roda_junto():
+    agendador = Agendador(max_simultaneas=3, memoria_mb=1000)
+    ordem, liberar = [], threading.Event()
+    threads = [_em_thread(agendador, "A", 600, ordem, liberar)]
+    _esperar_ate(lambda: ordem == ["A"])
+    # B não cabe ao lado de A; C caberia, mas não passa na frente de B
+    threads.append(_em_thread(agendador, "B", 600, ordem))
+    _esperar_ate(lambda: agendador.position("B") == 1)
+    threads.append(_em_thread(agendador, "C", 100, ordem))
+    _esperar_ate(lambda: agendador.position("C") == 2)
+    assert agendador.stats()["memoria_reservada_mb"] == 600
+
+    liberar.set()
+    for thread in threads:
+        thread.join(5)
+    assert ordem == ["A", "B", "C"]
+
+
+def test_trabalho_maior_que_a_memoria_roda_sozinho():
+    agendador = Agendador(max_simultaneas=2, memoria_mb=1000)
+    with agendador.admit("enorme", 5000) as pedido:
+        assert pedido.memoria_mb == 1000
+
+
+def test_admissao_reentrante_na_mesma_thread():
+    agendador = Agendador(max_simultaneas=1, memoria_mb=1000)
+    with agendador.admit("externo", 900):
+        with agendador.admit("interno", 900) as interno:
+            assert interno is None
+        assert agendador.stats()["executando"] == 1
+    assert agendador.stats()["executando"] == 0
+
+
+def test_excecao_ao_esperar_tira_o_pedido_da_fila():
+    agendador = Agendador(max_simultaneas=1, memoria_mb=1000)
+    erros = []
+
+    def cancelar(posicao):
+        raise RuntimeError("cancelada")
+
+    def pedir():
+        try:
+            with agendador.admit("cancelado", ao_esperar=cancelar):
+                pass
+        except RuntimeError as e:
+            erros.append(e)
+
+    with agendador.admit("ocupado"):
+        thread = threading.Thread(target=pedir)
+        thread.start()
+        thread.join(5)
+        assert len(erros) == 1
+        assert agendador.stats()["na_fila"] == 0
+    with agendador.admit("seguinte") as pedido:
+        assert pedido is not None
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from processamento.cnpj import (
+    BIT_CPF,
+    CNPJTracker,
+    document_keys,
+    format_document,
+    summarize_documents,
+)
+
+
+def test_mascaras_e_numeros_viram_a_mesma_chave():
+    documentos = pd.Series(
+        ["11.222.333/0001-81", "11222333000181", "529.982.247-25", "52998224725", None]
+    )
+    chaves, validos = document_keys(documentos)
+    assert chaves.dtype == np.int64
+    assert validos.tolist() == [True, True, True, True, False]
+    assert chaves[0] == chaves[1] == 11222333000181
+    assert chaves[2] == chaves[3] == 52998224725 | BIT_CPF
+    assert format_document(chaves[0]) == "11.222.333/0001-81"
+    assert format_document(chaves[2]) == "529.982.247-25"
+
+
+def test_cnpj_sem_zeros_a_esquerda():
+    # 00.012.345/0001-65 exportado como número; os verificadores não batem
+    # como CPF, então é lido como CNPJ
+    chaves, validos = document_keys(pd.Series(["12345000165"]))
+    assert validos.tolist() == [True]
+    assert format_document(chaves[0]) == "00.012.345/0001-65"
+
+
+def test_digitos_verificadores_errados_e_repetidos_sao_invalidos():
+    documentos = pd.Series(
+        ["11.222.333/0001-82", "529.982.247-26", "111.111.111-11", "0" * 14, "abc", ""]
+    )
+    chaves, validos = document_keys(documentos)
+    assert not validos.any()
+    assert (chaves == -1).all()
+
+
+def test_resumo_agrupa_mascaras_e_guarda_a_primeira_nota():
+    df = pd.DataFrame(
+        {
+            "CLI_CGCCPF": ["11.222.333/0001-81", "11222333000181", "123", "123", None],
+            "NFS_EMISSAO": pd.to_datetime(
+                ["2025-03-01", "2025-01-15", "2025-02-01", "2025-02-02", "2025-01-01"]
+            ),
+        }
+    )
+    resumo = summarize_documents(df)
+    assert len(resumo) == 2
+    valido = resumo[resumo["CHAVE"] != -1].iloc[0]
+    assert valido["CHAVE"] == 11222333000181
+    assert valido["PRIMEIRA_NOTA"] == pd.Timestamp("2025-01-15")
+    invalido = resumo[resumo["CHAVE"] == -1].iloc[0]
+    assert invalido["DOCUMENTO"] == "123"
+
+
+def test_uniao_de_arquivos_conta_cada_documento_uma_vez():
+    janeiro = pd.DataFrame(
+        {"CLI_CGCCPF": ["11222333000181"], "NFS_EMISSAO": pd.to_datetime(["2025-01-10"])}
+    )
+    fevereiro = pd.DataFrame(
+        {
+            "CLI_CGCCPF": ["11.222.333/0001-81", "529.982.247-25"],
+            "NFS_EMISSAO": pd.to_datetime(["2025-02-01", "2025-02-03"]),
+        }
+    )
+    uniao = CNPJTracker()
+    assert uniao.add("jan", summarize_documents(janeiro)) == 1
+    assert uniao.add("fev", summarize_documents(fevereiro)) == 1
+    assert uniao.add("fev", summarize_documents(fevereiro)) == 0
+    assert len(uniao) == 2
+    assert uniao.new_per_day().tolist() == [1, 1]
@@ -0,0 +1,70 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from processamento.conversor import convert_images, parse_page_selection
+from processamento.notas_fiscais import RenamedZip
+
+
+def test_vazio_seleciona_todas():
+    assert parse_page_selection("  ", 4) == [0, 1, 2, 3]
+
+
+def test_intervalos_em_ordem_e_sem_repeticao():
+    assert parse_page_selection("5, 1-3; 2-", 6) == [0, 1, 2, 3, 4, 5]
+    assert parse_page_selection("8-, 1,,3", 9) == [0, 2, 7, 8]
+    assert parse_page_selection("-2", 9) == [0, 1]
+
+
+@pytest.mark.parametrize("texto", ["0", "3-2", "1-11", "11"])
+def test_paginas_fora_do_documento(texto):
+    with pytest.raises(ValueError, match="fora do documento"):
+        parse_page_selection(texto, 10)
+
+
+@pytest.mark.parametrize("texto", ["a", "1-b", "1.5"])
+def test_intervalo_invalido(texto):
+    with pytest.raises(ValueError, match="inválido"):
+        parse_page_selection(texto, 10)
+
+
+def _foto(largura=400, altura=300, formato="JPEG"):
+    saida = BytesIO()
+    Image.new("RGB", (largura, altura), (200, 30, 30)).save(saida, formato)
+    return saida.getvalue()
+
+
+def test_imagens_em_um_pdf_com_uma_pagina_por_imagem():
+    import fitz  # PyMuPDF
+
+    arquivos = [("a.jpg", _foto()), ("quebrada.jpg", b"nada"), ("b.png", _foto(formato="PNG"))]
+    resultado = convert_images(arquivos, "PDF")
+    assert (resultado.nome, resultado.convertidas) == ("imagens_convertidas.pdf", 2)
+    assert resultado.erros == ["quebrada.jpg: o arquivo não é uma imagem válida"]
+    with fitz.open(stream=resultado.conteudo(), filetype="pdf") as doc:
+        assert len(doc) == 2
+
+
+def test_imagens_em_zip_reduzidas():
+    resultado = convert_images([("a.jpg", _foto(1600, 1200)), ("b.jpg", _foto())], "PNG", 200)
+    assert resultado.mime == "application/zip"
+    with zipfile.ZipFile(BytesIO(resultado.conteudo())) as z:
+        assert z.namelist() == ["a_convertido.png", "b_convertido.png"]
+        assert Image.open(BytesIO(z.read("a_convertido.png"))).size == (200, 150)
+
+
+def test_conversao_cancelada_descarta_o_zip(monkeypatch):
+    descartados = []
+    descartar = RenamedZip.discard
+    monkeypatch.setattr(
+        RenamedZip, "discard", lambda self: descartados.append(self) or descartar(self)
+    )
+
+    def cancelar(concluidas):
+        raise RuntimeError("cancelada")
+
+    with pytest.raises(RuntimeError):
+        convert_images([("a.jpg", _foto()), ("b.jpg", _foto())], "JPEG", None, cancelar)
+    assert len(descartados) == 1
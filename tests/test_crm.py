@@ -0,0 +1,80 @@
+import pandas as pd
+
+from processamento.crm import (
+    ATIVO,
+    INATIVO,
+    SEM_VENDEDOR,
+    VendorIndex,
+    classify_activity,
+    compute_client_activity,
+)
+
+HOJE = "2025-06-30"
+
+
+def _notas():
+    return pd.DataFrame(
+        {
+            "CLI_RAZ": ["A", "A", "A", "B", "C"],
+            "VEND_NOME": ["Ana", "Ana", "Bruno", "Bruno", None],
+            "NFS_EMISSAO": pd.to_datetime(
+                ["2025-06-20", "2025-05-10", "2024-12-01", "2025-06-01", "2024-01-01"]
+            ),
+            "NFS_CUSTO": [100.0, 50.0, "abc", 30.0, 10.0],
+        }
+    )
+
+
+def test_janelas_contam_notas_e_valores_a_partir_de_hoje_menos_n_dias():
+    clientes = compute_client_activity(_notas(), janelas=(30, 60, 365), hoje=HOJE)
+    clientes = clientes.set_index("CLIENTES")
+
+    assert clientes["QTD_NOTAS"].to_dict() == {"A": 3, "B": 1, "C": 1}
+    # Custo que não é número conta como zero
+    assert clientes["TOTAL_GERAL"].to_dict() == {"A": 150.0, "B": 30.0, "C": 10.0}
+    assert clientes["QTD_NOTAS_30D"].to_dict() == {"A": 1, "B": 1, "C": 0}
+    assert clientes["TOTAL_60D"].to_dict() == {"A": 150.0, "B": 30.0, "C": 0.0}
+    assert clientes["QTD_NOTAS_365D"].to_dict() == {"A": 3, "B": 1, "C": 0}
+    assert clientes.loc["A", "ULTIMA_COMPRA"] == pd.Timestamp("2025-06-20")
+    assert clientes["DIAS_SEM_COMPRA"].to_dict() == {"A": 10, "B": 29, "C": 546}
+
+
+def test_nota_no_primeiro_dia_da_janela_entra_nela():
+    notas = _notas().iloc[[3]]
+    clientes = compute_client_activity(notas, janelas=(29, 28), hoje=HOJE)
+    assert clientes[["QTD_NOTAS_29D", "QTD_NOTAS_28D"]].iloc[0].tolist() == [1, 0]
+
+
+def test_classificacao_pelo_limiar():
+    clientes = compute_client_activity(_notas(), hoje=HOJE)
+    situacao = classify_activity(clientes, 30, hoje=HOJE)
+    assert dict(zip(clientes["CLIENTES"], situacao)) == {"A": ATIVO, "B": ATIVO, "C": INATIVO}
+    situacao = classify_activity(clientes, 15, hoje=HOJE)
+    assert dict(zip(clientes["CLIENTES"], situacao)) == {"A": ATIVO, "B": INATIVO, "C": INATIVO}
+
+
+def test_indice_por_vendedor_bate_com_o_calculo_direto():
+    notas = _notas()
+    indice = VendorIndex(notas, hoje=HOJE)
+    assert indice.vendedores == [SEM_VENDEDOR, "Ana", "Bruno"]
+    assert indice.linhas("Bruno")["CLI_RAZ"].tolist() == ["A", "B"]
+    assert indice.linhas(SEM_VENDEDOR)["CLI_RAZ"].tolist() == ["C"]
+
+    direto = compute_client_activity(notas, hoje=HOJE)
+    pd.testing.assert_frame_equal(indice.clientes(), direto)
+    pd.testing.assert_frame_equal(indice.clientes(indice.vendedores), direto)
+
+    bruno = compute_client_activity(notas[notas["VEND_NOME"] == "Bruno"], hoje=HOJE)
+    pd.testing.assert_frame_equal(indice.clientes(["Bruno"]), bruno)
+
+    # Cliente atendido por dois vendedores: resumos parciais combinados
+    dois = compute_client_activity(notas[notas["VEND_NOME"].notna()], hoje=HOJE)
+    pd.testing.assert_frame_equal(indice.clientes(["Ana", "Bruno"]), dois)
+
+
+def test_comparativo_por_vendedor():
+    comparativo = VendorIndex(_notas(), hoje=HOJE).comparativo(["Ana", "Bruno"], 30)
+    assert comparativo.to_dict("records") == [
+        {"VENDEDOR": "Ana", "CLIENTES": 1, "ATIVOS": 1, "INATIVOS": 0, "TOTAL_30D": 100.0},
+        {"VENDEDOR": "Bruno", "CLIENTES": 2, "ATIVOS": 1, "INATIVOS": 1, "TOTAL_30D": 30.0},
+    ]
@@ -0,0 +1,78 @@
+import sys
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from processamento import exportacao
+from processamento.exportacao import FORMATO_CONTABIL, to_csv, to_parquet, to_xlsx
+
+
+def _dados(linhas=5):
+    return pd.DataFrame(
+        {
+            "Data": pd.date_range("2025-01-01", periods=linhas, freq="D"),
+            "Descrição": [f"Transação {i} ção" for i in range(linhas)],
+            "Valor": [i * 1.5 - 2 for i in range(linhas)],
+            # Como o "Saldo" do extrato ML: números e vazios
+            "Saldo": ["" if i % 2 else i * 10.25 for i in range(linhas)],
+        }
+    )
+
+
+def _saldo_lido(df):
+    return [None if v == "" else v for v in df["Saldo"]]
+
+
+@pytest.mark.parametrize("motor", ["xlsxwriter", "openpyxl"])
+def test_xlsx_ida_e_volta_em_varios_blocos(monkeypatch, motor):
+    from openpyxl import load_workbook
+
+    monkeypatch.setattr(exportacao, "LINHAS_POR_BLOCO", 3)
+    if motor == "openpyxl":
+        monkeypatch.setitem(sys.modules, "xlsxwriter", None)
+    df = _dados(8)
+
+    dados = to_xlsx(df, nome_aba="Extrato", formatos={"Valor": FORMATO_CONTABIL})
+    lido = pd.read_excel(BytesIO(dados), sheet_name="Extrato")
+
+    assert lido.columns.tolist() == df.columns.tolist()
+    assert lido["Data"].tolist() == df["Data"].tolist()
+    assert lido["Descrição"].tolist() == df["Descrição"].tolist()
+    assert lido["Valor"].tolist() == df["Valor"].tolist()
+    assert [None if pd.isna(v) else v for v in lido["Saldo"]] == _saldo_lido(df)
+
+    aba = load_workbook(BytesIO(dados))["Extrato"]
+    assert aba["C2"].number_format == FORMATO_CONTABIL
+    assert aba["A2"].number_format == exportacao.FORMATO_DATA
+
+
+def test_xlsx_em_arquivo(tmp_path):
+    caminho = tmp_path / "saida.xlsx"
+    assert to_xlsx(_dados(), str(caminho)) is None
+    assert len(pd.read_excel(caminho)) == 5
+
+
+def test_csv_ida_e_volta():
+    df = _dados()
+    dados = to_csv(df)
+    assert dados.startswith(b"\xef\xbb\xbf")
+    lido = pd.read_csv(
+        BytesIO(dados), sep=";", decimal=",", encoding="utf-8-sig", parse_dates=["Data"]
+    )
+    assert lido["Data"].tolist() == df["Data"].tolist()
+    assert lido["Descrição"].tolist() == df["Descrição"].tolist()
+    assert lido["Valor"].tolist() == df["Valor"].tolist()
+    assert [None if pd.isna(v) else v for v in lido["Saldo"]] == _saldo_lido(df)
+
+
+def test_parquet_ida_e_volta(tmp_path):
+    df = _dados()
+    caminho = tmp_path / "saida.parquet"
+    to_parquet(df, str(caminho))
+    lido = pd.read_parquet(caminho)
+    pd.testing.assert_frame_equal(lido.drop(columns="Saldo"), df.drop(columns="Saldo"))
+    # Vazios misturados com números viram nulos numa coluna numérica
+    assert lido["Saldo"].dtype == "float64"
+    assert [None if pd.isna(v) else v for v in lido["Saldo"]] == _saldo_lido(df)
+    pd.testing.assert_frame_equal(pd.read_parquet(BytesIO(to_parquet(df))), lido)
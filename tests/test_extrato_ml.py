@@ -0,0 +1,90 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from processamento import extrato_ml
+from processamento.extrato_ml import MOTORES, parse_ml_statement, parse_row_block
+
+
+def _extrato(paginas):
+    """PDF em tabela em que a descrição da última transação de cada página
+    continua no topo da página seguinte."""
+    import fitz  # PyMuPDF
+
+    colunas = {"data": 40, "descricao": 110, "id": 300, "valor": 420, "saldo": 500}
+    doc = fitz.open()
+    saldo = 0.0
+    for numero in range(paginas):
+        pagina = doc.new_page()
+        escrever = lambda coluna, y, texto: pagina.insert_text(  # noqa: E731
+            (colunas[coluna], y), texto, fontsize=9
+        )
+        for coluna, rotulo in zip(colunas, ("Data", "Descrição", "ID", "Valor", "Saldo")):
+            escrever(coluna, 40, rotulo)
+        y = 60
+        if numero:
+            escrever("descricao", y, f"continuação {numero}")
+            y += 14
+        for linha in range(4):
+            valor = (numero * 4 + linha + 1) * 10.5
+            saldo += valor
+            escrever("data", y, f"{linha + 1:02d}-01-2025")
+            escrever("descricao", y, f"Venda {numero}-{linha}")
+            escrever("id", y, str(10**10 + numero * 4 + linha))
+            escrever("valor", y, f"R$ {valor:.2f}".replace(".", ","))
+            escrever("saldo", y, f"R$ {saldo:.2f}".replace(".", ","))
+            y += 14
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_leitura_paralela_igual_a_sequencial(monkeypatch, motor):
+    # Uma página por faixa, para que toda transação no fim de página seja
+    # emendada entre processos
+    monkeypatch.setattr(extrato_ml, "PAGINAS_POR_FAIXA", 1)
+    monkeypatch.setattr(extrato_ml, "MINIMO_PAGINAS_PARALELO", 2)
+    pdf = _extrato(4)
+
+    sequencial, erros = parse_ml_statement(pdf, paralelo=False, motor=motor)
+    paralelo, erros_paralelo = parse_ml_statement(pdf, max_workers=2, motor=motor)
+
+    assert erros == erros_paralelo == []
+    assert len(sequencial) == 16
+    descricao = sequencial["Descrição"].iloc[3]
+    assert descricao.startswith("Venda 0-3") and descricao.endswith("continuação 1")
+    pd.testing.assert_frame_equal(paralelo, sequencial)
+
+
+def _linha(**celulas):
+    return {**celulas, "linha": " ".join(filter(None, celulas.values()))}
+
+
+def test_id_pela_coluna():
+    bloco = [
+        _linha(
+            data="02-01-2025",
+            descricao="Pagamento 123456789012",
+            id="987654321",
+            valor="R$ -1.234,56",
+            saldo="R$ 10,00",
+        )
+    ]
+    registro = parse_row_block(bloco)
+    assert registro["ID da Operação"] == "987654321"
+    assert registro["Descrição"] == "Pagamento 123456789012"
+    assert registro["Data"] == datetime.date(2025, 1, 2)
+    assert (registro["Valor"], registro["Saldo"]) == (-1234.56, 10.0)
+
+
+def test_id_pelo_texto_sem_coluna_de_id():
+    bloco = [
+        _linha(data="02-01-2025", descricao="Transferência Pix", valor="R$ 50,00"),
+        _linha(data="", descricao="recebida 987654321", valor=""),
+    ]
+    registro = parse_row_block(bloco)
+    assert registro["ID da Operação"] == "987654321"
+    assert registro["Descrição"] == "Transferência Pix recebida"
+    assert (registro["Valor"], registro["Saldo"]) == (50.0, "")
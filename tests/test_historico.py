@@ -0,0 +1,37 @@
+import pandas as pd
+
+from processamento.historico import InvoiceStore
+
+
+def notas(valores):
+    return pd.DataFrame(
+        {
+            "NFS_EMISSAO": pd.to_datetime(["2024-03-01", "2024-03-02"][: len(valores)]),
+            "VEND_NOME": ["ANA", "BRUNO"][: len(valores)],
+            "CLI_RAZ": ["CLIENTE A", "CLIENTE B"][: len(valores)],
+            "NFS_CUSTO": valores,
+            "CLI_CGCCPF": ["12345678000195", None][: len(valores)],
+        }
+    )
+
+
+def test_reimportar_com_valor_inteiro_nao_duplica(tmp_path):
+    historico = InvoiceStore(str(tmp_path / "historico.sqlite3"))
+    primeira = notas([100.0, 200.5])
+    assert primeira["NFS_CUSTO"].dtype == "float64"
+    assert historico.import_dataframe(primeira).novas == 2
+
+    # Na outra exportação só há valores inteiros e a coluna vem como int64
+    segunda = notas([100])
+    assert segunda["NFS_CUSTO"].dtype == "int64"
+    assert historico.import_dataframe(segunda).novas == 0
+    assert historico.stats()["notas"] == 2
+
+
+def test_reimportar_com_outra_resolucao_de_data_nao_duplica(tmp_path):
+    historico = InvoiceStore(str(tmp_path / "historico.sqlite3"))
+    assert historico.import_dataframe(notas([100.0])).novas == 1
+
+    segunda = notas([100.0])
+    segunda["NFS_EMISSAO"] = segunda["NFS_EMISSAO"].astype("datetime64[s]")
+    assert historico.import_dataframe(segunda).novas == 0
@@ -0,0 +1,50 @@
+import datetime
+
+import pandas as pd
+
+from processamento.layouts_bancarios import (
+    _valores_com_sinal,
+    cells_as_text,
+    parse_amounts,
+    parse_statement,
+)
+
+
+def test_milhar_sem_centavos():
+    valores = pd.Series(["1.500", "-1.500", "R$ 1.500", "12.345.678"], dtype="str")
+    assert parse_amounts(valores).tolist() == [1500.0, -1500.0, 1500.0, 12345678.0]
+
+
+def test_padrao_brasileiro_e_ponto_decimal():
+    valores = pd.Series(["1.234,56", "0,125", "1234.5", "1e+20", "abc", None], dtype="str")
+    assert parse_amounts(valores).tolist() == [1234.56, 0.125, 1234.5, 1e20, 0.0, 0.0]
+
+
+def test_celulas_numericas_nao_viram_texto_com_ponto():
+    bruto = pd.DataFrame(
+        [
+            ["Data", "Documento", "Histórico", "Crédito", "Débito"],
+            [datetime.datetime(2025, 1, 2), 123, "PIX", 1500, None],
+            [datetime.datetime(2025, 1, 3), 124, "TED", None, 0.125],
+            ["04/01/2025", "125", "DOC", "1.500", None],
+        ],
+        dtype=object,
+    )
+    df, _ = parse_statement(cells_as_text(bruto))
+    assert df["Valor Crédito"].tolist() == [1500.0, 0.0, 1500.0]
+    assert df["Valor Débito"].tolist() == [0.0, 0.125, 0.0]
+    assert df["Documento"].tolist() == ["123", "124", "125"]
+
+
+def test_sinal_com_simbolo_de_moeda():
+    tabela = pd.DataFrame(
+        {
+            "Valor": pd.Series(
+                ["R$ -1.234,56", "-R$ 10,00", "R$ (5,00)", "R$ 7,00-", "R$ 1.500"],
+                dtype="str",
+            )
+        }
+    )
+    credito, debito = _valores_com_sinal(tabela)
+    assert credito.tolist() == [0.0, 0.0, 0.0, 0.0, 1500.0]
+    assert debito.tolist() == [1234.56, 10.0, 5.0, 7.0, 0.0]
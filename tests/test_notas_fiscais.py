@@ -0,0 +1,98 @@
+import os
+import zipfile
+
+import pytest
+
+from processamento.notas_fiscais import METODO_CABECALHO, rename_batch_to_zip
+
+
+def _danfe(numero, itens=1):
+    """PDF com o cabeçalho de um DANFE (emitente e ``Nº.:``)."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    pagina = doc.new_page()
+    pagina.insert_text((40, 80), "IDENTIFICAÇÃO DO EMITENTE", fontsize=8)
+    pagina.insert_text((40, 95), f"EMPRESA {numero} LTDA", fontsize=10)
+    pagina.insert_text((400, 120), f"Nº.: 000.001.{numero:03d}", fontsize=10)
+    for item in range(itens):
+        pagina.insert_text((40, 400 + item * 14), f"ITEM {item}", fontsize=8)
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def _sem_dados():
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    doc.new_page().insert_text((40, 80), "Recibo qualquer", fontsize=10)
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def test_lote_renomeado_no_zip_na_ordem_de_envio(tmp_path):
+    pdfs = [
+        ("a.pdf", _danfe(7)),
+        ("b.pdf", _sem_dados()),
+        ("c.pdf", _danfe(8)),
+        # Mesmo emitente e número da "a.pdf", outro arquivo
+        ("d.pdf", _danfe(7, itens=2)),
+    ]
+    caminho = str(tmp_path / "renomeadas.zip")
+    lote = rename_batch_to_zip(iter(pdfs), caminho)
+
+    assert [r.nome_original for r in lote.resultados] == ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    assert [r.novo_nome for r in lote.resultados] == [
+        "EMPRESA 7 LTDA - 000.001.007.pdf",
+        None,
+        "EMPRESA 8 LTDA - 000.001.008.pdf",
+        "EMPRESA 7 LTDA - 000.001.007 (2).pdf",
+    ]
+    assert lote.resultados[0].metodo == METODO_CABECALHO
+    assert lote.resultados[1].metodo is None
+    with zipfile.ZipFile(caminho) as z:
+        assert sorted(z.namelist()) == sorted(lote.arquivo.nomes)
+        assert z.read("EMPRESA 7 LTDA - 000.001.007 (2).pdf") == pdfs[3][1]
+
+
+def test_lote_cancelado_nao_deixa_zip(tmp_path):
+    class Cancelado(Exception):
+        pass
+
+    def ao_progredir(concluidos):
+        if concluidos == 2:
+            raise Cancelado
+
+    caminho = str(tmp_path / "renomeadas.zip")
+    pdfs = [(f"{i}.pdf", _danfe(i)) for i in range(4)]
+    with pytest.raises(Cancelado):
+        rename_batch_to_zip(pdfs, caminho, ao_progredir=ao_progredir)
+    assert os.listdir(tmp_path) == []
+
+
+def test_renomear_pasta_de_novo_nao_duplica(tmp_path):
+    from processamento.lote import rename_invoices
+
+    entrada, destino = tmp_path / "entrada", tmp_path / "destino"
+    entrada.mkdir()
+    (entrada / "a.pdf").write_bytes(_danfe(7))
+    (entrada / "b.pdf").write_bytes(_danfe(7, itens=2))
+    (entrada / "c.pdf").write_bytes(_danfe(8))
+
+    primeira = list(rename_invoices([str(entrada)], str(destino), max_workers=1))
+    segunda = list(rename_invoices([str(entrada)], str(destino), max_workers=1))
+
+    assert sorted(os.listdir(destino)) == [
+        "EMPRESA 7 LTDA - 000.001.007 (2).pdf",
+        "EMPRESA 7 LTDA - 000.001.007.pdf",
+        "EMPRESA 8 LTDA - 000.001.008.pdf",
+    ]
+    assert [r.saida for r in segunda] == [r.saida for r in primeira]
+    assert all("já estava no destino" in r.detalhe for r in segunda)
+
+    # Outro arquivo com um nome já usado no destino ganha uma cópia numerada
+    (entrada / "d.pdf").write_bytes(_danfe(8, itens=3))
+    terceira = list(rename_invoices([str(entrada / "d.pdf")], str(destino), max_workers=1))
+    assert os.path.basename(terceira[0].saida) == "EMPRESA 8 LTDA - 000.001.008 (2).pdf"
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from processamento.tabela import format_page, page_count, page_slice, query_table
+
+
+def _clientes():
+    return pd.DataFrame(
+        {
+            "CLIENTES": ["Alfa Ltda", "beta me", "Gama", "Delta ALFA", None],
+            "SITUACAO": ["Ativo", "Inativo", "Ativo", "Inativo", "Ativo"],
+            "TOTAL": [10.0, None, 30.0, 5.0, 20.0],
+        }
+    )
+
+
+def test_paginas_cobrem_todas_as_linhas_uma_vez():
+    df = pd.DataFrame({"n": range(103)})
+    assert page_count(len(df), 25) == 5
+    paginas = [page_slice(df, pagina, 25) for pagina in range(1, 6)]
+    assert [len(pagina) for pagina in paginas] == [25, 25, 25, 25, 3]
+    assert pd.concat(paginas)["n"].tolist() == list(range(103))
+    assert page_slice(df, 6, 25).empty
+
+
+def test_tabela_vazia_tem_uma_pagina():
+    assert page_count(0, 25) == 1
+
+
+def test_busca_filtro_e_ordenacao():
+    resultado = query_table(
+        _clientes(), busca="alfa", filtros={"SITUACAO": ["Inativo"], "CLIENTES": []}
+    )
+    assert resultado["CLIENTES"].tolist() == ["Delta ALFA"]
+
+    ordenado = query_table(_clientes(), ordenar_por="TOTAL", crescente=False)
+    assert ordenado["TOTAL"].tolist()[:4] == [30.0, 20.0, 10.0, 5.0]
+    assert pd.isna(ordenado["TOTAL"].iloc[-1])
+
+
+def test_formatacao_so_da_pagina_e_vazio_no_lugar_de_nulo():
+    pagina = format_page(page_slice(_clientes(), 1, 2), {"TOTAL": "R$ {:,.2f}"})
+    assert pagina["TOTAL"].tolist() == ["R$ 10.00", ""]
+    assert pagina["CLIENTES"].tolist() == ["Alfa Ltda", "beta me"]